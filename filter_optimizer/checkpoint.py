@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+""" Checkpoints of a running optimization. A checkpoint is a NumPy
+    .npz archive with the arrays (population, evaluations and the
+    state of the adaptive grid and the active set) and the scalar
+    state (counters, random number generator) as a JSON string. It
+    is written to a temporary file in the same directory and renamed
+    over the old checkpoint, so a crash during writing never leaves a
+    truncated checkpoint.
+"""
+
+import os
+import json
+import numpy as np
+
+def write_checkpoint (filename, state, **arrays):
+    """ Atomically write the dictionary state (must be serializable
+        as JSON) and the given arrays to filename.
+    """
+    tmp = filename + '.tmp'
+    with open (tmp, 'wb') as f:
+        np.savez (f, state = np.array (json.dumps (state)), **arrays)
+        f.flush ()
+        os.fsync (f.fileno ())
+    os.replace (tmp, filename)
+# end def write_checkpoint
+
+def read_checkpoint (filename):
+    """ Return the state dictionary and a dictionary of the arrays of
+        the checkpoint in filename.
+    """
+    with np.load (filename, allow_pickle = False) as npz:
+        arrays = dict ((k, npz [k]) for k in npz.files)
+    state = json.loads (str (arrays.pop ('state')))
+    return state, arrays
+# end def read_checkpoint
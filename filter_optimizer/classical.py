@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+""" Classical IIR designs (elliptic, Chebyshev type I and II,
+    Butterworth) derived from the magnitude bounds, converted to the
+    gene layout of Filter_Opt (see response.gene_roots). These are
+    used as starting points of the optimization.
+"""
+
+import numpy as np
+from scipy import signal
+
+families = ('ellip', 'cheby1', 'cheby2', 'butter')
+
+class Band_Spec (object):
+    """ Band edges and ripple derived from the upper bound udb and the
+        lower bound ldb of the magnitude (frequencies in rad): The
+        passband is where a lower bound is given, the stopband where
+        the upper bound is more than 3 dB below the passband. The
+        passband ripple is the distance of the bounds in the passband,
+        the stopband attenuation is the largest attenuation required.
+        btype is None if the bounds do not describe a lowpass,
+        highpass or bandpass.
+    """
+
+    def __init__ (self, udb, ldb):
+        self.btype = None
+        if not udb or not ldb:
+            return
+        pmin, pmax   = ldb.x.min (), ldb.x.max ()
+        inpass       = (udb.x >= pmin) & (udb.x <= pmax)
+        self.pass_lo = ldb.y.min ()
+        self.pass_hi = udb.y [inpass].max () if inpass.any () else 0.0
+        stop         = udb.y < self.pass_lo - 3
+        if not stop.any ():
+            return
+        below = udb.x [stop & (udb.x < pmin)]
+        above = udb.x [stop & (udb.x > pmax)]
+        if len (below) and len (above):
+            self.btype = 'bandpass'
+            self.wp    = [pmin, pmax]
+            self.ws    = [below.max (), above.min ()]
+        elif len (above):
+            self.btype = 'lowpass'
+            self.wp    = pmax
+            self.ws    = above.min ()
+        elif len (below):
+            self.btype = 'highpass'
+            self.wp    = pmin
+            self.ws    = below.max ()
+        else:
+            return
+        self.wp = np.asarray (self.wp) / np.pi
+        self.ws = np.asarray (self.ws) / np.pi
+        self.rp = np.clip (self.pass_hi - self.pass_lo, 0.001, 3.0)
+        self.rs = np.clip (self.pass_hi - udb.y [stop].min (), 3.0, 150.0)
+    # end def __init__
+
+    def __bool__ (self):
+        return self.btype is not None
+    # end def __bool__
+
+    def design (self, family, order):
+        """ Zeros and poles of a classical design of the given family
+            and order, the gain is not needed, see Filter_Opt.
+        """
+        d = dict (btype = self.btype, output = 'zpk')
+        if family == 'ellip':
+            z, p, k = signal.ellip (order, self.rp, self.rs, self.wp, **d)
+        elif family == 'cheby1':
+            z, p, k = signal.cheby1 (order, self.rp, self.wp, **d)
+        elif family == 'cheby2':
+            z, p, k = signal.cheby2 (order, self.rs, self.ws, **d)
+        else:
+            wn = (self.wp + self.ws) / 2
+            z, p, k = signal.butter (order, wn, **d)
+        return z, p
+    # end def design
+
+# end class Band_Spec
+
+def root_pairs (roots):
+    """ (radius, angle) pairs for the roots: One pair for each complex
+        conjugate pair and each positive real root. Negative real
+        roots are combined in pairs with the angle 0.5 (which gives a
+        double root, see response.conjugate_polar) with the geometric
+        mean of their radii, a remaining single one becomes a double
+        root.
+    """
+    roots = np.asarray (roots, dtype = complex)
+    tol   = 1e-9
+    cplx  = roots [roots.imag > tol]
+    real  = roots [abs (roots.imag) <= tol].real
+    pairs = [(abs (r), np.angle (r) / (2 * np.pi)) for r in cplx]
+    pairs.extend ((r, 0.0) for r in real [real >= 0])
+    neg   = np.sort (-real [real < 0])
+    for k in range (0, len (neg), 2):
+        pairs.append ((np.exp (np.mean (np.log (neg [k:k+2]))), 0.5))
+    return pairs
+# end def root_pairs
+
+def designs (spec, nzeros, npoles):
+    """ Yield family, order and the (radius, angle) pairs of zeros and
+        poles for all classical designs for the Band_Spec spec that
+        fit into nzeros zeros and npoles poles of a gene.
+    """
+    for family in families:
+        for order in range (1, 4 * npoles + 1):
+            try:
+                z, p = spec.design (family, order)
+            except (ValueError, ArithmeticError):
+                continue
+            zp, pp = root_pairs (z), root_pairs (p)
+            if len (pp) > npoles:
+                break
+            if len (zp) <= nzeros:
+                yield family, order, zp, pp
+# end def designs
+
+def gain_pairs (factor, max_radius = 5.0):
+    """ A zero and a pole (as (radius, angle) pairs) that together
+        change the magnitude by factor (> 1) at all frequencies: A
+        real zero at r and a real pole at 1/r give an allpass times r.
+        Factors above max_radius use double roots at angle 0.5, the
+        result is limited to max_radius ** 2.
+    """
+    if factor <= max_radius:
+        return (factor, 0.0), (1 / factor, 0.0)
+    r = min (np.sqrt (factor), max_radius)
+    return (r, 0.5), (1 / r, 0.5)
+# end def gain_pairs
@@ -0,0 +1,581 @@
+#!/usr/bin/python3
+""" Differential evolution on NumPy arrays.
+    The DE class follows the interface of pga.PGA as far as it is used
+    by the filter optimizer: The same constructor parameters and
+    population constants (defined here, pgapack is not needed),
+    access to alleles and evaluations, the user hooks evaluate,
+    pre_eval, stop_cond, endofgen and print_string and the same report
+    format. It can therefore be used as an alternative
+    base class. The population is stored in arrays and whole generations
+    are created and replaced at once.
+"""
+
+import sys
+import numpy as np
+
+# Constants with the same names and values as in pgapack, so the same
+# parameters can be passed to both backends without importing pga
+PGA_OLDPOP                = -6728
+PGA_NEWPOP                = -8376
+PGA_DE_CROSSOVER_BIN      = 1
+PGA_DE_CROSSOVER_EXP      = 2
+PGA_DE_VARIANT_RAND       = 1
+PGA_DE_VARIANT_BEST       = 2
+PGA_DE_VARIANT_EITHER_OR  = 3
+PGA_MUTATION_DE           = 6
+PGA_POPREPL_PAIRWISE_BEST = 5
+PGA_REPORT_STRING         = 8
+PGA_SELECT_LINEAR         = 6
+PGA_STOP_MAXITER          = 1
+PGA_STOP_NOCHANGE         = 2
+
+class DE (object):
+    """ Differential evolution like in pgapack (random numbers differ),
+        optionally self-adaptive like SHADE with linear population size
+        reduction like L-SHADE, or asynchronous (run_asynchronous).
+    """
+
+    def __init__ \
+        ( self, typ, length
+        , maximize                 = True
+        , pop_size                 = 100
+        , num_replace              = None
+        , init                     = None
+        , random_seed              = 0
+        , select_type              = None
+        , pop_replace_type         = PGA_POPREPL_PAIRWISE_BEST
+        , mutation_type            = PGA_MUTATION_DE
+        , mutation_only            = True
+        , mutation_bounce_back     = False
+        , mutation_bounded         = False
+        , DE_variant               = PGA_DE_VARIANT_RAND
+        , DE_crossover_type        = PGA_DE_CROSSOVER_BIN
+        , DE_crossover_prob        = 0.9
+        , DE_scale_factor          = 0.9
+        , DE_aux_factor            = None
+        , DE_probability_EO        = 0.5
+        , DE_dither                = 0.0
+        , DE_dither_per_individual = False
+        , DE_jitter                = 0.0
+        , max_GA_iter              = 1000
+        , max_no_change            = 100
+        , stopping_rule_types      = (PGA_STOP_MAXITER,)
+        , print_frequency          = 10
+        , print_options            = ()
+        , DE_self_adaptive         = False
+        , DE_memory_size           = 6
+        , min_pop_size             = 0
+        , max_evaluations          = 0
+        , async_slots              = 0
+        , async_batch              = 1
+        ):
+        if typ is not float:
+            raise ValueError ("Only float genes are supported")
+        if mutation_type != PGA_MUTATION_DE:
+            raise ValueError ("Only DE mutation is supported")
+        if pop_replace_type != PGA_POPREPL_PAIRWISE_BEST:
+            raise ValueError ("Only pairwise best replacement is supported")
+        variants = \
+            ( PGA_DE_VARIANT_RAND
+            , PGA_DE_VARIANT_BEST
+            , PGA_DE_VARIANT_EITHER_OR
+            )
+        if DE_variant not in variants:
+            raise ValueError ("Unsupported DE variant: %s" % DE_variant)
+        if pop_size < 4:
+            raise ValueError ("DE needs a population of at least 4")
+        self.string_length            = length
+        self.maximize                 = maximize
+        self.pop_size                 = pop_size
+        self.num_replace              = num_replace or pop_size
+        self.random_seed              = random_seed
+        self.mutation_bounce_back     = mutation_bounce_back
+        self.mutation_bounded         = mutation_bounded
+        self.DE_variant               = DE_variant
+        self.DE_crossover_type        = DE_crossover_type
+        self.DE_crossover_prob        = DE_crossover_prob
+        self.DE_scale_factor          = DE_scale_factor
+        self.DE_aux_factor            = DE_aux_factor
+        self.DE_probability_EO        = DE_probability_EO
+        self.DE_dither                = DE_dither
+        self.DE_dither_per_individual = DE_dither_per_individual
+        self.DE_jitter                = DE_jitter
+        self.max_GA_iter              = max_GA_iter
+        self.max_no_change            = max_no_change
+        self.stopping_rule_types      = list (stopping_rule_types)
+        self.print_frequency          = print_frequency
+        self.print_options            = list (print_options)
+        self.DE_self_adaptive         = DE_self_adaptive
+        self.initial_pop_size         = pop_size
+        self.min_pop_size             = max (min_pop_size, 4) \
+                                        if min_pop_size else 0
+        self.max_evaluations          = max_evaluations
+        self.async_slots              = async_slots
+        self.async_batch              = async_batch
+        self.mpi_n_proc               = 1
+        self.mpi_rank                 = 0
+        self.GA_iter                  = 0
+        self.eval_count               = 0
+        self.no_change                = 0
+        self.initialized              = False
+        if init is None:
+            init = [(0, 1)] * length
+        init     = np.array (init, dtype = float)
+        self.lo  = init [:, 0]
+        self.hi  = init [:, 1]
+        self.rng = np.random.default_rng (random_seed or None)
+        # Success history of scale factor and crossover rate, the
+        # values of the current trial vectors
+        self.memory_F   = np.full (DE_memory_size, float (DE_scale_factor))
+        self.memory_Cr  = np.full (DE_memory_size, float (DE_crossover_prob))
+        self.memory_pos = 0
+        self.trial_F    = self.trial_Cr = None
+        self.pops          = {}
+        self.evaluations   = {}
+        self.up_to_date    = {}
+        for pop in PGA_OLDPOP, PGA_NEWPOP:
+            self.pops        [pop] = np.zeros ((pop_size, length))
+            self.evaluations [pop] = np.zeros (pop_size)
+            self.up_to_date  [pop] = np.zeros (pop_size, dtype = bool)
+    # end def __init__
+
+    def get_allele (self, p, pop, i):
+        return self.pops [pop][p, i]
+    # end def get_allele
+
+    def set_allele (self, p, pop, i, value):
+        self.pops [pop][p, i] = value
+    # end def set_allele
+
+    def get_population (self, pop, individuals = None):
+        """ Copy of the genes of the given individuals (default all) of
+            pop, one row per individual.
+        """
+        if individuals is None:
+            return self.pops [pop].copy ()
+        return self.pops [pop][np.asarray (individuals, dtype = int)]
+    # end def get_population
+
+    def set_population (self, pop, genes, individuals = None):
+        """ Set the genes of the given individuals (default all) of
+            pop from the rows of genes.
+        """
+        if individuals is None:
+            self.pops [pop][:] = genes
+        else:
+            self.pops [pop][np.asarray (individuals, dtype = int)] = genes
+    # end def set_population
+
+    def get_evaluation (self, p, pop):
+        return self.evaluations [pop][p]
+    # end def get_evaluation
+
+    def set_evaluation (self, p, pop, value):
+        self.evaluations [pop][p] = value
+        self.up_to_date  [pop][p] = True
+    # end def set_evaluation
+
+    def get_evaluation_up_to_date (self, p, pop):
+        return self.up_to_date [pop][p]
+    # end def get_evaluation_up_to_date
+
+    def set_evaluation_up_to_date (self, p, pop, value):
+        self.up_to_date [pop][p] = value
+    # end def set_evaluation_up_to_date
+
+    def get_best_index (self, pop):
+        if self.maximize:
+            return int (np.argmax (self.evaluations [pop]))
+        return int (np.argmin (self.evaluations [pop]))
+    # end def get_best_index
+
+    def check_stopping_conditions (self):
+        rules = self.stopping_rule_types
+        if PGA_STOP_MAXITER in rules and self.GA_iter >= self.max_GA_iter:
+            return True
+        if  ( PGA_STOP_NOCHANGE in rules
+            and self.no_change >= self.max_no_change
+            ):
+            return True
+        return False
+    # end def check_stopping_conditions
+
+    def pre_eval (self, pop):
+        pass
+    # end def pre_eval
+
+    def stop_cond (self):
+        return self.check_stopping_conditions ()
+    # end def stop_cond
+
+    def endofgen (self):
+        pass
+    # end def endofgen
+
+    def get_state (self):
+        """ Counters, state of the random number generator and the
+            DE parameters that may change during a run, with the old
+            population this is everything needed for continuing a run
+            with set_state.
+        """
+        return dict \
+            ( GA_iter    = self.GA_iter
+            , eval_count = self.eval_count
+            , no_change  = self.no_change
+            , rng        = self.rng.bit_generator.state
+            , F          = float (self.DE_scale_factor)
+            , Cr         = float (self.DE_crossover_prob)
+            , memory_F   = self.memory_F.tolist ()
+            , memory_Cr  = self.memory_Cr.tolist ()
+            , memory_pos = self.memory_pos
+            )
+    # end def get_state
+
+    def set_state (self, genes, evaluations, state):
+        """ Restore the old population with its evaluations and the
+            state from get_state, run then continues exactly where
+            the state was saved. The population may have been reduced,
+            see reduce_population.
+        """
+        pop = PGA_OLDPOP
+        self.resize_population (np.arange (len (genes)))
+        self.pops        [pop][:] = genes
+        self.evaluations [pop][:] = evaluations
+        self.up_to_date  [pop][:] = True
+        self.GA_iter    = state ['GA_iter']
+        self.eval_count = state ['eval_count']
+        self.no_change  = state ['no_change']
+        self.rng.bit_generator.state = state ['rng']
+        self.DE_scale_factor   = state.get ('F',  self.DE_scale_factor)
+        self.DE_crossover_prob = state.get ('Cr', self.DE_crossover_prob)
+        if 'memory_pos' in state:
+            self.memory_F   [:] = state ['memory_F']
+            self.memory_Cr  [:] = state ['memory_Cr']
+            self.memory_pos     = state ['memory_pos']
+        self.initialized = True
+    # end def set_state
+
+    def print_string (self, file, p, pop):
+        genes = self.pops [pop][p]
+        for i in range (0, len (genes), 5):
+            v = ', '.join ('[%11.7g]' % g for g in genes [i:i+5])
+            print ('#%4d: %s' % (i, v), file = file)
+        print (file = file)
+    # end def print_string
+
+    def initialize (self):
+        """ Random initial population in the init range """
+        pop = PGA_OLDPOP
+        self.pops [pop][:] = self.rng.uniform \
+            (self.lo, self.hi, (self.pop_size, self.string_length))
+        self.up_to_date [pop][:] = False
+    # end def initialize
+
+    def evaluate_population (self, pop):
+        self.pre_eval (pop)
+        for p in range (self.pop_size):
+            if not self.up_to_date [pop][p]:
+                self.set_evaluation (p, pop, self.evaluate (p, pop))
+                self.eval_count += 1
+    # end def evaluate_population
+
+    def donors (self, best, idx):
+        """ Indices of base vector and the two vectors for the
+            difference for each individual in idx: All are distinct
+            and different from the individual itself (except for the
+            best individual as base vector in the best variant).
+        """
+        n    = self.pop_size
+        best_variant = self.DE_variant == PGA_DE_VARIANT_BEST
+        me   = idx [:, None]
+        r    = self.rng.integers (0, n, (len (idx), 3))
+        todo = np.ones (len (idx), dtype = bool)
+        while todo.any ():
+            if best_variant:
+                r [:, 0] = best
+            s    = np.sort (r, axis = 1)
+            bad  = (s [:, 1:] == s [:, :-1]).any (axis = 1)
+            bad |= (r [:, int (best_variant):] == me).any (axis = 1)
+            todo = bad
+            r [todo] = self.rng.integers (0, n, (np.count_nonzero (todo), 3))
+        return r
+    # end def donors
+
+    def scale_factors (self, idx):
+        """ Scale factor for each allele of each individual in idx with
+            dither and jitter (both centered around the scale factor).
+            Self-adaptive scale factors are used instead of dither.
+        """
+        n, m = len (idx), self.string_length
+        f    = np.full ((n, 1), float (self.DE_scale_factor))
+        if self.DE_self_adaptive:
+            f = self.trial_F [idx, None]
+        elif self.DE_dither:
+            if self.DE_dither_per_individual:
+                f += self.DE_dither * (self.rng.random ((n, 1)) - 0.5)
+            else:
+                f += self.DE_dither * (self.rng.random () - 0.5)
+        if self.DE_jitter:
+            f = f + self.DE_jitter * (self.rng.random ((n, m)) - 0.5)
+        return f
+    # end def scale_factors
+
+    def crossover_mask (self, idx):
+        """ Alleles taken from the mutant vector for the individuals
+            in idx
+        """
+        n, m = len (idx), self.string_length
+        cr   = self.DE_crossover_prob
+        if self.DE_self_adaptive:
+            cr = self.trial_Cr [idx, None]
+        if self.DE_crossover_type == PGA_DE_CROSSOVER_EXP:
+            start  = self.rng.integers (0, m, n)
+            # Number of consecutive alleles, at least one
+            more   = self.rng.random ((n, m - 1)) < cr
+            length = 1 + np.cumprod (more, axis = 1).sum (axis = 1)
+            pos    = (np.arange (m) - start [:, None]) % m
+            return pos < length [:, None]
+        mask = self.rng.random ((n, m)) < cr
+        mask [np.arange (n), self.rng.integers (0, m, n)] = True
+        return mask
+    # end def crossover_mask
+
+    def trial_vectors (self, idx):
+        """ Trial vectors for the individuals idx of the old population
+            (one per row).
+        """
+        pop   = self.pops [PGA_OLDPOP]
+        old   = pop [idx]
+        r     = self.donors (self.get_best_index (PGA_OLDPOP), idx)
+        f     = self.scale_factors (idx)
+        base  = pop [r [:, 0]]
+        diff  = pop [r [:, 1]] - pop [r [:, 2]]
+        if self.DE_variant == PGA_DE_VARIANT_EITHER_OR:
+            k = self.DE_aux_factor
+            if k is None:
+                k = 0.5 * (f + 1)
+            eo    = self.rng.random ((len (idx), 1))
+            eo    = eo < self.DE_probability_EO
+            recom = pop [r [:, 1]] + pop [r [:, 2]] - 2 * base
+            trial = np.where (eo, base + f * diff, base + k * recom)
+        else:
+            trial = np.where \
+                (self.crossover_mask (idx), base + f * diff, old)
+        if self.mutation_bounce_back:
+            # A random value between the parent and the violated bound
+            u     = self.rng.random (trial.shape)
+            lo    = old + u * (self.lo - old)
+            hi    = old + u * (self.hi - old)
+            trial = np.where (trial < self.lo, lo, trial)
+            trial = np.where (trial > self.hi, hi, trial)
+        elif self.mutation_bounded:
+            trial = np.clip (trial, self.lo, self.hi)
+        return trial
+    # end def trial_vectors
+
+    def create_trials (self):
+        """ Create the new population of trial vectors """
+        if self.DE_self_adaptive:
+            self.adapt_parameters ()
+        idx = np.arange (self.pop_size)
+        self.pops [PGA_NEWPOP][:] = self.trial_vectors (idx)
+        self.up_to_date [PGA_NEWPOP][:] = False
+    # end def create_trials
+
+    def adapt_parameters (self):
+        """ Scale factor and crossover rate of each trial vector from
+            a random entry of the success history: The scale factor is
+            Cauchy distributed around the entry (drawn again if not
+            positive, limited to 1), the crossover rate normally
+            distributed (limited to [0, 1]), both with scale 0.1.
+        """
+        n   = self.pop_size
+        k   = self.rng.integers (0, len (self.memory_F), n)
+        cr  = self.rng.normal (self.memory_Cr [k], 0.1)
+        f   = np.zeros (n)
+        bad = np.ones (n, dtype = bool)
+        while bad.any ():
+            u = self.rng.random (np.count_nonzero (bad))
+            f [bad] = self.memory_F [k [bad]] + 0.1 * np.tan (np.pi * (u - .5))
+            bad = f <= 0
+        self.trial_F  = np.minimum (f, 1.0)
+        self.trial_Cr = np.clip (cr, 0.0, 1.0)
+    # end def adapt_parameters
+
+    def update_memory (self, success):
+        """ Update the next entry of the success history from the
+            parameters of the successful trial vectors (those better
+            than their parent) weighted by their improvement: The
+            weighted Lehmer mean of the scale factors and the weighted
+            mean of the crossover rates.
+        """
+        old, new = PGA_OLDPOP, PGA_NEWPOP
+        if not success.any ():
+            return
+        w  = abs (self.evaluations [old] - self.evaluations [new]) [success]
+        if not w.sum ():
+            return
+        w  = w / w.sum ()
+        f  = self.trial_F  [success]
+        cr = self.trial_Cr [success]
+        pos = self.memory_pos
+        self.memory_F  [pos] = np.sum (w * f ** 2) / np.sum (w * f)
+        self.memory_Cr [pos] = np.sum (w * cr)
+        self.memory_pos = (pos + 1) % len (self.memory_F)
+    # end def update_memory
+
+    def resize_population (self, keep):
+        """ Keep only the individuals with the indices keep in both
+            populations.
+        """
+        for pop in PGA_OLDPOP, PGA_NEWPOP:
+            self.pops        [pop] = self.pops        [pop][keep]
+            self.evaluations [pop] = self.evaluations [pop][keep]
+            self.up_to_date  [pop] = self.up_to_date  [pop][keep]
+        self.pop_size = self.num_replace = len (keep)
+    # end def resize_population
+
+    def reduce_population (self):
+        """ Linear population size reduction: The population shrinks
+            linearly from its initial size to min_pop_size over
+            max_evaluations, the worst individuals are removed.
+        """
+        if not self.min_pop_size or not self.max_evaluations:
+            return
+        done = min (1.0, self.eval_count / self.max_evaluations)
+        n0   = self.initial_pop_size
+        n    = int (round (n0 + (self.min_pop_size - n0) * done))
+        n    = max (n, self.min_pop_size)
+        if n >= self.pop_size:
+            return
+        evs  = self.evaluations [PGA_OLDPOP]
+        if self.maximize:
+            evs = -evs
+        keep = np.sort (np.argsort (evs, kind = 'stable') [:n])
+        self.resize_population (keep)
+    # end def reduce_population
+
+    def replace (self):
+        """ Pairwise best replacement: A trial vector replaces its
+            parent if it is not worse.
+        """
+        old, new = PGA_OLDPOP, PGA_NEWPOP
+        best_ev  = self.evaluations [old][self.get_best_index (old)]
+        if self.maximize:
+            better = self.evaluations [new] >= self.evaluations [old]
+        else:
+            better = self.evaluations [new] <= self.evaluations [old]
+        if self.DE_self_adaptive:
+            self.update_memory \
+                (better & (self.evaluations [new] != self.evaluations [old]))
+        self.pops        [old][better] = self.pops        [new][better]
+        self.evaluations [old][better] = self.evaluations [new][better]
+        if self.evaluations [old][self.get_best_index (old)] == best_ev:
+            self.no_change += 1
+        else:
+            self.no_change  = 0
+    # end def replace
+
+    def replace_trials (self, idx, trials, evaluations):
+        """ Pairwise best replacement of the individuals idx of the old
+            population by trial vectors evaluated asynchronously: The
+            individual may have changed since the trial was created,
+            the trial is compared with the current individual.
+        """
+        old = PGA_OLDPOP
+        cur = self.evaluations [old][idx]
+        if self.maximize:
+            better = evaluations >= cur
+        else:
+            better = evaluations <= cur
+        self.pops        [old][idx [better]] = trials      [better]
+        self.evaluations [old][idx [better]] = evaluations [better]
+    # end def replace_trials
+
+    def report (self, file):
+        p = self.get_best_index (PGA_OLDPOP)
+        print ("Iter #     Field      Value", file = file)
+        print \
+            ( "%-11dBest       %e"
+            % (self.GA_iter, self.evaluations [PGA_OLDPOP][p])
+            , file = file
+            )
+        if PGA_REPORT_STRING in self.print_options:
+            self.print_string (file, p, PGA_OLDPOP)
+    # end def report
+
+    def end_of_generation (self, file):
+        self.GA_iter += 1
+        self.endofgen ()
+        freq = self.print_frequency
+        if freq and self.GA_iter % freq == 0:
+            self.report (file)
+    # end def end_of_generation
+
+    def run_asynchronous (self, file):
+        """ Steady-state DE: The trials of a slot replace their parents as
+            soon as the slot is done (see submit and completed). A generation
+            ends after pop_size evaluations.
+        """
+        old     = PGA_OLDPOP
+        busy    = {}
+        target  = 0
+        done    = 0
+        stop    = self.stop_cond ()
+        best_ev = self.evaluations [old][self.get_best_index (old)]
+        while True:
+            for slot in range (self.async_slots):
+                if stop or slot in busy:
+                    continue
+                idx    = np.arange (target, target + self.async_batch)
+                idx   %= self.pop_size
+                target = (target + self.async_batch) % self.pop_size
+                trials = self.trial_vectors (idx)
+                self.submit (slot, trials)
+                busy [slot] = (idx, trials)
+            if not busy:
+                break
+            for slot, evaluations in self.completed ():
+                idx, trials = busy.pop (slot)
+                self.replace_trials (idx, trials, evaluations)
+                self.eval_count += len (idx)
+                done += len (idx)
+                if done < self.pop_size:
+                    continue
+                done -= self.pop_size
+                ev = self.evaluations [old][self.get_best_index (old)]
+                if ev == best_ev:
+                    self.no_change += 1
+                else:
+                    self.no_change  = 0
+                best_ev = ev
+                self.end_of_generation (file)
+                stop = stop or self.stop_cond ()
+    # end def run_asynchronous
+
+    def run (self):
+        old, new = PGA_OLDPOP, PGA_NEWPOP
+        file = sys.stdout
+        if not self.initialized:
+            self.initialize ()
+            self.evaluate_population (old)
+            self.initialized = True
+        if self.async_slots:
+            self.run_asynchronous (file)
+        while not self.async_slots and not self.stop_cond ():
+            self.create_trials ()
+            self.evaluate_population (new)
+            self.replace ()
+            self.reduce_population ()
+            self.end_of_generation (file)
+        p = self.get_best_index (old)
+        print \
+            ( "The Best Evaluation: %e." % self.evaluations [old][p]
+            , file = file
+            )
+        print ("The Best String:", file = file)
+        self.print_string (file, p, old)
+        file.flush ()
+    # end def run
+
+# end class DE
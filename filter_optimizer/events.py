@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+""" Machine-readable stream of the progress and the result of an
+    optimization: JSON lines, one event per line. An event is a
+    dictionary with the kind of event in 'event' and its data. The
+    lines are written by a background thread which collects the
+    events queued in the meantime into a single write, so the
+    optimization does not wait for the file.
+"""
+
+import json
+import queue
+import threading
+import numpy as np
+
+def json_default (obj):
+    """ Conversion of the objects json does not know: NumPy arrays
+        and scalars and everything else (e.g. the bounds in the
+        arguments) by its string representation.
+    """
+    if isinstance (obj, np.ndarray):
+        return obj.tolist ()
+    if isinstance (obj, np.generic):
+        return obj.item ()
+    return str (obj)
+# end def json_default
+
+def is_event_line (line):
+    """ True if line (the first line of a file) starts an event stream """
+    return line.startswith ('{')
+# end def is_event_line
+
+def read_events (lines):
+    """ The events in an iterable of lines """
+    for line in lines:
+        line = line.strip ()
+        if line:
+            yield json.loads (line)
+# end def read_events
+
+class Event_Writer (object):
+    """ Append the events to the file filename in a background thread """
+
+    def __init__ (self, filename):
+        self.file   = open (filename, 'a')
+        self.queue  = queue.Queue ()
+        self.thread = threading.Thread (target = self.work, daemon = True)
+        self.thread.start ()
+    # end def __init__
+
+    def write (self, event, **data):
+        """ Queue an event of the given kind with data """
+        data ['event'] = event
+        self.queue.put (json.dumps (data, default = json_default))
+    # end def write
+
+    def work (self):
+        """ Main function of the thread, None in the queue ends it """
+        done = False
+        while not done:
+            lines = [self.queue.get ()]
+            while True:
+                try:
+                    lines.append (self.queue.get (block = False))
+                except queue.Empty:
+                    break
+            if None in lines:
+                lines = lines [:lines.index (None)]
+                done  = True
+            if lines:
+                self.file.write (''.join (l + '\n' for l in lines))
+                self.file.flush ()
+    # end def work
+
+    def close (self):
+        """ Write the queued events and close the file """
+        if self.thread.is_alive ():
+            self.queue.put (None)
+            self.thread.join ()
+            self.file.close ()
+    # end def close
+
+# end class Event_Writer
@@ -3,14 +3,48 @@
 from argparse   import ArgumentParser
 from scipy      import signal
 from bisect     import bisect
-import pga
 import sys
+import time
 import numpy as np
 from rsclib.autosuper import autosuper
 from . import filterplot
+from . import grid
+from . import response
+from . import rootcache
+from . import workers
+from . import de
+from . import checkpoint
+from . import islands
+from . import order_search
+from . import events
+from . import report
+from . import seeding
+from . import polish
+from . import restart
+# pgapack is only needed for the pga backend
+try:
+    import pga
+except ImportError:
+    pga = None
 
-class Filter_Opt (pga.PGA, autosuper):
+def select_rows (params, done):
+    """ Remove rows marked in done from the arrays in params (which
+        may be nested tuples of arrays)
+    """
+    if isinstance (params, tuple):
+        return tuple (select_rows (p, done) for p in params)
+    return params [~done]
+# end def select_rows
+
+class Filter_Opt_Mixin \
+    ( seeding.Seed_Mixin
+    , polish.Polish_Mixin
+    , restart.Restart_Mixin
+    , autosuper
+    ):
     """ Optimize a filter with differential evolution
+        The optimizer itself is a second base class with the interface
+        of pga.PGA, see Filter_Opt and Filter_Opt_DE below.
         A note on params: FIWIZ seems to use
         - A base F of 0.5
         - Dither of 0.5
@@ -30,6 +64,21 @@ class Filter_Opt (pga.PGA, autosuper):
         self.npoles     = args.poles
         self.nzeros     = args.zeros
         self.do_stop    = False
+        self.resume     = None
+        # Counts of the generations and evaluations before a resumed
+        # run if the optimizer cannot restore its counters
+        self.iter_offset = self.eval_offset = 0
+        if self.args.resume:
+            self.resume = checkpoint.read_checkpoint (self.args.checkpoint)
+            if not self.restores_counters:
+                engine = self.resume [0]['engine']
+                self.iter_offset = engine ['GA_iter']
+                self.eval_offset = engine ['eval_count']
+        # A resumed run without generations left is only reported
+        self.finished = bool \
+            (   self.args.max_generations
+            and self.iter_offset >= self.args.max_generations
+            )
         # parameters in the form radius, angle
         # first the zeros then the poles
         # All angles in the range   [0, 0.5]
@@ -42,13 +91,14 @@ class Filter_Opt (pga.PGA, autosuper):
         for k in range (self.npoles):
             ini.append ((0, 0.999))
             ini.append ((0, 0.5))
-        de_cross_type = pga.PGA_DE_CROSSOVER_BIN
+        self.init_range = np.array (ini, dtype = float)
+        de_cross_type = de.PGA_DE_CROSSOVER_BIN
         if self.args.exponential_crossover:
-            de_cross_type = pga.PGA_DE_CROSSOVER_EXP
+            de_cross_type = de.PGA_DE_CROSSOVER_EXP
         v = self.args.de_variant
         if v == 'eo':
             v = 'either_or'
-        variant = getattr (pga, 'PGA_DE_VARIANT_' + v.upper ())
+        variant = getattr (de, 'PGA_DE_VARIANT_' + v.upper ())
         f = ( self.args.scale_factor
             - (self.args.popsize * self.args.scale_with_popsize)
             )
@@ -56,16 +106,16 @@ class Filter_Opt (pga.PGA, autosuper):
             ( maximize                    = False
             , pop_size                    = self.args.popsize
             , num_replace                 = self.args.popsize
-            , print_options               = [pga.PGA_REPORT_STRING]
+            , print_options               = [de.PGA_REPORT_STRING]
             #, print_frequency             = 200
             , init                        = ini
-            , select_type                 = pga.PGA_SELECT_LINEAR
-            , pop_replace_type            = pga.PGA_POPREPL_PAIRWISE_BEST
-            #, pop_replace_type            = pga.PGA_POPREPL_RTR
+            , select_type                 = de.PGA_SELECT_LINEAR
+            , pop_replace_type            = de.PGA_POPREPL_PAIRWISE_BEST
+            #, pop_replace_type            = de.PGA_POPREPL_RTR
             #, rtr_window_size             = 2
             , mutation_bounce_back        = True
             , mutation_only               = True
-            , mutation_type               = pga.PGA_MUTATION_DE
+            , mutation_type               = de.PGA_MUTATION_DE
             , DE_variant                  = variant
             , DE_crossover_prob           = self.args.crossover_rate
             , DE_jitter                   = self.args.jitter
@@ -78,16 +128,29 @@ class Filter_Opt (pga.PGA, autosuper):
         stop = []
         if self.args.max_no_change:
             d ['max_no_change'] = self.args.max_no_change
-            stop.append (pga.PGA_STOP_NOCHANGE)
+            stop.append (de.PGA_STOP_NOCHANGE)
         if self.args.max_generations != 0:
-            stop.append (pga.PGA_STOP_MAXITER)
-            d ['max_GA_iter'] = self.args.max_generations
+            stop.append (de.PGA_STOP_MAXITER)
+            # pgapack needs at least two generations
+            d ['max_GA_iter'] = max \
+                (2, self.args.max_generations - self.iter_offset)
         # Default to max_evals if no max_generations given
         if not self.args.max_evals and not self.args.max_generations:
-            stop.append (pga.PGA_STOP_MAXITER)
+            stop.append (de.PGA_STOP_MAXITER)
             d ['max_GA_iter'] = self.args.max_generations
         if stop:
             d ['stopping_rule_types'] = stop
+        # Only supported by the numpy backend, see main
+        if self.args.self_adaptive:
+            d ['DE_self_adaptive'] = True
+            d ['DE_memory_size']   = self.args.self_adaptive_memory
+        if self.args.min_popsize:
+            d ['min_pop_size']     = self.args.min_popsize
+            d ['max_evaluations']  = self.args.max_evals
+        if self.args.asynchronous:
+            d ['async_slots']      = self.args.workers
+            d ['async_batch']      = min \
+                (self.args.async_batch, self.args.popsize // self.args.workers)
         if args.max_evals and not args.max_generations:
             d ['max_GA_iter'] = 0x7FFFFFFF
         super ().__init__ (float, 2 * (self.npoles + self.nzeros), **d)
@@ -101,19 +164,153 @@ class Filter_Opt (pga.PGA, autosuper):
             (*self.args.delay_lower_bound, is_lower = True)
         if not (self.udb or self.ldb or self.udelay or self.ldelay):
             self.default_constraints ()
-        self.dbx = list (sorted (set (np.concatenate
-            ((self.ldb.x, self.udb.x)))))
-        self.delay_x = list (sorted (set (np.concatenate
-            ((self.udelay.x, self.ldelay.x)))))
+        # The adaptive grid is modified during the run, so we need to
+        # evaluate ourselves
+        self.adaptive = self.args.adaptive_grid and self.mpi_n_proc == 1
+        self.dense    = None
+        if self.adaptive:
+            bounds = (self.udb, self.ldb, self.udelay, self.ldelay)
+            self.dense = grid.Constraint_Grid \
+                ( *(b.resample (resolution = self.args.adaptive_resolution)
+                    for b in bounds
+                   )
+                , czt_min = self.args.czt_min_points
+                )
+            self.udb, self.ldb, self.udelay, self.ldelay = \
+                (b.resample () for b in bounds)
+        # Local worker processes are only used without MPI
+        self.n_workers    = self.args.workers if self.mpi_n_proc == 1 else 0
+        self.pool         = None
+        self.grid_version = 0
+        # With a gain of 0 the optimal gain of each individual is
+        # computed, this needs the magnitude on all points
+        self.auto_gain    = not self.args.gain
+        # Early exit evaluates only in one process (it needs the
+        # evaluation of the parent) and needs evaluation by blocks
+        self.early_exit   = \
+            (   self.args.early_exit
+            and self.mpi_n_proc == 1
+            and not self.n_workers
+            and not self.auto_gain
+            )
+        self.n_early_exit   = 0
+        self.blocks_skipped = 0
+        # Local refinement of the best individual (not in parallel,
+        # it changes the old population)
+        self.polishing      = \
+            (   (self.args.polish_interval or self.args.polish_stagnation)
+            and self.mpi_n_proc == 1
+            )
+        self.n_polish       = 0
+        self.n_polished     = 0
+        self.polish_evals   = 0
+        # Restarts after stagnation (not in parallel, the restarted
+        # individuals are evaluated in stop_cond)
+        self.restarting     = \
+            (self.args.restarts > 0 and self.mpi_n_proc == 1)
+        self.n_restarts     = 0
+        self.restart_evals  = 0
+        # Communication with other islands, set by islands.Island_Model
+        self.island          = None
+        self.n_immigrants    = 0
+        self.n_accepted      = 0
+        self.migration_evals = 0
+        # Cancellation of the order search, set by order_search
+        self.cancel          = None
+        czt_min    = self.args.czt_min_points
+        block_size = 0
+        if self.early_exit:
+            czt_min    = 0
+            block_size = self.args.early_exit_block_size
+        self.grid = grid.Constraint_Grid \
+            ( self.udb, self.ldb, self.udelay, self.ldelay
+            , czt_min    = czt_min
+            , block_size = block_size
+            , auto_gain  = self.auto_gain
+            )
         # Pre-Filter, only makes sense for original example
         self.fir  = \
             [ -0.033271, -0.019816,  0.169865,  0.415454
             ,  0.415454,  0.169865, -0.019816, -0.033271
             ]
-        fir_w, self.fir_h = signal.freqz (self.fir, [1.0], self.dbx)
-        self.a0 = self.args.gain
+        self.fir_db = self.prefilter_db (self.grid.x)
+        if self.adaptive:
+            self.dense_fir_db = self.prefilter_db (self.dense.x)
+        self.a0 = self.args.gain or 1.0
+        # Batch evaluation only makes sense if we evaluate ourselves,
+        # the workers evaluate the batch
+        self.batch_eval = \
+            (   (self.args.batch_evaluation or self.n_workers)
+            and self.mpi_n_proc == 1
+            )
+        self.batch_result = {}
+        self.init_root_cache ()
+        # Evaluation on an active set needs the whole population for
+        # computing it and only makes sense for violations
+        self.active_set = \
+            (   self.args.active_set
+            and self.mpi_n_proc == 1
+            and not self.args.optimize_further
+            and not self.early_exit
+            and not self.auto_gain
+            )
+        self.seed_genes = None
+        if self.resume:
+            self.restore_checkpoint ()
+        elif self.args.seed_from or self.args.init_classical:
+            self.seed_genes = self.seed_population ()
+        # Machine-readable progress and result, see write_event
+        self.events = None
+        if self.args.events and self.mpi_rank == 0 and not self.finished:
+            self.events = events.Event_Writer (self.args.events)
+            self.events.write \
+                ( 'start'
+                , optimizer = self.__class__.__name__
+                , zeros     = self.nzeros
+                , poles     = self.npoles
+                , args      = vars (self.args)
+                )
     # end def __init__
 
+    @property
+    def generation (self):
+        return self.GA_iter + self.iter_offset
+    # end def generation
+
+    @property
+    def n_evaluations (self):
+        return \
+            ( self.eval_count + self.eval_offset + self.polish_evals
+            + self.restart_evals + self.migration_evals
+            )
+    # end def n_evaluations
+
+    def init_root_cache (self):
+        """ The root cache only works for the roots engine and is not
+            used with early exit which evaluates by blocks and with
+            workers which do not know the parents. It needs to be
+            re-created when the grid changes.
+        """
+        self.root_cache = None
+        if  ( self.args.root_cache
+            and self.args.engine == 'roots'
+            and not self.early_exit
+            and not self.n_workers
+            ):
+            self.root_cache = rootcache.Root_Cache \
+                ( self.nzeros, self.npoles, self.a0
+                , self.grid.x, self.grid.gd_idx
+                , n_slots   = self.pop_size
+                , max_bytes = self.args.root_cache_size * 1024 * 1024
+                )
+    # end def init_root_cache
+
+    def prefilter_db (self, x):
+        """ Magnitude of the pre-filter in dB at frequencies x """
+        fir_w, fir_h = signal.freqz (self.fir, [1.0], x)
+        return 20 * np.log10 (abs (fir_h))
+    # end def prefilter_db
+
     def default_constraints (self):
         self.udb = filterplot.default_upper_magnitude
         self.ldb = filterplot.default_lower_magnitude
@@ -122,76 +319,432 @@ class Filter_Opt (pga.PGA, autosuper):
     # end def default_constraints
 
     def phenotype (self, p, pop):
-        def ga (i):
-            return self.get_allele (p, pop, i)
+        genes = self.get_population (pop, [p])
+        g     = genes [0]
         # pole offset in gene
         po = 2 * self.nzeros
-        zeros = [ga (2*k)    * np.e ** (2j * np.pi * ga (2*k+1))
-                 for k in range (self.nzeros)]
-        poles = [ga (2*k+po) * np.e ** (2j * np.pi * ga (2*k+po+1))
-                 for k in range (self.npoles)]
+        zeros = list (g [0:po:2] * np.e ** (2j * np.pi * g [1:po:2]))
+        poles = list (g [po::2]  * np.e ** (2j * np.pi * g [po+1::2]))
         self.update_conjugate_complex (zeros)
         self.update_conjugate_complex (poles)
-        (b, a)  = signal.zpk2tf (zeros, poles, self.a0)
+        (b, a)  = signal.zpk2tf (zeros, poles, self.gain (genes) [0])
         return (zeros, poles, b, a)
     # end def phenotype
 
     def evaluate (self, p, pop):
-        zeros, poles, b, a = self.phenotype (p, pop)
-        wgd, gd = signal.group_delay ((b, a), self.delay_x)
-        w, h    = signal.freqz       (b, a, self.dbx)
+        if (pop, p) in self.batch_result:
+            return self.batch_result.pop ((pop, p))
+        genes = self.get_population (pop, [p])
+        return self.evaluate_individuals (genes, pop, [p]) [0]
+    # end def evaluate
+
+    def evaluate_individuals (self, genes, pop, individuals):
+        """ Evaluate the genes of the given individuals of pop with
+            early exit, on the active set of constraints or on all
+            constraints.
+        """
+        if self.early_exit:
+            return self.evaluate_cutoff (genes, self.cutoff (pop, individuals))
+        if self.grid.active is not None:
+            return self.evaluate_active (genes)
+        return self.evaluate_genes (genes, pop, individuals)
+    # end def evaluate_individuals
+
+    def filter_params (self, genes):
+        """ Parameters of the filters for a 2-dimensional array of
+            genes for the configured engine: Zeros and poles in polar
+            form for the 'roots' engine, the polynomial coefficients
+            otherwise.
+        """
+        if self.args.engine == 'roots':
+            return response.polar_roots (genes, self.nzeros, self.npoles)
+        zeros, poles = response.gene_roots (genes, self.nzeros, self.npoles)
+        b = response.poly_coefficients (zeros, self.a0)
+        a = response.poly_coefficients (poles)
+        return b, a
+    # end def filter_params
+
+    def evaluate_genes (self, genes, pop = None, individuals = None):
+        """ Evaluate a 2-dimensional array of genes (one individual per
+            row), a batch gives exactly the results of single rows. With pop
+            and individuals the root cache is used.
+        """
+        db, gd = self.full_response (genes, pop, individuals)
+        return self.grid.penalty (db, gd, self.args.optimize_further)
+    # end def evaluate_genes
+
+    def full_response (self, genes, pop = None, individuals = None):
+        """ Magnitude and group delay on the whole grid including the
+            pre-filter, see evaluate_genes for the parameters.
+        """
+        if self.root_cache and individuals is not None:
+            parents = None
+            if pop == de.PGA_NEWPOP:
+                parents = self.get_population (de.PGA_OLDPOP, individuals)
+            db, gd = self.root_cache.response (genes, individuals, parents)
+        else:
+            db, gd = self.grid_response (self.grid, genes)
         if self.args.use_prefilter:
-            hf  = self.fir_h * h
+            db += self.fir_db
+        return db, gd
+    # end def full_response
+
+    def gain (self, genes):
+        """ Gain of the filters for a 2-dimensional array of genes:
+            The optimal gain on the grid if the gain is computed for
+            each individual, the configured gain otherwise.
+        """
+        if not self.auto_gain:
+            return np.full (len (genes), self.a0)
+        db, gd = self.full_response (genes)
+        v = db [:, self.grid.db_idx]
+        return self.a0 * 10 ** (self.grid.gain_offset (v) / 20)
+    # end def gain
+
+    def evaluate_rows (self, genes):
+        """ Evaluate genes (one individual per row) on the active set
+            or on all constraints, this does not need any information
+            about the individuals and is used by the workers.
+        """
+        if self.grid.active is not None:
+            return self.evaluate_active (genes)
+        return self.evaluate_genes (genes)
+    # end def evaluate_rows
+
+    def worker_pool (self):
+        """ The pool of workers, the workers have a copy of the grid,
+            so they are re-created after a change of the grid.
+        """
+        if self.pool and self.pool_grid != self.grid_version:
+            self.pool.close ()
+            self.pool = None
+        if not self.pool:
+            self.pool = workers.Worker_Pool \
+                ( self.evaluate_rows, self.n_workers
+                , self.pop_size, 2 * (self.npoles + self.nzeros)
+                )
+            self.pool_grid = self.grid_version
+        return self.pool
+    # end def worker_pool
+
+    def evaluate_active (self, genes):
+        """ Evaluate genes (one individual per row) on the active set
+            of constraints only. The result is exact if the inactive
+            constraints are not violated, otherwise it is too low.
+        """
+        g      = self.grid
+        db, gd = self.block_response (self.filter_params (genes), g.active)
+        return g.deviation_penalty (g.active_deviation (db, gd))
+    # end def evaluate_active
+
+    def reevaluate (self):
+        """ Re-evaluate the old population on all constraints, this is
+            needed after a change of the grid and for checking the
+            evaluations on the active set. Computes the new active set.
+        """
+        ps     = list (range (self.pop_size))
+        genes  = self.get_population (de.PGA_OLDPOP, ps)
+        db, gd = self.full_response (genes, de.PGA_OLDPOP, ps)
+        d      = self.grid.deviation (db, gd)
+        evs    = self.grid.deviation_penalty (d, self.args.optimize_further)
+        if self.active_set:
+            self.grid.update_active (d, self.args.active_set_margin)
+        self.grid_version += 1
+        for p, e in zip (ps, evs):
+            self.set_evaluation (p, de.PGA_OLDPOP, e)
+    # end def reevaluate
+
+    def grid_response (self, g, genes):
+        """ Magnitude and group delay of genes (one individual per
+            row) on the Constraint_Grid g (without pre-filter).
+        """
+        if self.args.engine == 'roots':
+            zeros, poles = self.filter_params (genes)
+            return response.root_response \
+                (zeros, poles, self.a0, g.x, g.gd_idx)
+        if self.args.engine == 'scipy':
+            b, a = self.filter_params (genes)
+            return response.scipy_response (b, a, g.x, g.gd_idx)
+        return g.poly_response (*self.filter_params (genes))
+    # end def grid_response
+
+    def best_individuals (self, n):
+        """ Indices of the n best individuals of the old population """
+        ge  = self.get_evaluation
+        evs = [ge (p, de.PGA_OLDPOP) for p in range (self.pop_size)]
+        return np.argsort (evs, kind = 'stable') [:n]
+    # end def best_individuals
+
+    def refine_grid (self, individuals):
+        """ Check the given individuals of the old population on the
+            dense grid and insert the points where a violation peaks
+            into the bounds. If there are new points, the grid is
+            recompiled and the old population is re-evaluated. Returns
+            the number of new points.
+        """
+        genes  = self.get_population (de.PGA_OLDPOP, individuals)
+        db, gd = self.grid_response (self.dense, genes)
+        if self.args.use_prefilter:
+            db += self.dense_fir_db
+        if self.auto_gain:
+            db += 20 * np.log10 (self.gain (genes) / self.a0) [:, None]
+        bounds = (self.udb, self.ldb, self.udelay, self.ldelay)
+        n = 0
+        for b, (x, y) in zip (bounds, self.dense.active_points (db, gd)):
+            n += b.insert (x, y)
+        if n:
+            self.compile_grid ()
+            self.reevaluate ()
+        return n
+    # end def refine_grid
+
+    def compile_grid (self):
+        """ Recompile the grid after a change of the bounds """
+        self.grid.compile ()
+        self.fir_db = self.prefilter_db (self.grid.x)
+        self.init_root_cache ()
+    # end def compile_grid
+
+    def write_checkpoint (self):
+        """ Write the old population with its evaluations and all
+            state needed for continuing the run to the checkpoint file.
+            With an adaptive grid this includes the points of the
+            bounds, with an active set the active constraints.
+        """
+        pop    = self.checkpoint_pop
+        ge     = self.get_evaluation
+        arrays = dict \
+            ( genes       = self.get_population (pop)
+            , evaluations = [ge (p, pop) for p in range (self.pop_size)]
+            )
+        if self.adaptive:
+            bounds = (self.udb, self.ldb, self.udelay, self.ldelay)
+            for k, b in enumerate (bounds):
+                arrays ['bound_x%d' % k] = b.x
+                arrays ['bound_y%d' % k] = b.y
+        if self.active_set:
+            arrays ['n_violated'] = self.grid.n_violated
+            if self.grid.active is not None:
+                arrays ['active'] = self.grid.active.cidx
+        state = dict \
+            ( optimizer      = self.__class__.__name__
+            , engine         = self.get_state ()
+            , stag_count     = self.stag_count
+            , last_best      = float (self.last_best)
+            , n_early_exit   = int (self.n_early_exit)
+            , blocks_skipped = int (self.blocks_skipped)
+            , n_polish       = self.n_polish
+            , n_polished     = self.n_polished
+            , polish_evals   = self.polish_evals
+            , n_restarts     = self.n_restarts
+            , restart_evals  = self.restart_evals
+            )
+        checkpoint.write_checkpoint (self.args.checkpoint, state, **arrays)
+    # end def write_checkpoint
+
+    def restore_checkpoint (self):
+        """ Restore the state saved by write_checkpoint """
+        state, arrays = self.resume
+        genes = arrays ['genes']
+        # The population may have been reduced (--min-popsize)
+        if  ( state ['optimizer'] != self.__class__.__name__
+            or genes.shape [1] != self.string_length
+            or len (genes) > self.pop_size
+            ):
+            raise ValueError \
+                ( "Checkpoint %s does not match backend or filter order"
+                % self.args.checkpoint
+                )
+        self.stag_count     = state ['stag_count']
+        self.last_best      = state ['last_best']
+        self.n_early_exit   = state ['n_early_exit']
+        self.blocks_skipped = state ['blocks_skipped']
+        self.n_polish       = state.get ('n_polish',     0)
+        self.n_polished     = state.get ('n_polished',   0)
+        self.polish_evals   = state.get ('polish_evals', 0)
+        self.n_restarts     = state.get ('n_restarts',    0)
+        self.restart_evals  = state.get ('restart_evals', 0)
+        if self.adaptive and 'bound_x0' in arrays:
+            bounds = (self.udb, self.ldb, self.udelay, self.ldelay)
+            for k, b in enumerate (bounds):
+                b.insert (arrays ['bound_x%d' % k], arrays ['bound_y%d' % k])
+            self.compile_grid ()
+        if self.active_set and 'n_violated' in arrays:
+            self.grid.n_violated [:] = arrays ['n_violated']
+            if 'active' in arrays:
+                self.grid.active = grid.Constraint_Block \
+                    (self.grid, arrays ['active'])
+        self.set_state (genes, arrays ['evaluations'], state ['engine'])
+        self.resume = None
+    # end def restore_checkpoint
+
+    def migrate (self):
+        """ Exchange the --migrants best individuals of the old
+            population with the other islands. The immigrants are
+            evaluated here (the islands may have different grids) and
+            replace the worst individuals if they are better. Returns
+            False if another island has met the constraints.
+        """
+        pop   = de.PGA_OLDPOP
+        epoch = self.generation // self.args.migration_interval
+        best  = self.best_individuals (self.args.migrants)
+        genes = self.island.migrate (epoch, self.get_population (pop, best))
+        if genes is None:
+            return False
+        if not len (genes):
+            return True
+        evs   = self.evaluate_genes (genes)
+        order = np.argsort (evs, kind = 'stable')
+        worst = self.best_individuals (self.pop_size) [::-1]
+        self.migration_evals += len (genes)
+        self.n_immigrants    += len (genes)
+        for p, k in zip (worst, order):
+            if evs [k] < self.get_evaluation (p, pop):
+                self.set_population (pop, genes [k:k+1], [p])
+                self.set_evaluation (p, pop, evs [k])
+                self.n_accepted += 1
+        return True
+    # end def migrate
+
+    def block_response (self, params, block):
+        """ Magnitude and group delay for a Constraint_Block, params
+            are the result of filter_params.
+        """
+        if self.args.engine == 'roots':
+            zeros, poles = params
+            db, gd = response.root_response \
+                (zeros, poles, self.a0, block.x, block.gd_sel)
+        elif self.args.engine == 'scipy':
+            b, a   = params
+            db, gd = response.scipy_response (b, a, block.x, block.gd_sel)
         else:
-            hf  = h
-        db      = 20 * np.log10 (abs (hf))
-        dbdict  = dict ((x, y) for x, y in zip (self.dbx, db))
-        dldict  = dict ((x, y) for x, y in zip (self.delay_x, gd))
-
-        evf = 0.0
-        ev  = 0.0
-        for xb, yb in self.udb:
-            if dbdict [xb] > yb:
-                ev += (dbdict [xb] - yb) ** 2
-            elif self.args.optimize_further and not ev:
-                evf += min (abs (dbdict [xb] - yb) ** 0.5, 1.0)
-        for xb, yb in self.ldb:
-            if dbdict [xb] < yb:
-                ev += (dbdict [xb] - yb) ** 2
-            elif self.args.optimize_further and not ev:
-                evf += min (abs (dbdict [xb] - yb) ** 0.5, 1.0)
-        delaydelta = None
-        # Shift the curve so that it touches the upper delay delta
-        for xb, yb in self.udelay:
-            delta = dldict [xb] - yb
-            if delaydelta is None or delta > delaydelta:
-                delaydelta = delta
-        # Check where the curve underflows the lower delay delta
-        for xb, yb in self.ldelay:
-            if dldict [xb] - delaydelta < yb:
-                ev += (dldict [xb] - delaydelta - yb) ** 2
-            elif self.args.optimize_further and not ev:
-                evf += abs (dldict [xb] - delaydelta - yb) ** 0.5
-        if self.args.optimize_further and not ev:
-            return -evf
+            b, a  = params
+            e, ed = block.basis (max (b.shape [1], a.shape [1]))
+            db, gd = response.poly_response (b, a, e, ed, block.gd_sel)
+        if self.args.use_prefilter:
+            db += self.fir_db [block.cols]
+        return db, gd
+    # end def block_response
+
+    def cutoff (self, pop, individuals):
+        """ With pairwise best replacement a new individual only needs
+            to be better than its parent (the individual with the same
+            index in the old population).
+        """
+        if pop != de.PGA_NEWPOP:
+            return np.full (len (individuals), np.inf)
+        ge = self.get_evaluation
+        return np.array ([ge (p, de.PGA_OLDPOP) for p in individuals])
+    # end def cutoff
+
+    def evaluate_cutoff (self, genes, cutoff):
+        """ Evaluate genes block by block, an individual whose penalty
+            exceeds its cutoff is dropped with its partial penalty. Complete
+            evaluations are exactly those of evaluate_genes.
+        """
+        g      = self.grid
+        params = self.filter_params (genes)
+        d      = np.zeros ((len (genes), len (g.y)))
+        ev     = np.zeros (len (genes))
+        act    = np.arange (len (genes))
+        # A negative evaluation (with optimize_further) is only
+        # possible without violations
+        cutoff = np.maximum (cutoff, 0)
+        blocks = sorted (g.blocks, key = lambda b: -b.rate)
+        for n, block in enumerate (blocks):
+            db, gd = self.block_response (params, block)
+            bd = block.deviation (db, gd)
+            d  [act [:, None], block.cidx] = bd
+            ev [act] += np.sum (np.where (bd > 0, bd ** 2, 0), axis = 1)
+            done = ev [act] > cutoff [act]
+            if done.any ():
+                nd = np.count_nonzero (done)
+                self.n_early_exit   += nd
+                self.blocks_skipped += nd * (len (blocks) - n - 1)
+                act    = act [~done]
+                params = select_rows (params, done)
+                if not len (act):
+                    break
+        ev [act] = g.deviation_penalty (d [act], self.args.optimize_further)
         return ev
-    # end def evaluate
+    # end def evaluate_cutoff
+
+    def run (self):
+        self.run_start = time.time ()
+        self.run_evals = self.n_evaluations
+        try:
+            self.__super.run ()
+        finally:
+            if self.pool:
+                self.pool.close ()
+                self.pool = None
+            if self.events:
+                self.events.close ()
+                self.events = None
+    # end def run
+
+    def endofgen (self):
+        if  ( self.args.checkpoint
+            and self.mpi_rank == 0
+            and self.generation % self.args.checkpoint_interval == 0
+            ):
+            self.write_checkpoint ()
+    # end def endofgen
 
     def stop_cond (self):
-        best_idx = self.get_best_index (pga.PGA_OLDPOP)
-        best_ev  = self.get_evaluation (best_idx, pga.PGA_OLDPOP)
-        if not self.args.optimize_further and best_ev == 0:
+        verified = False
+        if self.active_set and self.generation % self.args.active_set == 0:
+            self.reevaluate ()
+            verified = True
+        if  ( self.adaptive
+            and self.generation
+            and self.generation % self.args.adaptive_interval == 0
+            ):
+            self.refine_grid (self.best_individuals (self.args.adaptive_best))
+        if self.polish_due ():
+            self.polish (self.get_best_index (de.PGA_OLDPOP))
+        if self.cancel is not None and self.cancel.is_set ():
             self.do_stop = True
             return True
-        if self.args.max_evals and self.eval_count >= self.args.max_evals:
+        if self.island:
+            iv = self.args.migration_interval
+            if  ( self.island.stopped ()
+                or self.island.exhausted (self.n_evaluations)
+                or self.island.migrating
+                and self.generation and self.generation % iv == 0
+                and not self.migrate ()
+                ):
+                self.do_stop = True
+                return True
+        best_idx = self.get_best_index (de.PGA_OLDPOP)
+        best_ev  = self.get_evaluation (best_idx, de.PGA_OLDPOP)
+        while not self.args.optimize_further and best_ev == 0:
+            # Evaluations on the active set may miss violations, with
+            # an adaptive grid the spec must be met on the dense grid
+            if self.active_set and not verified:
+                self.reevaluate ()
+                verified = True
+            elif not self.adaptive or not self.refine_grid ([best_idx]):
+                self.do_stop = True
+                return True
+            best_idx = self.get_best_index (de.PGA_OLDPOP)
+            best_ev  = self.get_evaluation (best_idx, de.PGA_OLDPOP)
+        max_evals = self.args.max_evals
+        if max_evals and self.n_evaluations >= max_evals:
             self.do_stop = True
             return True
-        # Experimental early stopping when stagnating
-        if self.last_best - best_ev < self.last_best / 500:
+        # Stagnation: Restart or stop the run
+        improvement = self.args.stagnation_improvement
+        if self.last_best - best_ev < self.last_best * improvement:
             self.stag_count += 1
-            if self.stag_count >= 200:
-                self.do_stop = True
-                return True
+            sg = self.args.stagnation_generations
+            if sg and self.stag_count >= sg:
+                if  ( not self.restarting
+                    or self.n_restarts >= self.args.restarts
+                    ):
+                    self.do_stop = True
+                    return True
+                self.restart ()
         else:
             self.stag_count = 0
         self.last_best = best_ev
@@ -207,35 +760,50 @@ class Filter_Opt (pga.PGA, autosuper):
     # end def update_conjugate_complex
 
     def pre_eval (self, pop):
-        if not self.args.sort_population:
-            return
-        ga  = self.get_allele
-        # Unpack gene into pairs (angle, radius)
-        for p in range (self.pop_size):
-            zeros = \
-                [( ga (p, pop, 2*i + 1)
-                 , ga (p, pop, 2*i)
-                 )
-                 for i in range (self.nzeros)
-                ]
-            poles = \
-                [( ga (p, pop, 2*i + 2*self.nzeros + 1)
-                 , ga (p, pop, 2*i + 2*self.nzeros)
-                 )
-                 for i in range (self.npoles)
-                ]
-            # Sort by angle/radius
-            zeros = list (sorted (zeros))
-            poles = list (sorted (poles))
-            # re-pack into gene
-            for i in range (self.nzeros):
-                self.set_allele (p, pop, 2*i,   zeros [i][1])
-                self.set_allele (p, pop, 2*i+1, zeros [i][0])
-            for i in range (self.npoles):
-                self.set_allele (p, pop, 2*i + 2*self.nzeros,   poles [i][1])
-                self.set_allele (p, pop, 2*i + 2*self.nzeros+1, poles [i][0])
+        if self.seed_genes is not None and pop == de.PGA_OLDPOP:
+            seeds = self.seed_genes
+            self.seed_genes = None
+            self.set_population (pop, seeds, range (len (seeds)))
+        if self.args.sort_population:
+            self.sort_population (pop)
+        if self.batch_eval:
+            self.evaluate_batch (pop)
     # end def pre_eval
 
+    def evaluate_batch (self, pop):
+        """ Evaluate all individuals of pop that are not up-to-date in
+            one go, the evaluate method picks up the results.
+        """
+        ps  = [ p for p in range (self.pop_size)
+                if not self.get_evaluation_up_to_date (p, pop)
+              ]
+        self.batch_result = {}
+        if ps:
+            genes = self.get_population (pop, ps)
+            if self.n_workers:
+                evs = self.worker_pool ().evaluate (genes)
+            else:
+                evs = self.evaluate_individuals (genes, pop, ps)
+            self.batch_result = dict (((pop, p), e) for p, e in zip (ps, evs))
+    # end def evaluate_batch
+
+    def sort_population (self, pop):
+        """ Sort the (radius, angle) pairs of zeros and poles of each
+            individual by angle and radius. This does not change the
+            filter, so evaluations stay valid.
+        """
+        genes = self.get_population (pop)
+        # Unpack genes into pairs (radius, angle)
+        pairs = genes.reshape (len (genes), -1, 2).copy ()
+        po    = self.nzeros
+        for part in pairs [:, :po], pairs [:, po:]:
+            idx = np.lexsort ((part [..., 0], part [..., 1]), axis = -1)
+            part [:] = np.take_along_axis (part, idx [..., None], axis = 1)
+        sorted_genes = pairs.reshape (genes.shape)
+        changed = np.flatnonzero ((sorted_genes != genes).any (axis = 1))
+        self.set_population (pop, sorted_genes [changed], changed)
+    # end def sort_population
+
     def _print (self, f, p, pop, n, offset):
         for k in range (n):
             e = ', '
@@ -246,22 +814,115 @@ class Filter_Opt (pga.PGA, autosuper):
     # end def _print
 
     def print_args (self, file):
-        l = 0
-        for k in self.args.__dict__:
-            if len (k) > l:
-                l = len (k)
-        for k in sorted (self.args.__dict__):
-            v = self.args.__dict__ [k]
-            print (('%%-%ds: %%s' % l) % (k, v), file = file)
+        report.print_args (file, self.args)
     # end def print_args
 
+    def write_event (self, p, pop):
+        """ Write the statistics of the generation with the best
+            individual p of pop to the --events stream, at the end of
+            the run the result with the arguments instead (this closes
+            the stream).
+        """
+        genes = self.get_population (pop, [p])
+        ge    = self.get_evaluation
+        ev    = ge (p, pop)
+        data  = dict \
+            ( generation  = self.generation
+            , evaluations = self.n_evaluations
+            , evaluation  = ev
+            , gene        = genes [0]
+            )
+        if not self.do_stop:
+            evs = [ge (q, pop) for q in range (self.pop_size)]
+            self.events.write \
+                ( 'generation'
+                , stag  = self.stag_count
+                , mean  = np.mean (evs)
+                , worst = np.max (evs)
+                , **data
+                )
+            return
+        self.events.write \
+            ( 'result'
+            , success = bool (ev == 0)
+            , zeros   = self.nzeros
+            , poles   = self.npoles
+            , gain    = self.gain (genes) [0]
+            , args    = vars (self.args)
+            , **data
+            )
+        self.events.close ()
+        self.events = None
+    # end def write_event
+
     def print_string (self, f, p, pop):
         #zeros, poles, b, a = self.phenotype (p, pop)
         print \
             ( "Iter: %s Evals: %s Stag: %s"
-            % (self.GA_iter, self.eval_count, self.stag_count)
+            % (self.generation, self.n_evaluations, self.stag_count)
             , file = f
             )
+        if self.auto_gain:
+            genes = self.get_population (pop, [p])
+            print ("Gain: %.10g" % self.gain (genes) [0], file = f)
+        if self.early_exit:
+            print \
+                ( "Early exit: %s Blocks skipped: %s"
+                % (self.n_early_exit, self.blocks_skipped)
+                , file = f
+                )
+        if self.adaptive:
+            print ("Grid points: %s" % len (self.grid.x), file = f)
+        if self.pool:
+            rate = (self.n_evaluations - self.run_evals) \
+                 / (time.time () - self.run_start)
+            print \
+                ( "Workers: %s Utilization: %.1f%% Evaluations/s: %.1f"
+                % (self.n_workers, 100 * self.pool.utilization (), rate)
+                , file = f
+                )
+        if self.polishing:
+            print \
+                ( "Polished: %s Improved: %s Polish evaluations: %s"
+                % (self.n_polish, self.n_polished, self.polish_evals)
+                , file = f
+                )
+        if self.args.self_adaptive or self.args.min_popsize:
+            print \
+                ( "Popsize: %s Memory F: %.4f Cr: %.4f"
+                % ( self.pop_size
+                  , np.mean (self.memory_F), np.mean (self.memory_Cr)
+                  )
+                , file = f
+                )
+        if self.island and self.island.migrating:
+            print \
+                ( "Immigrants: %s Accepted: %s"
+                % (self.n_immigrants, self.n_accepted)
+                , file = f
+                )
+        if self.restarting:
+            print \
+                ( "Restarts: %s Restart evaluations: %s"
+                % (self.n_restarts, self.restart_evals)
+                , file = f
+                )
+        if self.active_set:
+            n = len (self.grid.y)
+            if self.grid.active is not None:
+                n = len (self.grid.active.cidx)
+            print \
+                ( "Active constraints: %s of %s" % (n, len (self.grid.y))
+                , file = f
+                )
+        if self.root_cache:
+            print \
+                ( "Roots computed: %s Roots reused: %s"
+                % (self.root_cache.n_roots, self.root_cache.n_reuse)
+                , file = f
+                )
+        if self.events:
+            self.write_event (p, pop)
         if self.do_stop:
             self.print_args (f)
         #print ('params.append \\', file = f)
@@ -279,9 +940,154 @@ class Filter_Opt (pga.PGA, autosuper):
         f.flush ()
     # end def print_string
 
-# end class Filter_Opt
+# end class Filter_Opt_Mixin
+
+if pga:
+    # The pgapack backend is only available if pga can be imported
+    class Filter_Opt (Filter_Opt_Mixin, pga.PGA):
+        """ Filter optimizer using pgapack """
+
+        # pgapack does not allow setting its counters and calls endofgen
+        # before the new population becomes the old population
+        restores_counters = False
+        checkpoint_pop    = pga.PGA_NEWPOP
+
+        def __init__ (self, args):
+            self.restored = None
+            self.__super.__init__ (args)
+        # end def __init__
+
+        def get_population (self, pop, individuals = None):
+            """ Genes of the given individuals (default all) of pop as a
+                2-dimensional array, one row per individual. Like
+                de.DE.get_population but pgapack only allows access to
+                single alleles.
+            """
+            if individuals is None:
+                individuals = range (self.pop_size)
+            ga = self.get_allele
+            n  = self.string_length
+            return np.array \
+                ([[ga (p, pop, i) for i in range (n)] for p in individuals])
+        # end def get_population
+
+        def set_population (self, pop, genes, individuals = None):
+            """ Set the genes of the given individuals (default all) of
+                pop from the rows of genes.
+            """
+            if individuals is None:
+                individuals = range (self.pop_size)
+            sa = self.set_allele
+            for p, g in zip (individuals, genes):
+                for i, v in enumerate (g):
+                    sa (p, pop, i, float (v))
+        # end def set_population
+
+        def get_state (self):
+            """ The state of the random number generator of pgapack is
+                not accessible, only the counters are saved, so a resumed
+                run continues with different random numbers.
+            """
+            return dict \
+                ( GA_iter    = self.generation
+                , eval_count = self.eval_count + self.eval_offset
+                )
+        # end def get_state
+
+        def restart_engine (self, rng):
+            """ pgapack does not allow changing the random seed or the DE
+                parameters of a running optimization.
+            """
+            return {}
+        # end def restart_engine
+
+        def set_state (self, genes, evaluations, state):
+            """ The population is created by pgapack when running, it is
+                replaced with genes before it is evaluated in pre_eval.
+                The counters are offsets, see Filter_Opt_Mixin.__init__.
+            """
+            self.restored = (genes, evaluations)
+        # end def set_state
+
+        def run (self):
+            """ A resumed run without generations left is not run
+                again, the best individual of the checkpoint is
+                reported.
+            """
+            if not self.finished:
+                self.__super.run ()
+                return
+            genes, evaluations = self.restored
+            p = int (np.argmin (evaluations))
+            result = dict \
+                ( genes      = genes [p]
+                , evaluation = float (evaluations [p])
+                , gain       = self.gain (genes [p:p+1]) [0]
+                , stag       = self.stag_count
+                )
+            if self.mpi_rank == 0:
+                report.print_result \
+                    ( sys.stdout, result, self.args
+                    , self.generation, self.n_evaluations
+                    , self.__class__.__name__
+                    )
+        # end def run
+
+        def pre_eval (self, pop):
+            if self.restored is not None and pop == pga.PGA_OLDPOP:
+                genes, evaluations = self.restored
+                self.restored = None
+                self.set_population (pop, genes)
+                for p, e in enumerate (evaluations):
+                    self.set_evaluation (p, pop, float (e))
+            self.__super.pre_eval (pop)
+        # end def pre_eval
+
+    # end class Filter_Opt
+
+class Filter_Opt_DE (Filter_Opt_Mixin, de.DE):
+    """ Filter optimizer using the differential evolution on NumPy
+        arrays in this package.
+    """
+
+    restores_counters = True
+    checkpoint_pop    = de.PGA_OLDPOP
+
+    def restart_engine (self, rng):
+        """ With --restart-reseed the random number generator is seeded
+            with a new seed drawn from rng, with
+            --restart-vary-parameters a new scale factor and crossover
+            rate are drawn uniformly from [0.5, 1] (with
+            --self-adaptive the success history is reset to these).
+            Returns the changed settings for the log and the events.
+        """
+        changed = {}
+        if self.args.restart_reseed:
+            seed     = int (rng.integers (1, 1 << 31))
+            self.rng = np.random.default_rng (seed)
+            changed ['Seed'] = seed
+        if self.args.restart_vary_parameters:
+            self.DE_scale_factor   = rng.uniform (0.5, 1.0)
+            self.DE_crossover_prob = rng.uniform (0.5, 1.0)
+            self.memory_F  [:] = self.DE_scale_factor
+            self.memory_Cr [:] = self.DE_crossover_prob
+            changed ['F']  = self.DE_scale_factor
+            changed ['Cr'] = self.DE_crossover_prob
+        return changed
+    # end def restart_engine
+
+    def submit (self, slot, genes):
+        self.worker_pool ().submit (slot, genes)
+    # end def submit
 
-def main ():
+    def completed (self):
+        return self.worker_pool ().completed ()
+    # end def completed
+
+# end class Filter_Opt_DE
+
+def options ():
+    """ The command line parser of filter-optimizer """
     constraint_text = \
         """ gets 4 mandatory parameters separated with comma: min-x,
             max-x, min-y, max-y and two optional parameters: The number of
@@ -293,12 +1099,117 @@ def main ():
             This option can be specified multiple times.
         """
     cmd = ArgumentParser ()
+    cmd.add_argument \
+        ( '--active-set'
+        , help    = "Evaluate constraints that are far from being"
+                    " violated only every ACTIVE_SET generations, 0 turns"
+                    " this off, default=%(default)s; only used when not"
+                    " running in parallel and without --optimize-further"
+                    " and --early-exit"
+        , type    = int
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--active-set-margin'
+        , help    = "Constraints within this distance of the bound (in"
+                    " dB or samples) are active with --active-set,"
+                    " default=%(default)s"
+        , type    = float
+        , default = 0.0
+        )
+    cmd.add_argument \
+        ( '--adaptive-grid'
+        , help    = "Start with the regular points of the constraints"
+                    " (without additional points) and add points where"
+                    " the best individuals violate the constraints on a"
+                    " dense grid, only used when not running in parallel"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--adaptive-best'
+        , help    = "Number of best individuals checked on the dense"
+                    " grid with --adaptive-grid, default=%(default)s"
+        , type    = int
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '--adaptive-interval'
+        , help    = "Generations between checks on the dense grid with"
+                    " --adaptive-grid, default=%(default)s"
+        , type    = int
+        , default = 50
+        )
+    cmd.add_argument \
+        ( '--adaptive-resolution'
+        , help    = "Points of the dense grid are at most 0.5/resolution"
+                    " apart (relative to the sampling frequency) with"
+                    " --adaptive-grid, default=%(default)s"
+        , type    = int
+        , default = 4096
+        )
+    cmd.add_argument \
+        ( '--async-batch'
+        , help    = "Number of trial vectors evaluated together by a"
+                    " worker with --asynchronous, default=%(default)s"
+        , type    = int
+        , default = 4
+        )
+    cmd.add_argument \
+        ( '--asynchronous'
+        , help    = "Steady-state DE without waiting for the whole"
+                    " generation: As soon as a worker is done its trial"
+                    " vectors replace their parents and the worker gets"
+                    " new trial vectors (see --async-batch); needs"
+                    " --backend numpy and --workers, not with"
+                    " --adaptive-grid, --active-set, --self-adaptive,"
+                    " --min-popsize and --sort-population, the result"
+                    " depends on the timing"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--backend'
+        , help    = "Optimizer backend: 'pga' uses pgapack (also"
+                    " running in parallel with MPI), 'numpy' the"
+                    " differential evolution on NumPy arrays in this"
+                    " package, default=%(default)s"
+        , choices = ('pga', 'numpy')
+        , default = 'pga'
+        )
+    cmd.add_argument \
+        ( '--batch-evaluation'
+        , help    = "Evaluate a whole generation at once, only used"
+                    " when not running in parallel"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--checkpoint'
+        , help    = "Write a checkpoint of the run to this file every"
+                    " --checkpoint-interval generations, see --resume"
+        )
+    cmd.add_argument \
+        ( '--checkpoint-interval'
+        , help    = "Generations between checkpoints, default=%(default)s"
+        , type    = int
+        , default = 100
+        )
     cmd.add_argument \
         ( '--crossover-rate'
         , help    = "Rate of DE crossover, default=%(default)s"
         , type    = float
         , default = 1.0
         )
+    cmd.add_argument \
+        ( '--czt-min-points'
+        , help    = "Uniformly spaced constraint segments with at least"
+                    " this many points are evaluated with a chirp-z"
+                    " transform (polynomial engine only), 0 turns this"
+                    " off, default=%(default)s"
+        , type    = int
+        , default = 256
+        )
     cmd.add_argument \
         ( '--de-variant'
         , help    = "Variant of DE algorithm, "
@@ -330,6 +1241,41 @@ def main ():
         , default = True
         , action  = 'store_false'
         )
+    cmd.add_argument \
+        ( '--early-exit'
+        , help    = "Stop evaluating a new individual as soon as it is"
+                    " worse than its parent, only used when not running"
+                    " in parallel"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--early-exit-block-size'
+        , help    = "Number of magnitude constraint points evaluated"
+                    " together with --early-exit, default=%(default)s"
+        , type    = int
+        , default = 64
+        )
+    cmd.add_argument \
+        ( '--engine'
+        , help    = "Engine for computing magnitude and group delay:"
+                    " 'polynomial' evaluates the transfer function"
+                    " polynomials, 'roots' computes directly from the"
+                    " poles and zeros (numerically more stable for high"
+                    " orders), 'scipy' evaluates each filter with"
+                    " scipy.signal.freqz and group_delay (slow, the"
+                    " reference for the other engines),"
+                    " default=%(default)s"
+        , choices = ('polynomial', 'roots', 'scipy')
+        , default = 'polynomial'
+        )
+    cmd.add_argument \
+        ( '--events'
+        , help    = "Append a machine-readable stream of the progress"
+                    " and the result (JSON, one event per line) to this"
+                    " file, it can be read by filter-show-from-log and"
+                    " filter-parse-result"
+        )
     cmd.add_argument \
         ( '--exponential-crossover'
         , help    = "Use exp crossover (instead of bin)"
@@ -339,7 +1285,8 @@ def main ():
     cmd.add_argument \
         ( '-k', '--gain'
         , help    = "Gain to apply for filter default=%(default)s, "
-                    "set to 0 to auto-generate"
+                    "set to 0 to compute the optimal gain of each"
+                    " individual (not with --early-exit and --active-set)"
         , default = 0.00390625
         , type    = float
         )
@@ -380,6 +1327,15 @@ def main ():
         , default = 0
         , type    = int
         )
+    cmd.add_argument \
+        ( '--min-popsize'
+        , help    = "Reduce the population linearly from --popsize to"
+                    " this size (at least 4) over the --max-evals budget"
+                    " removing the worst individuals, 0 turns this off,"
+                    " default=%(default)s; only with --backend numpy"
+        , type    = int
+        , default = 0
+        )
     cmd.add_argument \
         ( '-o', '--optimize-further'
         , help    = "Normally we stop when constraints are met, "
@@ -418,6 +1374,30 @@ def main ():
         , help    = "Random number seed, default=%(default)s"
         , default = 42
         )
+    cmd.add_argument \
+        ( '--resume'
+        , help    = "Continue the run saved in the --checkpoint file,"
+                    " with --backend numpy the run continues exactly as"
+                    " if it had not been interrupted, pgapack continues"
+                    " with different random numbers"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--root-cache'
+        , help    = "Cache the contribution of each root to the response"
+                    " and only recompute roots that changed (roots"
+                    " engine only)"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--root-cache-size'
+        , help    = "Maximum size of the root cache in MB,"
+                    " default=%(default)s"
+        , type    = int
+        , default = 256
+        )
     cmd.add_argument \
         ( '--dont-scale-by-pi'
         , help    = "Scale X-values for constraints with 2*pi,"
@@ -427,25 +1407,78 @@ def main ():
         , default = True
         , action  = 'store_false'
         )
+    cmd.add_argument \
+        ( '--self-adaptive'
+        , help    = "Each trial vector gets its own scale factor and"
+                    " crossover rate drawn around an entry of a history"
+                    " of successful values (SHADE), the history starts"
+                    " with --scale-factor and --crossover-rate, dither"
+                    " is not used; only with --backend numpy"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--self-adaptive-memory'
+        , help    = "Number of entries in the history of successful"
+                    " scale factors and crossover rates with"
+                    " --self-adaptive, default=%(default)s"
+        , type    = int
+        , default = 6
+        )
     cmd.add_argument \
         ( '--sort-population'
         , help    = "Sort population by angle/radius"
         , default = False
         , action  = 'store_true'
         )
+    cmd.add_argument \
+        ( '--stagnation-generations'
+        , help    = "The run stagnates (and is restarted or stopped, see"
+                    " --restarts) after this many generations without"
+                    " sufficient improvement of the best evaluation, 0"
+                    " turns this off, default=%(default)s"
+        , type    = int
+        , default = 200
+        )
+    cmd.add_argument \
+        ( '--stagnation-improvement'
+        , help    = "Minimum relative improvement of the best evaluation"
+                    " in a generation that does not count as stagnation,"
+                    " default=%(default)s"
+        , type    = float
+        , default = 0.002
+        )
     cmd.add_argument \
         ( '--use-prefilter'
         , help    = "Use pre-filter in addition to optimized filter"
         , default = False
         , action  = 'store_true'
         )
+    cmd.add_argument \
+        ( '--workers'
+        , help    = "Evaluate each generation in this many local worker"
+                    " processes (not with MPI, --early-exit and"
+                    " --root-cache are not used), 0 evaluates in the main"
+                    " process, default=%(default)s"
+        , type    = int
+        , default = 0
+        )
     cmd.add_argument \
         ( '-Z', '--zeros'
         , type    = int
         , help    = "Number of zeros, default=%(default)s"
         , default = 5
         )
-    args = cmd.parse_args ()
+    for module in seeding, polish, restart, islands, order_search:
+        module.add_options (cmd)
+    return cmd
+# end def options
+
+def parse_args (cmd, argv = None):
+    """ Parse and check the command line argv (default sys.argv) with
+        the parser cmd returned by options, exits on errors.
+    """
+    args = cmd.parse_args (argv)
     for t in ('delay', 'magnitude'):
         for b in ('lower_bound', 'upper_bound'):
             n = '_'.join ((t, b))
@@ -458,8 +1491,54 @@ def main ():
                     print (cmd.usage)
                     exit ("Invalid value for %s: %s" % (n, v))
                 setattr (args, n, r)
-    pg = Filter_Opt (args)
-    pg.run ()
+    if args.resume and not args.checkpoint:
+        print (cmd.usage)
+        exit ("--resume needs a --checkpoint file")
+    if (args.self_adaptive or args.min_popsize) and args.backend != 'numpy':
+        print (cmd.usage)
+        exit ("--self-adaptive and --min-popsize need --backend numpy")
+    if args.asynchronous and (args.backend != 'numpy' or not args.workers):
+        print (cmd.usage)
+        exit ("--asynchronous needs --backend numpy and --workers")
+    if args.asynchronous and \
+        ( args.adaptive_grid or args.active_set
+        or args.self_adaptive or args.min_popsize
+        or args.sort_population
+        ):
+        print (cmd.usage)
+        exit \
+            ( "--asynchronous cannot be used with --adaptive-grid,"
+              " --active-set, --self-adaptive, --min-popsize and"
+              " --sort-population"
+            )
+    islands.check_args (cmd, args)
+    order_search.check_args (cmd, args)
+    return args
+# end def parse_args
+
+def optimizer_class (args):
+    """ The optimizer for the --backend in args """
+    if args.backend == 'numpy':
+        return Filter_Opt_DE
+    if not pga:
+        exit ("--backend pga needs pgapack (PGAPy), use --backend numpy")
+    return Filter_Opt
+# end def optimizer_class
+
+def main (argv = None):
+    args = parse_args (options (), argv)
+    cls  = optimizer_class (args)
+    if args.order_search:
+        search = order_search.Order_Search (cls, args)
+        search.run ()
+        search.report ()
+    elif args.islands or args.race:
+        model = islands.Island_Model (cls, args)
+        model.run ()
+        model.report ()
+    else:
+        pg = cls (args)
+        pg.run ()
 # end def main
 
 if __name__ == '__main__':
@@ -46,6 +46,15 @@ class Filter_Bound (object):
         return x, a
     # end def _gen_x
 
+    def uniform_x (self):
+        """ The regular points (without the additional points xx) if
+            they are uniformly spaced, None otherwise.
+        """
+        if self.use_cos:
+            return None
+        return self._gen_x () [0]
+    # end def uniform_x
+
     @classmethod
     def Parse (cls, s, scale_by_pi = True):
         args = s.split (',')
@@ -101,6 +110,16 @@ class Filter_Bound (object):
         return cp
     # end def copy
 
+    def resample (self, n):
+        """ Copy of this bound with n regular points and without the
+            additional points.
+        """
+        return self.__class__ \
+            ( self.xmin, self.xmax, self.ymin, self.ymax
+            , n, self.use_cos, scale_by_pi = self.scale_by_pi
+            )
+    # end def resample
+
     def interpolate (self, x):
         assert self.xmin <= x <= self.xmax
         d = (x - self.xmin) / (self.xmax - self.xmin)
@@ -135,18 +154,26 @@ class Filter_Bounds (object):
                 self.scale_by_pi = b.scale_by_pi
             assert self.scale_by_pi == b.scale_by_pi
             for x, y in zip (b.x, b.y):
-                if x in self.by_x:
-                    if self.is_lower:
-                        if y > self.by_x [x]:
-                            self.by_x [x] = y
-                    else:
-                        if y < self.by_x [x]:
-                            self.by_x [x] = y
-                else:
+                self._add (x, y)
+        self._update ()
+    # end def __init__
+
+    def _add (self, x, y):
+        if x in self.by_x:
+            if self.is_lower:
+                if y > self.by_x [x]:
+                    self.by_x [x] = y
+            else:
+                if y < self.by_x [x]:
                     self.by_x [x] = y
+        else:
+            self.by_x [x] = y
+    # end def _add
+
+    def _update (self):
         self.x = np.array (sorted (self.by_x))
         self.y = np.array ([self.by_x [i] for i in self.x])
-    # end def __init__
+    # end def _update
 
     @classmethod
     def Parse (cls, s, is_lower = False, delimiter = ', ', **kw):
@@ -183,6 +210,37 @@ class Filter_Bounds (object):
         return self.__class__ (*bounds, is_lower = self.is_lower)
     # end def copy
 
+    def insert (self, xs, ys):
+        """ Insert points (already scaled like x) with their bound
+            values, returns the number of new points.
+        """
+        n = len (self.by_x)
+        for x, y in zip (xs, ys):
+            self._add (x, y)
+        self._update ()
+        return len (self.by_x) - n
+    # end def insert
+
+    def resample (self, n = None, resolution = None):
+        """ Copy with only the regular points of each bound (the
+            additional points are dropped): With n each bound gets n
+            points, with resolution the points of a bound have at most
+            a distance of 0.5 / resolution (in units of the sampling
+            frequency), otherwise each bound keeps its number of
+            points.
+        """
+        bounds = []
+        for b in self.bounds:
+            m = n or b.n
+            if resolution:
+                w = b.xmax - b.xmin
+                if not b.scale_by_pi:
+                    w /= 2 * np.pi
+                m = max (m, int (np.ceil (w * 2 * resolution)) + 1)
+            bounds.append (b.resample (m))
+        return self.__class__ (*bounds, is_lower = self.is_lower)
+    # end def resample
+
     def interpolate (self, x):
         idx = bisect_left (self.lower, x)
         if idx == 0 and self.bounds [idx].xmin > x:
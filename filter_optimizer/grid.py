@@ -0,0 +1,429 @@
+#!/usr/bin/python3
+
+import numpy as np
+from scipy import signal
+from . import response
+
+def rowsum (x):
+    """ Sum the rows of x, summing sequentially: np.sum uses pairwise
+        summation depending on the memory layout, so the result of a
+        row could depend on the number of rows.
+    """
+    if not x.shape [1]:
+        return np.zeros (len (x))
+    return np.cumsum (x, axis = 1) [:, -1]
+# end def rowsum
+
+class Uniform_Segment (object):
+    """ A run of m uniformly spaced grid points starting at angular
+        frequency w0 with spacing dw, these are at the grid positions
+        start to start + m. The delay values at positions gd_pos of
+        the delay points are the values with index gd_sel in the
+        segment.
+    """
+
+    def __init__ (self, w0, dw, m, start = 0):
+        self.w0         = w0
+        self.dw         = dw
+        self.m          = m
+        self.start      = start
+        self.gd_pos     = np.zeros (0, dtype = int)
+        self.gd_sel     = np.zeros (0, dtype = int)
+        self.transforms = {}
+    # end def __init__
+
+    def transform (self, n):
+        """ Chirp-z transform evaluating a polynomial with n
+            coefficients (ascending powers of z^-1) on the segment.
+        """
+        if n not in self.transforms:
+            w = np.exp (-1j * self.dw)
+            a = np.exp (1j  * self.w0)
+            self.transforms [n] = signal.CZT (n, self.m, w, a)
+        return self.transforms [n]
+    # end def transform
+
+# end class Uniform_Segment
+
+class Constraint_Block (object):
+    """ Part of the constraints of a Constraint_Grid (e.g. for early
+        exit) with the grid columns it needs; the individuals with a
+        violation in the block are counted for ordering the blocks.
+    """
+
+    def __init__ (self, grid, cidx):
+        self.grid     = grid
+        self.cidx     = cidx
+        self.y        = grid.y    [cidx]
+        self.sign     = grid.sign [cidx]
+        mag           = grid.db_idx [cidx [cidx < grid.n_db]]
+        self.ld_sel   = grid.ld_idx [cidx [cidx >= grid.n_db] - grid.n_db]
+        if len (self.ld_sel):
+            self.cols   = np.unique (np.concatenate ((mag, grid.gd_idx)))
+            self.gd_sel = np.searchsorted (self.cols, grid.gd_idx)
+        else:
+            self.cols   = np.unique (mag)
+            self.gd_sel = np.zeros (0, dtype = int)
+        self.db_sel   = np.searchsorted (self.cols, mag)
+        self.x        = grid.x [self.cols]
+        self.bases    = {}
+        self.n_eval   = 0
+        self.n_hit    = 0
+    # end def __init__
+
+    @property
+    def rate (self):
+        return self.n_hit / (self.n_eval + 1)
+    # end def rate
+
+    def basis (self, n):
+        """ Basis matrices like Constraint_Grid.basis for the block """
+        if n not in self.bases:
+            e = response.basis (self.x, n)
+            # A contiguous copy: The sums over a strided array may be
+            # added in a different order, see response.poly_sums
+            d = np.ascontiguousarray (e [:, self.gd_sel])
+            self.bases [n] = (e, d)
+        return self.bases [n]
+    # end def basis
+
+    def deviation (self, db, gd):
+        """ Signed deviation for the constraints of this block from
+            magnitude db on x and group delay gd on x [gd_sel], this
+            is computed in the same way as Constraint_Grid.deviation.
+        """
+        v = db [:, self.db_sel]
+        if len (self.ld_sel):
+            shift = self.grid.delay_shift (gd)
+            v = np.concatenate \
+                ((v, gd [:, self.ld_sel] - shift [:, None]), axis = 1)
+        d = (v - self.y) * self.sign
+        self.n_eval += len (d)
+        self.n_hit  += np.count_nonzero ((d > 0).any (axis = 1))
+        return d
+    # end def deviation
+
+# end class Constraint_Block
+
+class Constraint_Grid (object):
+    """ The four Filter_Bounds compiled into a frequency grid x and a
+        constraint vector for evaluating many individuals at once. With
+        czt_min uniform segments use a chirp-z transform, with
+        block_size the constraints are split into Constraint_Blocks.
+    """
+
+    def __init__ \
+        ( self, udb, ldb, udelay, ldelay
+        , czt_min = 0, block_size = 0, auto_gain = False
+        ):
+        self.udb        = udb
+        self.ldb        = ldb
+        self.udelay     = udelay
+        self.ldelay     = ldelay
+        self.czt_min    = czt_min
+        self.block_size = block_size
+        self.auto_gain  = auto_gain
+        self.compile ()
+    # end def __init__
+
+    def compile (self):
+        bounds       = (self.udb, self.ldb, self.udelay, self.ldelay)
+        xs           = np.unique (np.concatenate ([b.x for b in bounds]))
+        covered      = self.compile_segments (xs)
+        order        = [np.flatnonzero (~covered)]
+        self.n_direct = len (order [0])
+        for seg in self.segments:
+            seg.start = sum (len (o) for o in order)
+            order.append (np.searchsorted (xs, seg.x))
+        order        = np.concatenate (order)
+        # Position of each point of xs in the grid
+        pos          = np.empty (len (xs), dtype = int)
+        pos [order]  = np.arange (len (order))
+        self.x       = xs [order]
+        self.bases   = {}
+        def idx (x):
+            return pos [np.searchsorted (xs, x)]
+        self.db_idx  = np.concatenate ((idx (self.udb.x), idx (self.ldb.x)))
+        self.n_db    = len (self.db_idx)
+        gdx          = np.unique \
+            (np.concatenate ((self.udelay.x, self.ldelay.x)))
+        self.gd_idx  = idx (gdx)
+        self.ld_idx  = np.searchsorted (gdx, self.ldelay.x)
+        self.ud_idx  = np.searchsorted (gdx, self.udelay.x)
+        self.ud_y    = np.asarray (self.udelay.y, dtype = float)
+        # Constraints in the order upper magnitude, lower magnitude,
+        # lower delay, the sign makes a violation positive; the upper
+        # delay bound only shifts the delay curve
+        self.y       = np.concatenate \
+            ((self.udb.y, self.ldb.y, self.ldelay.y)).astype (float)
+        self.sign    = np.concatenate \
+            (( np.ones  (len (self.udb.x))
+             , -np.ones (len (self.ldb.x))
+             , -np.ones (len (self.ldelay.x))
+            ))
+        self.gd_direct = np.flatnonzero (self.gd_idx < self.n_direct)
+        for seg in self.segments:
+            sel = self.gd_idx - seg.start
+            gdm = (sel >= 0) & (sel < seg.m)
+            seg.gd_pos = np.flatnonzero (gdm)
+            seg.gd_sel = sel [gdm]
+        self.active     = None
+        self.n_violated = np.zeros (len (self.y), dtype = int)
+        self.compile_blocks ()
+    # end def compile
+
+    def compile_blocks (self):
+        self.blocks = []
+        if not self.block_size:
+            return
+        order = np.argsort (self.x [self.db_idx], kind = 'stable')
+        for i in range (0, len (order), self.block_size):
+            cidx = np.sort (order [i:i + self.block_size])
+            self.blocks.append (Constraint_Block (self, cidx))
+        if len (self.y) > self.n_db:
+            cidx = np.arange (self.n_db, len (self.y))
+            self.blocks.append (Constraint_Block (self, cidx))
+    # end def compile_blocks
+
+    def update_active (self, d, margin):
+        """ Compute the active set from the deviation d of a population
+            evaluated on all constraints: A constraint is active if it
+            is violated or within margin of the bound for any
+            individual or if it was violated in an evaluation since the
+            last update. If all constraints are active, active is None.
+        """
+        self.n_violated += np.count_nonzero (d > 0, axis = 0)
+        act = (d > -margin).any (axis = 0) | (self.n_violated > 0)
+        self.n_violated [:] = 0
+        self.active = None
+        if not act.all ():
+            self.active = Constraint_Block (self, np.flatnonzero (act))
+    # end def update_active
+
+    def active_deviation (self, db, gd):
+        """ Deviation of all constraints from magnitude and group
+            delay computed for the active set (see Constraint_Block),
+            inactive constraints are assumed to be satisfied (0).
+            Since adding 0 does not change the sum, the penalty is the
+            same as for a full evaluation if this holds.
+        """
+        a = self.active
+        d = np.zeros ((len (db), len (self.y)))
+        d [:, a.cidx] = a.deviation (db, gd)
+        self.n_violated [a.cidx] += np.count_nonzero (d [:, a.cidx] > 0, 0)
+        return d
+    # end def active_deviation
+
+    def compile_segments (self, xs):
+        """ Find uniform segments in the sorted points xs, returns a
+            boolean array of the points covered by a segment.
+        """
+        self.segments = []
+        covered = np.zeros (len (xs), dtype = bool)
+        seen    = set ()
+        bounds  = (self.udb, self.ldb, self.udelay, self.ldelay)
+        for b in (b for fb in bounds for b in fb.bounds):
+            x = b.uniform_x ()
+            if not self.czt_min or x is None or len (x) < self.czt_min:
+                continue
+            key = (x [0], x [-1], len (x))
+            if key in seen:
+                continue
+            seen.add (key)
+            seg = Uniform_Segment \
+                (x [0], (x [-1] - x [0]) / (len (x) - 1), len (x))
+            seg.x = x
+            covered [np.searchsorted (xs, x)] = True
+            self.segments.append (seg)
+        return covered
+    # end def compile_segments
+
+    def basis (self, n):
+        """ The matrix e^-jwk for k in range (n) on the grid points
+            evaluated directly and its columns for the delay points,
+            this is cached until the grid is recompiled.
+        """
+        if n not in self.bases:
+            e = response.basis (self.x [:self.n_direct], n)
+            d = response.basis (self.x [self.gd_idx [self.gd_direct]], n)
+            self.bases [n] = (e, d)
+        return self.bases [n]
+    # end def basis
+
+    def poly_response (self, b, a):
+        """ Magnitude in dB and group delay for one filter per row of
+            the polynomial coefficients b and a on the grid, see
+            response.poly_response.
+        """
+        e, ed = self.basis (max (b.shape [1], a.shape [1]))
+        if not self.segments:
+            return response.poly_response (b, a, e, ed, self.gd_idx)
+        bv, bd = self.poly_sums (b, e, ed)
+        av, ad = self.poly_sums (a, e, ed)
+        return response.transfer_response (bv, bd, av, ad, self.gd_idx)
+    # end def poly_response
+
+    def poly_sums (self, c, e, ed):
+        """ Polynomial values and derivative sums (see
+            response.poly_sums) on the grid: Directly evaluated points
+            use the basis e and ed, uniform segments use the chirp-z
+            transform.
+        """
+        p  = np.empty ((len (c), len (self.x)),      dtype = complex)
+        dp = np.empty ((len (c), len (self.gd_idx)), dtype = complex)
+        p [:, :self.n_direct], dp [:, self.gd_direct] = response.poly_sums \
+            (c, e, ed)
+        for seg in self.segments:
+            t = seg.transform (c.shape [1])
+            v, dv = response.czt_sums (c, t, len (seg.gd_pos))
+            p [:, seg.start:seg.start + seg.m] = v
+            if dv is not None:
+                dp [:, seg.gd_pos] = dv [:, seg.gd_sel]
+        return p, dp
+    # end def poly_sums
+
+    def delay_shift (self, gd):
+        """ Shift of the delay curve so that it touches the upper delay
+            bound, 0 if there is no upper delay bound.
+        """
+        if not len (self.ud_idx):
+            return np.zeros (len (gd))
+        return np.max (gd [:, self.ud_idx] - self.ud_y, axis = 1)
+    # end def delay_shift
+
+    def gain_offset (self, v, margin = 0.0):
+        """ Offset in dB for the magnitude v at the magnitude constraint
+            points (one row per individual) that minimizes the sum of the
+            squared violations of the bounds tightened by margin.
+        """
+        a   = (v - self.y [:self.n_db]) * self.sign [:self.n_db] + margin
+        up  = self.sign [:self.n_db] > 0
+        # With offset c an upper bound point is violated for c > p, a
+        # lower bound point for c < q: Without violations take the
+        # middle, else the root of the derivative of the penalty
+        # (piecewise linear, found by sorting the breakpoints)
+        p   = -a [:, up]
+        q   = a [:, ~up]
+        if not p.shape [1] or not q.shape [1]:
+            if p.shape [1]:
+                return p.min (axis = 1)
+            if q.shape [1]:
+                return q.max (axis = 1)
+            return np.zeros (len (v))
+        t     = np.concatenate ((p, q), axis = 1)
+        order = np.argsort (t, axis = 1, kind = 'stable')
+        t     = np.take_along_axis (t, order, axis = 1)
+        isp   = (np.arange (t.shape [1]) < p.shape [1]) [order]
+        np_k  = np.cumsum (isp, axis = 1)
+        sp_k  = np.cumsum (np.where (isp, t, 0), axis = 1)
+        nq_k  = q.shape [1] - np.cumsum (~isp, axis = 1)
+        sq_k  = rowsum (q) [:, None] - np.cumsum (np.where (isp, 0, t), 1)
+        g     = np_k * t - sp_k - sq_k + nq_k * t
+        # The root is left of the first breakpoint with g >= 0, the
+        # derivative there is linear with the terms active before it
+        k     = np.argmax (g >= 0, axis = 1)
+        rows  = np.arange (len (t))
+        km    = np.maximum (k - 1, 0)
+        first = k == 0
+        n     = np.where (first, 0, np_k [rows, km])
+        sp    = np.where (first, 0, sp_k [rows, km])
+        nq    = np.where (first, q.shape [1], nq_k [rows, km])
+        sq    = np.where (first, rowsum (q), sq_k [rows, km])
+        with np.errstate (divide = 'ignore', invalid = 'ignore'):
+            c = (sp + sq) / (n + nq)
+        lo, hi = q.max (axis = 1), p.min (axis = 1)
+        return np.where (lo <= hi, (lo + hi) / 2, c)
+    # end def gain_offset
+
+    def deviation (self, db, gd):
+        """ Signed deviation from the bound for each constraint point,
+            positive values are violations.
+        """
+        shift = self.delay_shift (gd)
+        d = np.empty ((len (db), len (self.y)))
+        d [:, :self.n_db] = db [:, self.db_idx]
+        if self.auto_gain:
+            d [:, :self.n_db] += self.gain_offset (d [:, :self.n_db]) [:, None]
+        d [:, self.n_db:] = gd [:, self.ld_idx] - shift [:, None]
+        d -= self.y
+        d *= self.sign
+        return d
+    # end def deviation
+
+    def active_points (self, db, gd):
+        """ Points with a local maximum of a violation for any of the
+            individuals (rows of db and gd), for the upper delay bound
+            the point defining the delay shift. Returns a list of
+            x-values and bound values for each of the four bounds
+            (upper and lower magnitude, upper and lower delay).
+        """
+        d      = self.deviation (db, gd)
+        n_udb  = len (self.udb.x)
+        groups = \
+            ( (0, n_udb), (n_udb, self.n_db), None
+            , (self.n_db, len (self.y))
+            )
+        gx     = self.x [self.gd_idx]
+        cx     = np.concatenate \
+            ((self.x [self.db_idx], gx [self.ld_idx]))
+        result = []
+        for g in groups:
+            if g is None:
+                # Upper delay
+                idx = np.zeros (0, dtype = int)
+                if len (self.ud_idx):
+                    u   = gd [:, self.ud_idx] - self.ud_y
+                    idx = np.unique (np.argmax (u, axis = 1))
+                result.append ((gx [self.ud_idx [idx]], self.ud_y [idx]))
+                continue
+            v    = d [:, g [0]:g [1]]
+            peak = v > 0
+            peak [:, 1:]  &= v [:, 1:]  >= v [:, :-1]
+            peak [:, :-1] &= v [:, :-1] >= v [:, 1:]
+            idx  = np.flatnonzero (peak.any (axis = 0)) + g [0]
+            result.append ((cx [idx], self.y [idx]))
+        return result
+    # end def active_points
+
+    def penalty (self, db, gd, optimize_further = False):
+        """ Sum of the squared violations for magnitudes db on x and group
+            delays gd on x [gd_idx] (one row per individual), with
+            optimize_further a negative score without violations.
+        """
+        return self.deviation_penalty \
+            (self.deviation (db, gd), optimize_further)
+    # end def penalty
+
+    def penalty_gradient (self, db, gd, ddb, dgd, margin = 0.0):
+        """ Penalty of a single individual (see penalty) and its gradient
+            from the derivatives ddb and dgd (one row per allele, see
+            response.root_gradient) with all bounds tightened by margin.
+        """
+        v  = db [self.db_idx]
+        dv = ddb [:, self.db_idx]
+        if self.auto_gain:
+            v = v + self.gain_offset (v [None, :], margin) [0]
+        dl  = gd  [self.ld_idx]
+        ddl = dgd [:, self.ld_idx]
+        if len (self.ud_idx):
+            j   = np.argmax (gd [self.ud_idx] - self.ud_y)
+            dl  = dl  - (gd [self.ud_idx [j]] - self.ud_y [j])
+            ddl = ddl - dgd [:, self.ud_idx [j], None]
+        d  = (np.concatenate ((v, dl)) - self.y) * self.sign + margin
+        jd = np.concatenate ((dv, ddl), axis = 1) * self.sign
+        vl = d > 0
+        return np.sum (d [vl] ** 2), 2 * jd [:, vl] @ d [vl]
+    # end def penalty_gradient
+
+    def deviation_penalty (self, d, optimize_further = False):
+        """ Compute penalty from the deviation, see penalty """
+        vl = d > 0
+        ev = rowsum (np.where (vl, d ** 2, 0))
+        if optimize_further:
+            f  = abs (d) ** 0.5
+            f [:, :self.n_db] = np.minimum (f [:, :self.n_db], 1.0)
+            ev = np.where (ev, ev, -rowsum (np.where (vl, 0, f)))
+        return ev
+    # end def deviation_penalty
+
+# end class Constraint_Grid
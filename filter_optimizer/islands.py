@@ -0,0 +1,382 @@
+#!/usr/bin/python3
+""" Island model: Several optimizers (islands) evolve their own
+    population in local processes forked from the main process. Every
+    --migration-interval generations each island sends copies of its
+    best individuals to its neighbours in the topology, these replace
+    the worst individuals of the receiving island if they are better.
+    Only a few genes are exchanged per migration. The islands may use
+    different DE variants, scale factors and crossover rates. A run
+    ends when all islands have stopped, an island that meets the
+    constraints stops the others.
+    A race (--race) uses the same machinery without migration: The
+    islands (racers) share the evaluation budget and the first to
+    meet the constraints wins.
+"""
+
+import os
+import sys
+import copy
+import queue
+import multiprocessing
+import traceback
+import numpy as np
+from . import de
+from . import report
+
+topologies = ('ring', 'random', 'full')
+
+def targets (topology, n, k, epoch, seed):
+    """ Islands receiving the migrants of island k (of n) in the
+        given epoch: The next island on a ring, the next island on a
+        random ring (different in each epoch) or all other islands.
+    """
+    if n < 2:
+        return []
+    if topology == 'full':
+        return [j for j in range (n) if j != k]
+    if topology == 'random':
+        perm = np.random.default_rng ((seed, epoch)).permutation (n)
+        pos  = int (np.flatnonzero (perm == k) [0])
+        return [int (perm [(pos + 1) % n])]
+    return [(k + 1) % n]
+# end def targets
+
+def sources (topology, n, k, epoch, seed):
+    """ Islands sending their migrants to island k in the epoch """
+    return \
+        [ j for j in range (n)
+            if k in targets (topology, n, j, epoch, seed)
+        ]
+# end def sources
+
+class Island (object):
+    """ Communication of island k with the other islands: Each island
+        has an inbox, messages from islands that are ahead are kept
+        until they are needed. An island that stops tells all others,
+        it is not waited for in later migrations. The evaluations of
+        all islands are in the shared array evaluations, if budget
+        is given it is shared by all islands. Without migrating the
+        islands only communicate when stopping.
+    """
+
+    def __init__ \
+        (self, k, inboxes, topology, seed, evaluations, budget, migrating):
+        self.k           = k
+        self.inboxes     = inboxes
+        self.n           = len (inboxes)
+        self.topology    = topology
+        self.seed        = seed
+        self.evaluations = evaluations
+        self.budget      = budget
+        self.migrating   = migrating
+        self.pending     = {}
+        self.finished    = set ()
+        self.succeeded   = False
+        self.n_sent      = 0
+    # end def __init__
+
+    def receive (self, block = True):
+        """ Receive one message, returns False if there is none """
+        try:
+            msg = self.inboxes [self.k].get (block = block)
+        except queue.Empty:
+            return False
+        if msg [0] == 'done':
+            self.finished.add (msg [1])
+            self.succeeded = self.succeeded or msg [2]
+        else:
+            epoch, source, genes = msg [1:]
+            self.pending [(epoch, source)] = genes
+        return True
+    # end def receive
+
+    def stopped (self):
+        """ True if another island has met the constraints """
+        while self.receive (block = False):
+            pass
+        return self.succeeded
+    # end def stopped
+
+    def exhausted (self, evaluations):
+        """ Record the evaluations of this island, True if the shared
+            budget is used up.
+        """
+        self.evaluations [self.k] = evaluations
+        return bool (self.budget and sum (self.evaluations) >= self.budget)
+    # end def exhausted
+
+    def migrate (self, epoch, genes):
+        """ Send genes (one individual per row) to the targets of this
+            epoch and return the genes received from the sources, None
+            if another island has met the constraints.
+        """
+        args = (self.topology, self.n, self.k, epoch, self.seed)
+        for j in targets (*args):
+            if j not in self.finished:
+                self.inboxes [j].put (('genes', epoch, self.k, genes))
+                self.n_sent += len (genes)
+        todo = set (sources (*args))
+        while True:
+            todo -= self.finished
+            todo -= set (s for s in todo if (epoch, s) in self.pending)
+            if self.succeeded:
+                return None
+            if not todo:
+                break
+            self.receive ()
+        received = [ self.pending.pop (key) for key in sorted (self.pending)
+                     if key [0] == epoch
+                   ]
+        if not received:
+            return genes [:0]
+        return np.concatenate (received)
+    # end def migrate
+
+    def finish (self, success):
+        """ Tell all other islands that this island has stopped """
+        for j, inbox in enumerate (self.inboxes):
+            if j != self.k:
+                inbox.put (('done', self.k, success))
+    # end def finish
+
+# end class Island
+
+class Island_Model (object):
+    """ Run --islands (or --race) optimizers created by factory
+        (called with the command line arguments of the island) in
+        forked processes. The island k uses --random-seed + k and the
+        k-th entry (cyclically) of the island specific DE variants,
+        scale factors and crossover rates. Islands get an equal share
+        of --max-evals, racers share the whole budget.
+    """
+
+    def __init__ (self, factory, args):
+        self.factory = factory
+        self.args    = args
+        self.racing  = bool (args.race)
+        self.n       = args.race or args.islands
+        self.results = []
+    # end def __init__
+
+    def island_args (self, k):
+        """ Command line arguments of island k """
+        a = copy.copy (self.args)
+        a.islands     = a.race = 0
+        a.events      = None
+        a.random_seed = self.args.random_seed + k
+        if not self.racing:
+            a.max_evals = self.args.max_evals // self.n
+        for name in 'de_variant', 'scale_factor', 'crossover_rate':
+            values = getattr (self.args, 'island_' + name)
+            if values:
+                setattr (a, name, values [k % len (values)])
+        return a
+    # end def island_args
+
+    def work (self, k, inboxes, evaluations, results):
+        """ Main function of the process of island k """
+        fn = os.devnull
+        if self.args.island_log:
+            fn = '%s.%d' % (self.args.island_log, k)
+        f = open (fn, 'w')
+        os.dup2 (f.fileno (), sys.stdout.fileno ())
+        sys.stdout = f
+        # Messages to islands that have stopped are never read
+        for inbox in inboxes:
+            inbox.cancel_join_thread ()
+        budget = self.args.max_evals if self.racing else 0
+        island = Island \
+            ( k, inboxes, self.args.topology, self.args.random_seed
+            , evaluations, budget, not self.racing
+            )
+        result = dict (island = k)
+        try:
+            opt = self.factory (self.island_args (k))
+            opt.island = island
+            opt.run ()
+            pop = de.PGA_OLDPOP
+            p   = opt.get_best_index (pop)
+            g   = opt.get_population (pop, [p])
+            result.update \
+                ( genes       = g [0]
+                , evaluation  = opt.get_evaluation (p, pop)
+                , gain        = opt.gain (g) [0]
+                , stag        = opt.stag_count
+                , generation  = opt.generation
+                , evaluations = opt.n_evaluations
+                , sent        = island.n_sent
+                )
+        except Exception:
+            result ['error'] = traceback.format_exc ()
+        ev = result.get ('evaluation')
+        island.finish (ev == 0 and not self.args.optimize_further)
+        sys.stdout.flush ()
+        results.put (result)
+    # end def work
+
+    def run (self):
+        """ Run the islands, returns their results sorted by island """
+        ctx     = multiprocessing.get_context ('fork')
+        inboxes = [ctx.Queue () for k in range (self.n)]
+        evals   = ctx.Array ('q', self.n, lock = False)
+        results = ctx.Queue ()
+        sys.stdout.flush ()
+        processes = []
+        for k in range (self.n):
+            p = ctx.Process \
+                (target = self.work, args = (k, inboxes, evals, results))
+            p.start ()
+            processes.append (p)
+        self.results = [results.get () for p in processes]
+        for p in processes:
+            p.join ()
+        self.results.sort (key = lambda r: r ['island'])
+        errors = [r ['error'] for r in self.results if 'error' in r]
+        if errors:
+            raise RuntimeError ("Error in island:\n" + errors [0])
+        return self.results
+    # end def run
+
+    def report (self, file = sys.stdout):
+        """ Print the result of each island and the best individual in
+            the format of a single run: The best individual of the best
+            island with the generations and evaluations of all islands,
+            see report.print_result. For a race, the configuration of
+            each racer is printed and the arguments in the report are
+            those of the winner (the best, with fewer evaluations if
+            several met the constraints).
+        """
+        for r in self.results:
+            if self.racing:
+                a = self.island_args (r ['island'])
+                print \
+                    ( "Racer: %s Best: %e Iter: %s Evals: %s"
+                      " Seed: %s Variant: %s F: %s Cr: %s"
+                    % ( r ['island'], r ['evaluation'], r ['generation']
+                      , r ['evaluations'], a.random_seed, a.de_variant
+                      , a.scale_factor, a.crossover_rate
+                      )
+                    , file = file
+                    )
+            else:
+                print \
+                    ( "Island: %s Best: %e Iter: %s Evals: %s"
+                      " Migrants sent: %s"
+                    % ( r ['island'], r ['evaluation'], r ['generation']
+                      , r ['evaluations'], r ['sent']
+                      )
+                    , file = file
+                    )
+        best = min \
+            ( self.results
+            , key = lambda r: (r ['evaluation'], r ['evaluations'])
+            )
+        args = self.args
+        if self.racing:
+            print ("Winner: %s" % best ['island'], file = file)
+            args = self.island_args (best ['island'])
+            args.race      = self.args.race
+            args.max_evals = self.args.max_evals
+            args.events    = self.args.events
+        report.print_result \
+            ( file, best, args
+            , max (r ['generation'] for r in self.results)
+            , sum (r ['evaluations'] for r in self.results)
+            , self.factory.__name__
+            )
+    # end def report
+
+# end class Island_Model
+
+def add_options (cmd):
+    """ Add the command line options of the island model and the race
+        to the parser cmd
+    """
+    cmd.add_argument \
+        ( '--island-crossover-rate'
+        , help    = "Crossover rate of an island (or --race instance),"
+                    " can be specified multiple times, island k uses the"
+                    " k-th value (cyclically), default is --crossover-rate"
+        , type    = float
+        , default = []
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--island-de-variant'
+        , help    = "DE variant of an island, see --island-crossover-rate"
+        , default = []
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--island-log'
+        , help    = "Write the log of island k to ISLAND_LOG.k, by default"
+                    " the logs of the islands are discarded"
+        )
+    cmd.add_argument \
+        ( '--island-scale-factor'
+        , help    = "Base scale factor of an island (like"
+                    " --scale-factor), see --island-crossover-rate"
+        , type    = float
+        , default = []
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--islands'
+        , help    = "Run this many islands with their own population in"
+                    " local processes, these exchange their best"
+                    " individuals every --migration-interval generations"
+                    " (see --topology), the islands use consecutive"
+                    " random seeds and share --max-evals, 0 runs a single"
+                    " population, default=%(default)s; not with MPI and"
+                    " --checkpoint"
+        , type    = int
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--migrants'
+        , help    = "Number of best individuals an island sends to its"
+                    " neighbours in each migration, default=%(default)s"
+        , type    = int
+        , default = 2
+        )
+    cmd.add_argument \
+        ( '--migration-interval'
+        , help    = "Generations between migrations with --islands,"
+                    " default=%(default)s"
+        , type    = int
+        , default = 50
+        )
+    cmd.add_argument \
+        ( '--race'
+        , help    = "Race this many independent runs in local processes:"
+                    " they use consecutive random seeds (and the"
+                    " --island-* settings) without migration, share the"
+                    " --max-evals budget and all stop when one meets the"
+                    " constraints, the report uses the arguments of the"
+                    " winner, default=%(default)s; not with MPI and"
+                    " --checkpoint"
+        , type    = int
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--topology'
+        , help    = "Islands receiving the migrants of an island: the"
+                    " next island on a ring, the next on a random ring"
+                    " (changing with each migration) or all other islands"
+                    " ('full'), default=%(default)s"
+        , choices = topologies
+        , default = 'ring'
+        )
+# end def add_options
+
+def check_args (cmd, args):
+    """ Check the options of the island model and the race in args,
+        exits on errors
+    """
+    if (args.islands or args.race) and args.checkpoint:
+        print (cmd.usage)
+        exit ("--islands and --race cannot be used with --checkpoint")
+    if args.islands and args.race:
+        print (cmd.usage)
+        exit ("--islands and --race are mutually exclusive")
+# end def check_args
@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+""" Search for the cheapest filter order meeting the constraints: The
+    candidate numbers of zeros and poles (up to --zeros and --poles)
+    are optimized in the order of their cost in local processes forked
+    from the main process, up to --order-search processes at a time.
+    Once a candidate meets the constraints all candidates that are not
+    cheaper are cancelled (or not started at all). A candidate is
+    warm-started from the best genes of the finished candidates with
+    fewer zeros and poles: The missing roots are added as zero/pole
+    pairs with radius 0 which do not change the response, see
+    seeding.adapt_gene.
+"""
+
+import os
+import sys
+import copy
+import multiprocessing
+import traceback
+from . import de
+from . import report
+
+def cost (nzeros, npoles):
+    """ Cost of a filter with nzeros zeros and npoles poles: Each root
+        of the gene is a real root or a conjugate complex pair and
+        needs its own coefficients, so the cost is the number of
+        roots. For the same number of roots, fewer second order
+        sections (the maximum of zeros and poles) are cheaper.
+    """
+    return (nzeros + npoles, max (nzeros, npoles))
+# end def cost
+
+def candidates (max_zeros, max_poles):
+    """ All (zeros, poles) combinations with at least one pole, the
+        cheapest first.
+    """
+    return sorted \
+        ( ((z, p) for z in range (max_zeros + 1)
+                  for p in range (1, max_poles + 1)
+          )
+        , key = lambda zp: cost (*zp) + zp
+        )
+# end def candidates
+
+class Order_Search (object):
+    """ Run optimizers created by factory (called with the command line
+        arguments of the candidate) for the candidate orders, see the
+        module documentation. Each candidate gets the whole --max-evals.
+    """
+
+    def __init__ (self, factory, args):
+        self.factory    = factory
+        self.args       = args
+        self.candidates = candidates (args.zeros, args.poles)
+        self.n_procs    = args.order_search
+        self.results    = []
+    # end def __init__
+
+    def candidate_args (self, zeros, poles):
+        """ Command line arguments of a candidate """
+        a = copy.copy (self.args)
+        a.order_search = 0
+        a.events       = None
+        a.zeros        = zeros
+        a.poles        = poles
+        return a
+    # end def candidate_args
+
+    def warm_genes (self, zeros, poles):
+        """ Best genes of the finished candidates with at most the
+            given number of zeros and poles, the best first.
+        """
+        done = sorted \
+            ( ( r for r in self.results
+                if  'genes' in r
+                and r ['zeros'] <= zeros and r ['poles'] <= poles
+              )
+            , key = lambda r: r ['evaluation']
+            )
+        return [(r ['genes'], r ['zeros'], r ['poles']) for r in done]
+    # end def warm_genes
+
+    def work (self, zeros, poles, warm, cancel, results):
+        """ Main function of the process of a candidate """
+        fn = os.devnull
+        if self.args.order_log:
+            fn = '%s.%d.%d' % (self.args.order_log, zeros, poles)
+        f = open (fn, 'w')
+        os.dup2 (f.fileno (), sys.stdout.fileno ())
+        sys.stdout = f
+        result = dict (zeros = zeros, poles = poles)
+        try:
+            opt = self.factory (self.candidate_args (zeros, poles))
+            opt.cancel = cancel
+            if warm:
+                opt.seed_genes = opt.seed_population (warm)
+            opt.run ()
+            pop = de.PGA_OLDPOP
+            p   = opt.get_best_index (pop)
+            g   = opt.get_population (pop, [p])
+            result.update \
+                ( genes       = g [0]
+                , evaluation  = opt.get_evaluation (p, pop)
+                , gain        = opt.gain (g) [0]
+                , stag        = opt.stag_count
+                , generation  = opt.generation
+                , evaluations = opt.n_evaluations
+                )
+        except Exception:
+            result ['error'] = traceback.format_exc ()
+        result ['cancelled'] = cancel.is_set ()
+        sys.stdout.flush ()
+        results.put (result)
+    # end def work
+
+    def run (self):
+        """ Run the candidates, returns their results (cancelled
+            candidates included) in the order of the candidates.
+        """
+        ctx      = multiprocessing.get_context ('fork')
+        results  = ctx.Queue ()
+        todo     = list (self.candidates)
+        running  = {}
+        feasible = None
+        sys.stdout.flush ()
+        while todo or running:
+            while todo and len (running) < self.n_procs:
+                zp = todo.pop (0)
+                if feasible is not None and cost (*zp) >= feasible:
+                    continue
+                cancel = ctx.Event ()
+                p = ctx.Process \
+                    ( target = self.work
+                    , args   = zp + (self.warm_genes (*zp), cancel, results)
+                    )
+                p.start ()
+                running [zp] = (p, cancel)
+            if not running:
+                break
+            r  = results.get ()
+            zp = (r ['zeros'], r ['poles'])
+            running.pop (zp) [0].join ()
+            self.results.append (r)
+            if 'error' in r:
+                for p, cancel in running.values ():
+                    cancel.set ()
+                todo = []
+            elif r ['evaluation'] == 0 and not self.args.optimize_further:
+                c = cost (*zp)
+                if feasible is None or c < feasible:
+                    feasible = c
+                for k, (p, cancel) in running.items ():
+                    if cost (*k) >= feasible:
+                        cancel.set ()
+        order = self.candidates.index
+        self.results.sort (key = lambda r: order ((r ['zeros'], r ['poles'])))
+        errors = [r ['error'] for r in self.results if 'error' in r]
+        if errors:
+            raise RuntimeError ("Error in order search:\n" + errors [0])
+        return self.results
+    # end def run
+
+    def best (self):
+        """ The result of the cheapest candidate meeting the
+            constraints, if there is none the best result (the cheaper
+            for the same evaluation).
+        """
+        return min \
+            ( self.results
+            , key = lambda r:
+                (r ['evaluation'], cost (r ['zeros'], r ['poles']))
+            )
+    # end def best
+
+    def report (self, file = sys.stdout):
+        """ Print the result of each candidate and the best individual
+            of the cheapest feasible candidate in the format of a single
+            run with the zeros and poles of that candidate.
+        """
+        for r in self.results:
+            print \
+                ( "Zeros: %s Poles: %s Best: %e Iter: %s Evals: %s%s"
+                % ( r ['zeros'], r ['poles'], r ['evaluation']
+                  , r ['generation'], r ['evaluations']
+                  , ' Cancelled' if r ['cancelled'] else ''
+                  )
+                , file = file
+                )
+        best = self.best ()
+        print \
+            ( "Cheapest: Zeros: %s Poles: %s"
+            % (best ['zeros'], best ['poles'])
+            , file = file
+            )
+        args       = copy.copy (self.args)
+        args.zeros = best ['zeros']
+        args.poles = best ['poles']
+        report.print_result \
+            ( file, best, args, best ['generation']
+            , sum (r ['evaluations'] for r in self.results)
+            , self.factory.__name__
+            )
+    # end def report
+
+# end class Order_Search
+
+def add_options (cmd):
+    """ Add the command line options of the order search to the parser cmd """
+    cmd.add_argument \
+        ( '--order-log'
+        , help    = "Write the log of the candidate with Z zeros and P"
+                    " poles of --order-search to ORDER_LOG.Z.P, by default"
+                    " the logs of the candidates are discarded"
+        )
+    cmd.add_argument \
+        ( '--order-search'
+        , help    = "Search the cheapest number of zeros and poles (up"
+                    " to --zeros and --poles) meeting the constraints,"
+                    " running this many candidates in local processes,"
+                    " candidates are warm-started from the results with"
+                    " fewer roots, each gets --max-evals, 0 turns this"
+                    " off, default=%(default)s; not with MPI,"
+                    " --checkpoint, --islands and --race"
+        , type    = int
+        , default = 0
+        )
+# end def add_options
+
+def check_args (cmd, args):
+    """ Check the options of the order search in args, exits on errors """
+    if args.order_search and (args.checkpoint or args.islands or args.race):
+        print (cmd.usage)
+        exit \
+            ( "--order-search cannot be used with --checkpoint, --islands"
+              " and --race"
+            )
+# end def check_args
@@ -2,7 +2,9 @@
 
 import sys
 import os
+import itertools
 from csv import DictWriter
+from . import events
 
 fields = \
     ( 'variant'
@@ -25,11 +27,15 @@ dw = DictWriter (sys.stdout, delimiter = ';', fieldnames = fields)
 dw.writerow (dict ((f, f) for f in fields))
 
     # name of option               name in csv,  lookup if bool
+    # The optimizer prints --exponential-crossover as
+    # exponential_crossover (in logs and in events), older logs have
+    # use_exponential_crossover
 options = dict \
     ( crossover_rate            = ('Cr',         ())
     , de_variant                = ('variant',    ())
     , dither                    = ('dither',     ())
     , dither_per_individual     = ('dither_p_i', ('0',      '1'))
+    , exponential_crossover     = ('cross',      ('bin',    'exp'))
     , jitter                    = ('jitter',     ())
     , popsize                   = ('np',         ())
     , random_seed               = ('randseed',   ())
@@ -40,8 +46,33 @@ options = dict \
     , use_prefilter             = ('prefilter',  ('0',      '1'))
     )
 
+def event_row (event):
+    """ Row of the result event of an --events stream """
+    d = dict \
+        ( eval  = event ['evaluation']
+        , neval = event ['evaluations']
+        , iter  = event ['generation']
+        , cross = 'bin'
+        )
+    for k, v in event ['args'].items ():
+        if k in options:
+            key, boolconv = options [k]
+            if boolconv:
+                v = boolconv [bool (v)]
+            d [key] = v
+    return d
+# end def event_row
+
 def main (argv = sys.argv [1:]):
     for fn in argv:
+        with open (fn, 'r') as f:
+            first = f.readline ()
+            if events.is_event_line (first):
+                lines = itertools.chain ([first], f)
+                for event in events.read_events (lines):
+                    if event ['event'] == 'result':
+                        dw.writerow (event_row (event))
+                continue
         n, e = os.path.splitext (fn)
         params = n.split ('-')
         d = {}
@@ -0,0 +1,103 @@
+#!/usr/bin/python3
+""" Polishing: Gradient-based local refinement of the best individual
+    every --polish-interval generations or on stagnation.
+"""
+
+import numpy as np
+from scipy import optimize
+from . import de
+from . import response
+
+class Polish_Mixin (object):
+    """ Polishing methods of the optimizer, see Filter_Opt_Mixin """
+
+    def polish_due (self):
+        """ Polishing is done every --polish-interval generations and
+            each time the stagnation count reaches a multiple of
+            --polish-stagnation.
+        """
+        if not self.polishing:
+            return False
+        iv, st = self.args.polish_interval, self.args.polish_stagnation
+        return bool \
+            (  iv and self.generation and self.generation % iv == 0
+            or st and self.stag_count and self.stag_count % st == 0
+            )
+    # end def polish_due
+
+    def polish (self, p):
+        """ Refine individual p of the old population with L-BFGS-B on the
+            penalty tightened by --polish-margin. The result is scored with
+            evaluate_genes and kept if it is better.
+        """
+        pop = de.PGA_OLDPOP
+        ev  = self.get_evaluation (p, pop)
+        if ev <= 0:
+            return
+        g   = self.grid
+        def penalty (x):
+            db, gd, ddb, dgd = response.root_gradient \
+                (x, self.nzeros, self.npoles, self.a0, g.x, g.gd_idx)
+            if self.args.use_prefilter:
+                db = db + self.fir_db
+            self.polish_evals += 1
+            return g.penalty_gradient \
+                (db, gd, ddb, dgd, self.args.polish_margin)
+        lo, hi = self.init_range.T
+        res    = optimize.minimize \
+            ( penalty, self.get_population (pop, [p]) [0]
+            , jac     = True
+            , method  = 'L-BFGS-B'
+            , bounds  = self.init_range
+            , options = dict
+                (maxiter = self.args.polish_iterations, ftol = 0, gtol = 0)
+            )
+        # The roots engine only guides the search, the evaluation of
+        # the result comes from the same engine as all others
+        genes  = np.clip (res.x, lo, hi) [None, :]
+        new    = self.evaluate_genes (genes) [0]
+        self.polish_evals += 1
+        self.n_polish     += 1
+        if new < ev:
+            self.set_population (pop, genes, [p])
+            self.set_evaluation (p, pop, new)
+            self.n_polished += 1
+    # end def polish
+
+# end class Polish_Mixin
+
+def add_options (cmd):
+    """ Add the command line options of polishing to the parser cmd """
+    cmd.add_argument \
+        ( '--polish-interval'
+        , help    = "Every POLISH_INTERVAL generations refine the best"
+                    " individual with a gradient-based local optimizer,"
+                    " 0 turns this off, default=%(default)s; only used"
+                    " when not running in parallel"
+        , type    = int
+        , default = 0
+        )
+    cmd.add_argument \
+        ( '--polish-iterations'
+        , help    = "Maximum iterations of the local optimizer when"
+                    " polishing, default=%(default)s"
+        , type    = int
+        , default = 100
+        )
+    cmd.add_argument \
+        ( '--polish-margin'
+        , help    = "Bounds are tightened by this amount (in dB or"
+                    " samples) when polishing, default=%(default)s"
+        , type    = float
+        , default = 1e-4
+        )
+    cmd.add_argument \
+        ( '--polish-stagnation'
+        , help    = "Refine the best individual each time the number of"
+                    " generations without sufficient improvement reaches"
+                    " a multiple of this, 0 turns this off,"
+                    " default=%(default)s"
+        , type    = int
+        , default = 0
+        )
+# end def add_options
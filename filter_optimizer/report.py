@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+""" The report at the end of a run: The best individual with the
+    counters and the arguments of the run in the format read by
+    filter-show-from-log and filter-parse-result. The island model,
+    the race and the order search report the result of one of their
+    processes this way without creating an optimizer (which would
+    compute the constraint grid again).
+"""
+
+from . import events
+
+def print_args (file, args):
+    """ The arguments, one per line sorted by name """
+    l = max (len (k) for k in vars (args))
+    for k in sorted (vars (args)):
+        print (('%%-%ds: %%s' % l) % (k, getattr (args, k)), file = file)
+# end def print_args
+
+def print_genes (file, genes):
+    """ The alleles of genes, five per line """
+    for i in range (0, len (genes), 5):
+        v = ', '.join ('[%11.7g]' % g for g in genes [i:i+5])
+        print ('#%4d: %s' % (i, v), file = file)
+    print (file = file)
+# end def print_genes
+
+def print_result \
+    (file, result, args, generation, evaluations, optimizer = None):
+    """ Print the best individual of a run in result (a dictionary
+        with its genes, evaluation, gain and stagnation count) with
+        the given arguments and counters of the run. With --events in
+        args the start and the result of the run are written to the
+        event stream, optimizer is the name of the optimizer class.
+    """
+    genes = result ['genes']
+    ev    = result ['evaluation']
+    print ("The Best Evaluation: %e." % ev, file = file)
+    print ("The Best String:", file = file)
+    print \
+        ( "Iter: %s Evals: %s Stag: %s"
+        % (generation, evaluations, result ['stag'])
+        , file = file
+        )
+    if not args.gain:
+        print ("Gain: %.10g" % result ['gain'], file = file)
+    print_args (file, args)
+    print_genes (file, genes)
+    file.flush ()
+    if args.events:
+        ew = events.Event_Writer (args.events)
+        ew.write \
+            ( 'start'
+            , optimizer = optimizer
+            , zeros     = args.zeros
+            , poles     = args.poles
+            , args      = vars (args)
+            )
+        ew.write \
+            ( 'result'
+            , success     = bool (ev == 0)
+            , zeros       = args.zeros
+            , poles       = args.poles
+            , gain        = result ['gain']
+            , args        = vars (args)
+            , generation  = generation
+            , evaluations = evaluations
+            , evaluation  = ev
+            , gene        = genes
+            )
+        ew.close ()
+# end def print_result
@@ -0,0 +1,227 @@
+#!/usr/bin/python3
+""" Vectorized frequency response of many filters at once.
+    The filters are given as genes in the layout used by Filter_Opt:
+    First the zeros then the poles, each as (radius, angle) pairs
+    with the angle in the range [0, 0.5]. All functions operate on a
+    2-dimensional array of genes (individuals × alleles) and return
+    arrays with one row per individual.
+"""
+
+import numpy as np
+from scipy import signal
+
+def gene_roots (genes, nzeros, npoles):
+    """ Return zeros and poles for a 2-dimensional array of genes.
+        Each root in the gene is complemented by its conjugate complex
+        value (in the second half of the row). Real roots have no
+        conjugate, we put a root at 0 there: The factor (1 - r z^-1)
+        for r = 0 is 1, so this does not change the response.
+    """
+    genes = np.asarray (genes, dtype = float)
+    po    = 2 * nzeros
+    zeros = genes [:, 0:po:2]   * np.e ** (2j * np.pi * genes [:, 1:po:2])
+    poles = genes [:, po::2]    * np.e ** (2j * np.pi * genes [:, po+1::2])
+    return conjugate_complete (zeros), conjugate_complete (poles)
+# end def gene_roots
+
+def conjugate_complete (roots):
+    c = np.where (roots.imag != 0, roots.conjugate (), 0)
+    return np.concatenate ((roots, c), axis = 1)
+# end def conjugate_complete
+
+def poly_coefficients (roots, k = 1.0):
+    """ Polynomial coefficients for each row of roots, same as
+        signal.zpk2tf: Highest power of z first, which is the same as
+        ascending powers of z^-1.
+    """
+    n, m = roots.shape
+    c = np.zeros ((n, m + 1), dtype = complex)
+    c [:, 0] = 1
+    for j in range (m):
+        c [:, 1:j+2] = c [:, 1:j+2] + c [:, 0:j+1] * -roots [:, j:j+1]
+    return k * c.real
+# end def poly_coefficients
+
+def basis (w, n):
+    """ Matrix of e^-jwk for k in range (n) (rows) and the angular
+        frequencies w (columns).
+    """
+    return np.exp (-1j * np.outer (np.arange (n), np.asarray (w)))
+# end def basis
+
+def poly_sums (c, e, ed):
+    """ Values of polynomials (one per row of c, ascending powers of
+        z^-1) on basis e and the derivative sums k c_k e^-jwk on basis ed,
+        summed sequentially so a row does not depend on the others.
+    """
+    n  = c.shape [1]
+    p  = np.sum (c [:, :, None] * e [None, :n], axis = 1)
+    dc = c * np.arange (n)
+    dp = np.sum (dc [:, :, None] * ed [None, :n], axis = 1)
+    return p, dp
+# end def poly_sums
+
+def poly_response (b, a, e, ed, idx):
+    """ Magnitude in dB at the frequencies of basis e and group delay
+        in samples at the frequencies of basis ed for one filter per
+        row of b and a. The columns of ed are the columns idx of e.
+        Both are computed from the same polynomial values: With H = B/A
+        and x = e^-jw the group delay is Re (xB'/B) - Re (xA'/A).
+        Singular points of the group delay are set to 0 like in scipy.
+    """
+    bv, bd = poly_sums (b, e, ed)
+    av, ad = poly_sums (a, e, ed)
+    return transfer_response (bv, bd, av, ad, idx)
+# end def poly_response
+
+def transfer_response (bv, bd, av, ad, idx):
+    """ Magnitude in dB and group delay from the values of numerator
+        and denominator polynomials bv, av and their derivative sums
+        bd, ad (at the frequencies indexed by idx), see poly_response.
+    """
+    with np.errstate (divide = 'ignore', invalid = 'ignore'):
+        db = 20 * np.log10 (abs (bv / av))
+        gd = np.real (bd / bv [:, idx]) - np.real (ad / av [:, idx])
+    gd [~np.isfinite (gd)] = 0
+    return db, gd
+# end def transfer_response
+
+def scipy_response (b, a, w, idx):
+    """ Magnitude in dB at angular frequencies w and group delay at
+        w [idx] for one filter per row of b and a computed one filter
+        at a time with signal.freqz and signal.group_delay. These are
+        the functions of the original evaluation of the optimizer, it
+        is slow but serves as the reference for the other engines. The
+        optimizer passes the coefficients of poly_coefficients (not of
+        zpk2tf), so the results differ from the original in the last
+        bits.
+    """
+    w  = np.asarray (w, dtype = float)
+    db = np.empty ((len (b), len (w)))
+    gd = np.zeros ((len (b), len (idx)))
+    for k in range (len (b)):
+        wh, h = signal.freqz (b [k], a [k], w)
+        with np.errstate (divide = 'ignore'):
+            db [k] = 20 * np.log10 (abs (h))
+        if len (idx):
+            wgd, gd [k] = signal.group_delay ((b [k], a [k]), w [idx])
+    return db, gd
+# end def scipy_response
+
+def czt_sums (c, transform, deriv = True):
+    """ Same as poly_sums for frequencies on a uniform grid using a
+        chirp-z transform (a signal.CZT instance for the number of
+        coefficients in c). The derivative sums are computed for all
+        frequencies of the grid (None if deriv is False). The cost is
+        O(N log N) for N frequencies instead of O(N * number of
+        coefficients).
+    """
+    if not deriv:
+        return transform (c), None
+    return transform (c), transform (c * np.arange (c.shape [1]))
+# end def czt_sums
+
+def polar_roots (genes, nzeros, npoles):
+    """ Return zeros and poles for a 2-dimensional array of genes in
+        polar form: Each is a tuple of radius and angle (in rad). As in
+        gene_roots the conjugate complex roots are appended, missing
+        conjugates of real roots get radius 0.
+    """
+    genes = np.asarray (genes, dtype = float)
+    po    = 2 * nzeros
+    zeros = conjugate_polar (genes [:, 0:po:2], genes [:, 1:po:2])
+    poles = conjugate_polar (genes [:, po::2],  genes [:, po+1::2])
+    return zeros, poles
+# end def polar_roots
+
+def conjugate_polar (radius, angle):
+    phi = 2 * np.pi * angle
+    r   = np.where (radius * np.sin (phi) != 0, radius, 0)
+    return np.concatenate ((radius, r), axis = 1), \
+        np.concatenate ((phi, -phi), axis = 1)
+# end def conjugate_polar
+
+def root_distances (roots, w):
+    """ For each root (column) yield radius, sin² of half the angle
+        between root and e^jw and the squared distance from e^jw to
+        the root. The distance is computed as (1 - r)² + 4r sin² (Δ/2)
+        which does not suffer from cancellation near the unit circle.
+        A root exactly on the unit circle is moved away by the smallest
+        representable distance.
+    """
+    radius, phi = roots
+    w = np.asarray (w)
+    for j in range (radius.shape [1]):
+        r  = radius [:, j:j+1]
+        s2 = np.sin ((w - phi [:, j:j+1]) / 2) ** 2
+        d2 = (1 - r) ** 2 + 4 * r * s2
+        yield r, s2, np.maximum (d2, np.finfo (float).tiny)
+# end def root_distances
+
+def root_response (zeros, poles, k, w, idx):
+    """ Magnitude in dB at angular frequencies w and group delay in
+        samples at the frequencies w [idx] computed directly from the
+        roots in polar form: Each zero adds and each pole subtracts
+        20 log10 of the distance to e^jw to the magnitude. A root r e^jφ
+        contributes (r² - r cos (w - φ)) / |e^jw - r e^jφ|² to the
+        group delay, positive for zeros and negative for poles.
+    """
+    db = np.full ((len (zeros [0]), len (w)), 20 * np.log10 (abs (k)))
+    gd = np.zeros ((len (zeros [0]), len (idx)))
+    for roots, sign in ((zeros, 1), (poles, -1)):
+        for tdb, tgd in root_terms (roots, sign, w, idx):
+            db += tdb
+            gd += tgd
+    return db, gd
+# end def root_response
+
+def root_terms (roots, sign, w, idx):
+    """ Yield the contribution of each root (column) to magnitude and
+        group delay, see root_response, sign is 1 for zeros and -1 for
+        poles.
+    """
+    for r, s2, d2 in root_distances (roots, w):
+        yield ( sign * 10 * np.log10 (d2)
+              , sign * r * (r - 1 + 2 * s2 [:, idx]) / d2 [:, idx]
+              )
+# end def root_terms
+
+def root_gradient (gene, nzeros, npoles, k, w, idx):
+    """ Magnitude in dB at angular frequencies w and group delay at
+        w [idx] of a single gene (like root_response) and their
+        derivatives by each allele (one row per allele).
+    """
+    gene = np.asarray (gene, dtype = float)
+    w    = np.asarray (w)
+    db   = np.full (len (w), 20 * np.log10 (abs (k)))
+    gd   = np.zeros (len (idx))
+    ddb  = np.zeros ((len (gene), len (w)))
+    dgd  = np.zeros ((len (gene), len (idx)))
+    c    = 10 / np.log (10)
+    tiny = np.finfo (float).tiny
+    for j in range (nzeros + npoles):
+        sign = 1 if j < nzeros else -1
+        r    = gene [2 * j]
+        phi  = 2 * np.pi * gene [2 * j + 1]
+        roots = [(phi, 2 * np.pi)]
+        if r * np.sin (phi) != 0:
+            roots.append ((-phi, -2 * np.pi))
+        for ph, dphi in roots:
+            u    = w - ph
+            s2   = np.sin (u / 2) ** 2
+            d2   = np.maximum ((1 - r) ** 2 + 4 * r * s2, tiny)
+            dd_r = 2 * (r - 1 + 2 * s2)
+            dd_p = -2 * r * np.sin (u)
+            n    = r * (r - 1 + 2 * s2)
+            dn_r = 2 * r - 1 + 2 * s2
+            dn_p = -r * np.sin (u)
+            db  += sign * c * np.log (d2)
+            gd  += sign * n [idx] / d2 [idx]
+            ddb [2 * j]     += sign * c * dd_r / d2
+            ddb [2 * j + 1] += sign * c * dphi * dd_p / d2
+            q2   = d2 [idx] ** 2
+            dgd [2 * j]     += sign * (dn_r * d2 - n * dd_r) [idx] / q2
+            dgd [2 * j + 1] += \
+                sign * dphi * (dn_p * d2 - n * dd_p) [idx] / q2
+    return db, gd, ddb, dgd
+# end def root_gradient
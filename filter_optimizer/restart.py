@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+""" Restart of a stagnating run with --restarts: The elite is kept, the
+    other individuals are re-initialized.
+"""
+
+import sys
+import numpy as np
+from . import de
+
+class Restart_Mixin (object):
+    """ Restart method of the optimizer, see Filter_Opt_Mixin """
+
+    def restart (self):
+        """ Restart after stagnation: Keep the --restart-elite best
+            individuals and re-initialize the others, see --restart-init. The
+            restart is logged and written to the --events stream.
+        """
+        pop = de.PGA_OLDPOP
+        self.n_restarts += 1
+        rng    = np.random.default_rng \
+            ((self.args.random_seed, self.n_restarts))
+        n      = min (max (1, self.args.restart_elite), self.pop_size - 1)
+        elite  = self.best_individuals (n)
+        ps     = np.setdiff1d (np.arange (self.pop_size), elite)
+        lo, hi = self.init_range.T
+        if self.args.restart_init == 'uniform':
+            genes = rng.uniform (lo, hi, (len (ps), len (lo)))
+        else:
+            parent = self.get_population (pop, elite)
+            parent = parent [np.arange (len (ps)) % n]
+            noise  = rng.normal (size = parent.shape)
+            sigma  = self.args.restart_perturbation * (hi - lo)
+            genes  = np.clip (parent + noise * sigma, lo, hi)
+        evs = self.evaluate_genes (genes, pop, ps)
+        self.set_population (pop, genes, ps)
+        for p, e in zip (ps, evs):
+            self.set_evaluation (p, pop, e)
+        self.restart_evals += len (ps)
+        self.stag_count     = 0
+        changed = self.restart_engine (rng)
+        best    = self.get_evaluation (self.get_best_index (pop), pop)
+        log     = ''.join \
+            (' %s: %s' % (k, round (v, 4)) for k, v in changed.items ())
+        print \
+            ( "Restart: %s Iter: %s Evals: %s Best: %e%s"
+            % (self.n_restarts, self.generation, self.n_evaluations, best, log)
+            )
+        sys.stdout.flush ()
+        if self.events:
+            self.events.write \
+                ( 'restart'
+                , restart     = self.n_restarts
+                , generation  = self.generation
+                , evaluations = self.n_evaluations
+                , evaluation  = best
+                , changed     = changed
+                )
+    # end def restart
+
+# end class Restart_Mixin
+
+def add_options (cmd):
+    """ Add the command line options of restarts to the parser cmd """
+    cmd.add_argument \
+        ( '--restart-elite'
+        , help    = "Number of best individuals kept on a restart (at"
+                    " least one), default=%(default)s"
+        , type    = int
+        , default = 5
+        )
+    cmd.add_argument \
+        ( '--restart-init'
+        , help    = "Re-initialize the population on a restart around"
+                    " the elite ('elite', see --restart-perturbation) or"
+                    " uniformly in the init range ('uniform'),"
+                    " default=%(default)s"
+        , choices = ('elite', 'uniform')
+        , default = 'elite'
+        )
+    cmd.add_argument \
+        ( '--restart-perturbation'
+        , help    = "Standard deviation of the perturbation of the elite"
+                    " on a restart relative to the range of each allele,"
+                    " default=%(default)s"
+        , type    = float
+        , default = 0.1
+        )
+    cmd.add_argument \
+        ( '--restart-reseed'
+        , help    = "Use a new random seed after each restart (logged"
+                    " with the restart), only with --backend numpy"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--restart-vary-parameters'
+        , help    = "Draw a new DE scale factor and crossover rate from"
+                    " [0.5, 1] on each restart (logged with the restart),"
+                    " only with --backend numpy"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--restarts'
+        , help    = "Maximum number of restarts when the run stagnates"
+                    " (see --stagnation-generations), 0 stops the run"
+                    " instead, default=%(default)s; only used when not"
+                    " running in parallel"
+        , type    = int
+        , default = 0
+        )
+# end def add_options
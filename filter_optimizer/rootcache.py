@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+""" Cache of the per-root contributions to magnitude and group delay
+    for the 'roots' engine. With differential evolution a trial vector
+    often keeps most of its (radius, angle) pairs from the parent, only
+    the roots with changed genes need to be recomputed.
+"""
+
+import numpy as np
+from . import response
+
+class Root_Cache (object):
+    """ Per-root response terms (see response.root_terms) of a parent
+        and of its last trial for each population index, summed in the
+        same order as in response.root_response.
+    """
+
+    def __init__ (self, nzeros, npoles, k, w, idx, n_slots, max_bytes):
+        self.nzeros  = nzeros
+        self.npoles  = npoles
+        self.k       = k
+        self.w       = np.asarray (w)
+        self.idx     = idx
+        nroots       = 2 * (nzeros + npoles)
+        ngenes       = 2 * (nzeros + npoles)
+        per_slot     = 2 * nroots * (len (self.w) + len (idx)) * 8
+        self.n_slots = s = int (min (n_slots, max_bytes // per_slot))
+        # Terms are stored by root so that the terms of one root for
+        # many slots are contiguous
+        self.genes   = np.full  ((s, ngenes), np.nan)
+        self.tdb     = np.zeros ((nroots, s, len (self.w)))
+        self.tgd     = np.zeros ((nroots, s, len (idx)))
+        self.t_genes = np.full  ((s, ngenes), np.nan)
+        self.t_tdb   = np.zeros ((nroots, s, len (self.w)))
+        self.t_tgd   = np.zeros ((nroots, s, len (idx)))
+        self.t_roots = np.zeros ((s, nroots), dtype = bool)
+        # Column of each root and its conjugate for each gene pair
+        z            = np.arange (nzeros)
+        p            = np.arange (npoles) + 2 * nzeros
+        self.columns = np.concatenate \
+            ( (np.stack ((z, z + nzeros)), np.stack ((p, p + npoles)))
+            , axis = 1
+            )
+        self.sign    = np.where (np.arange (nroots) < 2 * nzeros, 1, -1)
+        self.n_roots = 0
+        self.n_reuse = 0
+    # end def __init__
+
+    def find_base (self, slots, parents):
+        """ Return a boolean array of the slots that hold the parent
+            genes as the base. If the parent is the last trial (it has
+            replaced the old base) the trial becomes the base.
+        """
+        replaced = (self.t_genes [slots] == parents).all (axis = 1)
+        for s in slots [replaced]:
+            c = self.t_roots [s]
+            self.tdb   [c, s] = self.t_tdb [c, s]
+            self.tgd   [c, s] = self.t_tgd [c, s]
+            self.genes [s]    = self.t_genes [s]
+            self.t_genes [s]  = np.nan
+        return (self.genes [slots] == parents).all (axis = 1)
+    # end def find_base
+
+    def response (self, genes, individuals, parents = None):
+        """ Magnitude in dB and group delay for a 2-dimensional array
+            of genes, individuals are the population indices of the
+            rows, parents the genes of the parents (None if the genes
+            are from the old population which become the base).
+        """
+        n      = len (genes)
+        slots  = np.asarray (individuals)
+        cached = np.flatnonzero (slots < self.n_slots)
+        cs     = slots [cached]
+        need   = np.ones ((n, len (self.sign)), dtype = bool)
+        hit    = cached [:0]
+        if parents is not None:
+            hit = cached [self.find_base (cs, parents [cached])]
+        hs     = slots [hit]
+        if len (hit):
+            old = self.genes [hs].reshape (len (hit), -1, 2)
+            new = genes [hit].reshape (len (hit), -1, 2)
+            changed = (old != new).any (axis = 2)
+            need [hit] = False
+            for c in self.columns:
+                need [hit [:, None], c] = changed
+        zeros, poles = response.polar_roots (genes, self.nzeros, self.npoles)
+        radius = np.concatenate ((zeros [0], poles [0]), axis = 1)
+        phi    = np.concatenate ((zeros [1], poles [1]), axis = 1)
+        db = np.full ((n, len (self.w)), 20 * np.log10 (abs (self.k)))
+        gd = np.zeros ((n, len (self.idx)))
+        tdb = np.empty (db.shape)
+        tgd = np.empty (gd.shape)
+        for c, sign in enumerate (self.sign):
+            rows = np.flatnonzero (need [:, c])
+            tdb [hit] = self.tdb [c, hs]
+            tgd [hit] = self.tgd [c, hs]
+            if len (rows):
+                roots = (radius [rows, c:c+1], phi [rows, c:c+1])
+                tdb [rows], tgd [rows] = next \
+                    (response.root_terms (roots, sign, self.w, self.idx))
+            db += tdb
+            gd += tgd
+            if parents is None:
+                self.tdb [c, cs] = tdb [cached]
+                self.tgd [c, cs] = tgd [cached]
+            else:
+                new = cached [need [cached, c]]
+                self.t_tdb [c, slots [new]] = tdb [new]
+                self.t_tgd [c, slots [new]] = tgd [new]
+        if parents is None:
+            # A trial only holds the roots that differ from its base
+            self.genes   [cs] = genes [cached]
+            self.t_genes [cs] = np.nan
+        else:
+            self.t_genes [cs] = genes [cached]
+            self.t_roots [cs] = need [cached]
+        self.n_roots += np.count_nonzero (need)
+        self.n_reuse += need.size - np.count_nonzero (need)
+        return db, gd
+    # end def response
+
+# end class Root_Cache
@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+""" Seeding of the initial population: Genes from the warm-start
+    results of an order search, from the logs of previous runs
+    (--seed-from) and from classical designs (--init-classical).
+"""
+
+import numpy as np
+from . import classical
+from . import response
+from . import showfromlog
+
+def adapt_gene (gene, nzeros, npoles, to_zeros, to_poles):
+    """ Adapt a gene with nzeros zeros and npoles poles to to_zeros
+        zeros and to_poles poles: Missing roots are added with radius
+        0 which does not change the filter (the factor 1 - r z^-1 is
+        1), surplus roots with the smallest radius (the least effect
+        on the response) are dropped.
+    """
+    pairs = np.asarray (gene, dtype = float).reshape (-1, 2)
+    parts = []
+    for roots, n in (pairs [:nzeros], to_zeros), (pairs [nzeros:], to_poles):
+        if len (roots) > n:
+            keep  = np.sort (np.argsort (-roots [:, 0], kind = 'stable') [:n])
+            roots = roots [keep]
+        parts.append (roots)
+        parts.append (np.zeros ((n - len (roots), 2)))
+    return np.concatenate (parts).reshape (-1)
+# end def adapt_gene
+
+
+class Seed_Mixin (object):
+    """ Seeding methods of the optimizer, see Filter_Opt_Mixin """
+
+    def seed_population (self, warm = ()):
+        """ Genes for the start of the initial population from the
+            warm-start results warm (gene, zeros, poles), --seed-from and
+            --init-classical, padded with perturbed variants.
+        """
+        genes = \
+            [ adapt_gene (g, z, p, self.nzeros, self.npoles)
+              for g, z, p in warm
+            ]
+        genes = genes + self.log_genes () + self.classical_genes ()
+        n = int (self.pop_size * self.args.seed_fraction)
+        if not genes or not n:
+            return None
+        lo, hi = self.init_range.T
+        genes  = np.clip (np.array (genes), lo, hi)
+        _, idx = np.unique (genes, axis = 0, return_index = True)
+        genes  = genes [np.sort (idx)]
+        evs    = self.evaluate_genes (genes)
+        genes  = genes [np.argsort (evs, kind = 'stable')][:n]
+        rng    = np.random.default_rng (self.args.random_seed)
+        parent = genes [np.arange (n - len (genes)) % len (genes)]
+        noise  = rng.normal (size = parent.shape)
+        sigma  = self.args.seed_perturbation * (hi - lo)
+        return np.concatenate \
+            ((genes, np.clip (parent + noise * sigma, lo, hi)))
+    # end def seed_population
+
+    def log_genes (self):
+        """ Genes of the results in the log files of --seed-from
+            adapted to our number of zeros and poles, the best first.
+            The gain is not part of the gene, with a fixed gain all
+            results must have been computed with this gain.
+        """
+        experiments = []
+        for fn in self.args.seed_from:
+            with open (fn, 'r') as f:
+                for ex in showfromlog.Experiment.Read (f):
+                    if  ( not self.auto_gain
+                        and not np.isclose (ex.a0, self.a0, rtol = 1e-9)
+                        ):
+                        raise ValueError \
+                            ( "Result in %s has gain %.10g, not the"
+                              " --gain %.10g of this run (use --gain 0)"
+                            % (fn, ex.a0, self.a0)
+                            )
+                    experiments.append (ex)
+        experiments.sort (key = lambda ex: ex.evaluation)
+        return \
+            [ adapt_gene
+                (ex.gene, ex.nzeros, ex.npoles, self.nzeros, self.npoles)
+              for ex in experiments
+            ]
+    # end def log_genes
+
+    def classical_genes (self):
+        """ Genes of the classical designs for the band edges and
+            ripple of the magnitude bounds with --init-classical. The
+            gain of a design is lost in the conversion to a gene (the
+            gain is --gain unless it is computed for each individual),
+            if the level in the passband is too low
+            and there is a free zero and pole it is corrected with a
+            zero/pole pair, see classical.gain_pairs.
+        """
+        spec = classical.Band_Spec (self.udb, self.ldb)
+        if not self.args.init_classical or not spec:
+            return []
+        x      = self.ldb.x
+        target = (spec.pass_hi + spec.pass_lo) / 2
+        genes  = []
+        for family, order, zp, pp in classical.designs \
+            (spec, self.nzeros, self.npoles):
+            gene = self.pair_gene (zp, pp)
+            if not self.auto_gain:
+                zeros, poles = response.polar_roots \
+                    ([gene], self.nzeros, self.npoles)
+                db, gd = response.root_response \
+                    (zeros, poles, self.a0, x, np.arange (0))
+                if self.args.use_prefilter:
+                    db += self.prefilter_db (x)
+                level  = (db.max () + db.min ()) / 2
+                factor = 10 ** ((target - level) / 20)
+                if  ( factor > 1 / self.init_range [-2, 1]
+                    and len (zp) < self.nzeros
+                    and len (pp) < self.npoles
+                    ):
+                    z, p = classical.gain_pairs (factor)
+                    gene = self.pair_gene (zp + [z], pp + [p])
+            genes.append (gene)
+        return genes
+    # end def classical_genes
+
+    def pair_gene (self, zeros, poles):
+        """ Gene from lists of (radius, angle) pairs of zeros and
+            poles, missing roots get radius 0 (see adapt_gene).
+        """
+        gene = np.zeros ((self.nzeros + self.npoles, 2))
+        if zeros:
+            gene [:len (zeros)] = zeros
+        if poles:
+            gene [self.nzeros:self.nzeros + len (poles)] = poles
+        return gene.reshape (-1)
+    # end def pair_gene
+
+# end class Seed_Mixin
+
+def add_options (cmd):
+    """ Add the command line options of seeding to the parser cmd """
+    cmd.add_argument \
+        ( '--init-classical'
+        , help    = "Seed the initial population with classical IIR"
+                    " designs (elliptic, Chebyshev, Butterworth) for the"
+                    " band edges and ripple of the magnitude bounds, see"
+                    " --seed-fraction"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--seed-fraction'
+        , help    = "Fraction of the initial population seeded with"
+                    " --seed-from and --init-classical, default=%(default)s"
+        , type    = float
+        , default = 0.5
+        )
+    cmd.add_argument \
+        ( '--seed-from'
+        , help    = "Seed the initial population with the results in"
+                    " this log file (or --events stream) of a previous"
+                    " run (results with a"
+                    " different number of zeros or poles are adapted),"
+                    " the results must have the same gain unless --gain"
+                    " is 0, can be specified multiple times"
+        , default = []
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--seed-perturbation'
+        , help    = "Standard deviation of the perturbation of variants"
+                    " of the --seed-from genes relative to the range of"
+                    " each allele, default=%(default)s"
+        , type    = float
+        , default = 0.01
+        )
+# end def add_options
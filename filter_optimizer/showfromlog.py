@@ -1,11 +1,14 @@
 #!/usr/bin/python3
 
 import sys
+import itertools
 from scipy import signal
 import matplotlib.pyplot as plt
 import numpy as np
 from argparse import ArgumentParser
 from . import filterplot
+from . import response
+from . import events
 
 class Experiment:
 
@@ -13,6 +16,7 @@ class Experiment:
         ( self, nzeros, npoles, gene
         , title = None, is_valid = True, a0 = 0.00390625, prefilter = False
         , mag_l = None, mag_u = None, del_l = None, del_u = None
+        , engine = 'polynomial', evaluation = None
         ):
         self.nzeros      = nzeros
         self.npoles      = npoles
@@ -25,6 +29,8 @@ class Experiment:
         self.mag_u       = mag_u
         self.del_l       = del_l
         self.del_u       = del_u
+        self.engine      = engine
+        self.evaluation  = evaluation
         if not (mag_l or mag_u or del_l or del_u):
             self.mag_l = filterplot.default_lower_magnitude.copy ()
             self.mag_u = filterplot.default_upper_magnitude.copy ()
@@ -56,6 +62,9 @@ class Experiment:
         prefilter   = False
         scale_by_pi = True
         title       = None
+        engine      = 'polynomial'
+        a0          = 0.00390625
+        gain        = None
         for line in f:
             line = line.strip ()
             if line.startswith (best):
@@ -80,6 +89,12 @@ class Experiment:
                 if line.startswith ('scale_by_pi'):
                     if line.split (':')[-1].strip () == 'False':
                         scale_by_pi = False
+                if line.startswith ('Gain:'):
+                    gain = float (line.split (':')[-1])
+                if line.startswith ('gain'):
+                    a0 = float (line.split (':')[-1]) or a0
+                if line.startswith ('engine'):
+                    engine = line.split (':')[-1].strip ()
                 if line.startswith ('poles'):
                     npoles = int (line.split (':')[-1])
                 if line.startswith ('zeros'):
@@ -107,15 +122,82 @@ class Experiment:
             return cls \
                 ( nzeros, npoles, gene
                 , title = title, is_valid = eval == 0, prefilter = prefilter
+                , a0 = gain or a0
                 , mag_l = mag_l, mag_u = mag_u, del_l = del_l, del_u = del_u
+                , engine = engine, evaluation = eval
                 )
     # end def Parse
 
+    @classmethod
+    def From_Event (cls, event):
+        """ Experiment from a 'result' event of an --events stream """
+        args = event ['args']
+        kw   = dict (scale_by_pi = args ['scale_by_pi'])
+        def bounds (name, is_lower = False):
+            return filterplot.Filter_Bounds \
+                ( *(filterplot.Filter_Bound.Parse (b, **kw)
+                    for b in args [name]
+                   )
+                , is_lower = is_lower
+                )
+        return cls \
+            ( event ['zeros'], event ['poles'], event ['gene']
+            , title      = "Iter: %s Evals: %s"
+                         % (event ['generation'], event ['evaluations'])
+            , is_valid   = event ['success']
+            , a0         = event ['gain']
+            , prefilter  = args ['use_prefilter']
+            , mag_l      = bounds ('magnitude_lower_bound', True)
+            , mag_u      = bounds ('magnitude_upper_bound')
+            , del_l      = bounds ('delay_lower_bound', True)
+            , del_u      = bounds ('delay_upper_bound')
+            , engine     = args ['engine']
+            , evaluation = event ['evaluation']
+            )
+    # end def From_Event
+
+    @classmethod
+    def Read (cls, f):
+        """ All experiments in the open file f, a log or an --events
+            stream.
+        """
+        first = f.readline ()
+        lines = itertools.chain ([first], f)
+        if events.is_event_line (first):
+            for event in events.read_events (lines):
+                if event ['event'] == 'result':
+                    yield cls.From_Event (event)
+            return
+        while True:
+            ex = cls.Parse (lines)
+            if ex is None:
+                break
+            yield ex
+    # end def Read
+
+    def frequency_response (self, n, wgd):
+        """ Compute frequency response at n points and group delay at
+            frequencies wgd with the configured engine.
+            Returns the tuple w, h, wgd, gd, for the 'roots' engine h
+            is the magnitude (not the complex response).
+        """
+        if self.engine == 'roots':
+            w = np.linspace (0, np.pi, n, endpoint = False)
+            zeros, poles = response.polar_roots \
+                ([self.gene], self.nzeros, self.npoles)
+            x   = np.concatenate ((w, wgd))
+            idx = np.arange (n, len (x))
+            db, gd = response.root_response (zeros, poles, self.a0, x, idx)
+            return w, 10 ** (db [0, :n] / 20), wgd, gd [0]
+        w, h = signal.freqz (self.b, self.a, n)
+        (wgd, gd) = signal.group_delay ((self.b, self.a), wgd)
+        return w, h, wgd, gd
+    # end def frequency_response
+
     def display (self, fine = False, **kw):
-        w, h = signal.freqz (self.b, self.a, 50000)
         r = np.arange (0, np.pi, np.pi / 512)
         r = np.array (sorted (np.concatenate ((r, self.del_u.x))))
-        (wgd, gd) = signal.group_delay ((self.b, self.a), r)
+        w, h, wgd, gd = self.frequency_response (50000, r)
         if self.prefilter:
             # Pre-Filter, only makes sense for original example
             fir  = \
@@ -153,7 +235,8 @@ def main (argv = sys.argv [1:]):
     cmd = ArgumentParser ()
     cmd.add_argument \
         ( 'filename'
-        , help    = 'File to parse, can contain multiple experiments'
+        , help    = 'File to parse (a log or an --events stream), can'
+                    ' contain multiple experiments'
         , nargs   = '+'
         )
     cmd.add_argument \
@@ -196,10 +279,7 @@ def main (argv = sys.argv [1:]):
     args = cmd.parse_args ()
     for fn in args.filename:
         with open (fn, 'r') as f:
-            while 1:
-                ex = Experiment.Parse (f)
-                if ex is None:
-                    break
+            for ex in Experiment.Read (f):
                 if args.filename_as_title:
                     ex.title = fn
                 if ex.is_valid or args.show_failed:
@@ -0,0 +1,382 @@
+#!/usr/bin/python3
+""" Parameter sweeps of filter-optimizer: The grid of the --param
+    values is expanded into jobs (one optimization each) which are
+    kept in an SQLite database. Each job is keyed by its normalized
+    command line arguments, so a job that is already in the database
+    is not added again and a job that is done is not run again. The
+    jobs are run by local processes, each claims the next job in a
+    transaction, so several filter-sweep instances (e.g. in the slots
+    of a batch system) can work on the same database. Jobs of a sweep
+    that was interrupted are run again when the sweep is restarted on
+    the same host (or on any host with --reset-running).
+    The results are stored in the database and can be listed as CSV
+    with --list.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import itertools
+import multiprocessing
+import traceback
+from argparse import ArgumentParser
+from csv      import DictWriter
+from . import filter_optimizer
+from . import de
+
+schema = \
+    """ create table if not exists job
+          ( id          integer primary key
+          , key         text unique not null
+          , argv        text not null
+          , params      text not null
+          , state       text not null default 'todo'
+          , host        text
+          , pid         integer
+          , started     real
+          , finished    real
+          , evaluation  real
+          , generations integer
+          , evaluations integer
+          , result      text
+          );
+    """
+
+def param_values (spec):
+    """ Name and values of a --param NAME=V1,V2,... specification, a
+        value A..B is expanded to the integers from A to B.
+    """
+    try:
+        name, values = spec.split ('=', 1)
+    except ValueError:
+        raise ValueError ("Expected NAME=V1,V2,...: %s" % spec)
+    result = []
+    for v in values.split (','):
+        if '..' in v:
+            a, b = v.split ('..', 1)
+            result.extend (str (k) for k in range (int (a), int (b) + 1))
+        else:
+            result.append (v)
+    return name.strip ().lstrip ('-').replace ('_', '-'), result
+# end def param_values
+
+def expand (specs):
+    """ The grid of the --param specifications: A list of dictionaries
+        mapping the option names to one value each.
+    """
+    params = [param_values (s) for s in specs]
+    names  = [n for n, v in params]
+    return \
+        [ dict (zip (names, values))
+          for values in itertools.product (*(v for n, v in params))
+        ]
+# end def expand
+
+def job_argv (cmd, base, params):
+    """ Command line of filter-optimizer for a job: The base arguments
+        followed by the params, an option without argument is given
+        for the value 'on' and omitted for 'off'.
+    """
+    argv = list (base)
+    for name, value in params.items ():
+        opt    = '--' + name
+        action = cmd._option_string_actions.get (opt)
+        if action is None:
+            raise ValueError ("Unknown option: %s" % opt)
+        if action.nargs == 0:
+            if value not in ('on', 'off'):
+                raise ValueError ("Expected on or off for %s" % opt)
+            if value == 'on':
+                argv.append (opt)
+        else:
+            argv.extend ((opt, value))
+    return argv
+# end def job_argv
+
+def job_key (cmd, argv):
+    """ The normalized arguments of a job, equal for all command lines
+        that result in the same optimization.
+    """
+    args = vars (cmd.parse_args (argv))
+    return json.dumps (args, sort_keys = True, default = str)
+# end def job_key
+
+class Job_Queue (object):
+    """ The jobs in the SQLite database filename, each process needs
+        its own Job_Queue.
+    """
+
+    def __init__ (self, filename):
+        self.db = sqlite3.connect \
+            (filename, timeout = 60, isolation_level = None)
+        self.db.executescript (schema)
+    # end def __init__
+
+    def add (self, key, argv, params):
+        """ Add a job, returns False if it is already in the queue """
+        cur = self.db.execute \
+            ( "insert or ignore into job (key, argv, params)"
+              " values (?, ?, ?)"
+            , (key, json.dumps (argv), json.dumps (params))
+            )
+        return cur.rowcount > 0
+    # end def add
+
+    def reset (self, retry_failed = False, running = False):
+        """ Jobs claimed by processes on this host that no longer exist
+            were interrupted, they (and with retry_failed the failed
+            jobs) are run again. The processes of other hosts cannot
+            be checked, with running all running jobs (of all hosts)
+            are run again, this must only be used when no other sweep
+            works on the database.
+        """
+        if running:
+            self.db.execute \
+                ("update job set state = 'todo' where state = 'running'")
+        host = socket.gethostname ()
+        rows = self.db.execute \
+            ("select id, pid from job where state = 'running' and host = ?"
+            , (host,)
+            ).fetchall ()
+        for id, pid in rows:
+            try:
+                os.kill (pid, 0)
+            except ProcessLookupError:
+                self.db.execute \
+                    ("update job set state = 'todo' where id = ?", (id,))
+            except PermissionError:
+                pass
+        if retry_failed:
+            self.db.execute \
+                ("update job set state = 'todo' where state = 'failed'")
+    # end def reset
+
+    def claim (self):
+        """ Claim the next job, returns its id and command line or None
+            if there is no job left.
+        """
+        self.db.execute ("begin immediate")
+        try:
+            row = self.db.execute \
+                ( "select id, argv from job where state = 'todo'"
+                  " order by id limit 1"
+                ).fetchone ()
+            if row:
+                self.db.execute \
+                    ( "update job set state = 'running', host = ?, pid = ?"
+                      ", started = ? where id = ?"
+                    , ( socket.gethostname (), os.getpid (), time.time ()
+                      , row [0]
+                      )
+                    )
+        finally:
+            self.db.execute ("commit")
+        if row is None:
+            return None
+        return row [0], json.loads (row [1])
+    # end def claim
+
+    def done (self, id, result):
+        """ Store the result (a dictionary) of job id """
+        self.db.execute \
+            ( "update job set state = ?, finished = ?, evaluation = ?"
+              ", generations = ?, evaluations = ?, result = ? where id = ?"
+            , ( 'failed' if 'error' in result else 'done', time.time ()
+              , result.get ('evaluation'), result.get ('generations')
+              , result.get ('evaluations'), json.dumps (result), id
+              )
+            )
+    # end def done
+
+    def count (self):
+        """ Number of jobs by state """
+        return dict \
+            ( self.db.execute
+                ("select state, count (*) from job group by state")
+            )
+    # end def count
+
+    def jobs (self):
+        """ All jobs in the order they were added """
+        cur = self.db.execute \
+            ( "select id, params, state, evaluation, generations"
+              ", evaluations from job order by id"
+            )
+        for id, params, state, ev, gen, evals in cur:
+            yield dict \
+                ( json.loads (params)
+                , id = id, state = state, evaluation = ev
+                , generations = gen, evaluations = evals
+                )
+    # end def jobs
+
+# end class Job_Queue
+
+def run_job (argv):
+    """ Run the optimization of a job, returns its result """
+    args  = filter_optimizer.parse_args (filter_optimizer.options (), argv)
+    start = time.time ()
+    opt   = filter_optimizer.optimizer_class (args) (args)
+    opt.run ()
+    pop = de.PGA_OLDPOP
+    p   = opt.get_best_index (pop)
+    ev  = float (opt.get_evaluation (p, pop))
+    return dict \
+        ( evaluation  = ev
+        , success     = ev == 0
+        , generations = opt.generation
+        , evaluations = opt.n_evaluations
+        , zeros       = opt.nzeros
+        , poles       = opt.npoles
+        , gene        = [float (a) for a in opt.get_population (pop, [p]) [0]]
+        , seconds     = time.time () - start
+        )
+# end def run_job
+
+def work (filename, log_dir):
+    """ Main function of a local process: Run jobs until none is left,
+        the output of job n goes to log_dir/n.log (or is discarded).
+    """
+    queue = Job_Queue (filename)
+    while True:
+        job = queue.claim ()
+        if job is None:
+            break
+        id, argv = job
+        fn = os.devnull
+        if log_dir:
+            fn = os.path.join (log_dir, '%d.log' % id)
+        with open (fn, 'w') as f:
+            sys.stdout.flush ()
+            os.dup2 (f.fileno (), sys.stdout.fileno ())
+            # SystemExit is an error in the arguments of the job, an
+            # interrupted job stays running and is reset on restart
+            try:
+                result = run_job (argv)
+            except (Exception, SystemExit):
+                result = dict (error = traceback.format_exc ())
+            sys.stdout.flush ()
+        queue.done (id, result)
+# end def work
+
+def main (argv = sys.argv [1:]):
+    base = []
+    if '--' in argv:
+        idx  = argv.index ('--')
+        base = argv [idx + 1:]
+        argv = argv [:idx]
+    cmd = ArgumentParser \
+        ( usage = "%(prog)s [options] database [-- filter-optimizer options]"
+        )
+    cmd.add_argument \
+        ( 'database'
+        , help    = "SQLite database with the jobs, created if it does not"
+                    " exist"
+        )
+    cmd.add_argument \
+        ( '-j', '--jobs'
+        , help    = "Number of jobs run in parallel in local processes,"
+                    " 0 only adds the jobs, default=%(default)s"
+        , type    = int
+        , default = os.cpu_count ()
+        )
+    cmd.add_argument \
+        ( '--list'
+        , help    = "Write the jobs with their parameters and results as"
+                    " CSV to standard output, no jobs are run"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--log-dir'
+        , help    = "Write the log of job N to LOG_DIR/N.log, by default the"
+                    " logs are discarded"
+        )
+    cmd.add_argument \
+        ( '-p', '--param'
+        , help    = "Values of a filter-optimizer option in the form"
+                    " NAME=V1,V2,... where NAME is the long option without"
+                    " the leading dashes, A..B are the integers from A to"
+                    " B, options without argument take the values on and"
+                    " off; the sweep runs all combinations of the values"
+                    " of all --param options, can be specified multiple"
+                    " times"
+        , default = []
+        , action  = 'append'
+        )
+    cmd.add_argument \
+        ( '--reset-running'
+        , help    = "Run all jobs again that are marked running, also those"
+                    " of other hosts; only use this if no other sweep works"
+                    " on the database, by default only the interrupted"
+                    " jobs of this host are run again"
+        , default = False
+        , action  = 'store_true'
+        )
+    cmd.add_argument \
+        ( '--retry-failed'
+        , help    = "Run failed jobs again"
+        , default = False
+        , action  = 'store_true'
+        )
+    args  = cmd.parse_args (argv)
+    queue = Job_Queue (args.database)
+    if args.list:
+        jobs   = list (queue.jobs ())
+        fields = []
+        for job in jobs:
+            fields.extend (k for k in job if k not in fields)
+        dw = DictWriter (sys.stdout, delimiter = ';', fieldnames = fields)
+        dw.writeheader ()
+        dw.writerows (jobs)
+        return
+    opt = filter_optimizer.options ()
+    new = 0
+    # Without --param the base arguments are a single job
+    for params in expand (args.param):
+        try:
+            jargv = job_argv (opt, base, params)
+        except ValueError as err:
+            print (cmd.usage)
+            exit (str (err))
+        a = filter_optimizer.parse_args (opt, jargv)
+        if a.islands or a.race or a.order_search or a.checkpoint:
+            print (cmd.usage)
+            exit \
+                ( "Jobs cannot use --islands, --race, --order-search and"
+                  " --checkpoint"
+                )
+        new += queue.add (job_key (opt, jargv), jargv, params)
+    queue.reset (args.retry_failed, args.reset_running)
+    count = queue.count ()
+    print \
+        ( "New jobs: %s To do: %s Done: %s Failed: %s"
+        % ( new, count.get ('todo', 0), count.get ('done', 0)
+          , count.get ('failed', 0)
+          )
+        )
+    if args.log_dir:
+        os.makedirs (args.log_dir, exist_ok = True)
+    ctx = multiprocessing.get_context ('fork')
+    sys.stdout.flush ()
+    processes = []
+    for k in range (min (args.jobs, count.get ('todo', 0))):
+        p = ctx.Process (target = work, args = (args.database, args.log_dir))
+        p.start ()
+        processes.append (p)
+    for p in processes:
+        p.join ()
+    count = queue.count ()
+    print \
+        ( "To do: %s Running: %s Done: %s Failed: %s"
+        % ( count.get ('todo', 0), count.get ('running', 0)
+          , count.get ('done', 0), count.get ('failed', 0)
+          )
+        )
+# end def main
+
+if __name__ == '__main__':
+    main ()
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+""" Evaluation of many individuals in a pool of local worker processes
+    without MPI. The workers are forked from the optimizer process, so
+    each has its own copy of the evaluation state (e.g. the compiled
+    constraint grid) as of the time the pool is created. Genes and
+    evaluations are exchanged through shared memory, only the range of
+    rows to evaluate is sent to a worker. The pool is used either
+    synchronously (evaluate all rows and wait for all workers) or
+    asynchronously (each worker evaluates the rows of its own slot,
+    see submit and completed).
+"""
+
+import time
+import multiprocessing
+import traceback
+import numpy as np
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+
+class Worker_Pool (object):
+    """ Pool of n_workers processes calling evaluate with a
+        2-dimensional array of genes (at most n_rows rows with n_cols
+        alleles), evaluate must return an array of evaluations.
+    """
+
+    def __init__ (self, evaluate, n_workers, n_rows, n_cols):
+        ctx             = multiprocessing.get_context ('fork')
+        self.shm_genes  = shared_memory.SharedMemory \
+            (create = True, size = n_rows * n_cols * 8)
+        self.shm_evals  = shared_memory.SharedMemory \
+            (create = True, size = n_rows * 8)
+        self.genes      = np.ndarray \
+            ((n_rows, n_cols), dtype = float, buffer = self.shm_genes.buf)
+        self.evals      = np.ndarray \
+            ((n_rows,), dtype = float, buffer = self.shm_evals.buf)
+        self.conns      = []
+        self.processes  = []
+        # Rows of the slot of each worker in asynchronous use
+        self.n_workers  = n_workers
+        self.slot_size  = n_rows // n_workers
+        self.pending    = {}
+        # Time spent evaluating by all workers, for the utilization
+        self.busy       = 0.0
+        self.started    = time.time ()
+        for k in range (n_workers):
+            conn, child = ctx.Pipe ()
+            p = ctx.Process \
+                (target = self.work, args = (evaluate, child), daemon = True)
+            p.start ()
+            child.close ()
+            self.conns.append (conn)
+            self.processes.append (p)
+    # end def __init__
+
+    def work (self, evaluate, conn):
+        """ Main loop of a worker: Receives a range of rows, evaluates
+            these and returns None or the traceback of an error and
+            the time used.
+        """
+        while True:
+            msg = conn.recv ()
+            if msg is None:
+                break
+            lo, hi = msg
+            t = time.perf_counter ()
+            try:
+                self.evals [lo:hi] = evaluate (self.genes [lo:hi])
+                conn.send ((None, time.perf_counter () - t))
+            except Exception:
+                conn.send ((traceback.format_exc (), 0.0))
+        conn.close ()
+    # end def work
+
+    def reply (self, conn):
+        """ Receive the reply of a worker, raise an error if the
+            evaluation failed.
+        """
+        err, t = conn.recv ()
+        self.busy += t
+        if err:
+            raise RuntimeError ("Error in worker:\n" + err)
+    # end def reply
+
+    def evaluate (self, genes):
+        """ Evaluate the rows of genes split evenly over the workers """
+        n = len (genes)
+        self.genes [:n] = genes
+        limits = np.linspace (0, n, len (self.conns) + 1).astype (int)
+        busy   = []
+        for conn, lo, hi in zip (self.conns, limits [:-1], limits [1:]):
+            if hi > lo:
+                conn.send ((int (lo), int (hi)))
+                busy.append (conn)
+        replies = [conn.recv () for conn in busy]
+        self.busy += sum (t for e, t in replies)
+        errors  = [e for e, t in replies if e]
+        if errors:
+            raise RuntimeError ("Error in worker:\n" + errors [0])
+        return self.evals [:n].copy ()
+    # end def evaluate
+
+    def submit (self, k, genes):
+        """ Start the evaluation of genes (at most slot_size rows) in
+            worker k without waiting for the result.
+        """
+        lo = k * self.slot_size
+        hi = lo + len (genes)
+        self.genes [lo:hi] = genes
+        self.pending [k] = (lo, hi)
+        self.conns [k].send ((lo, hi))
+    # end def submit
+
+    def completed (self):
+        """ Wait until at least one submitted evaluation is done,
+            returns a list of worker and evaluations for each.
+        """
+        conns  = dict ((self.conns [k], k) for k in self.pending)
+        result = []
+        for conn in wait (list (conns)):
+            k = conns [conn]
+            self.reply (conn)
+            lo, hi = self.pending.pop (k)
+            result.append ((k, self.evals [lo:hi].copy ()))
+        return result
+    # end def completed
+
+    def utilization (self):
+        """ Fraction of the lifetime of the pool the workers spent
+            evaluating.
+        """
+        elapsed = time.time () - self.started
+        return self.busy / (self.n_workers * elapsed)
+    # end def utilization
+
+    def close (self):
+        # Wait for running evaluations, errors are not of interest
+        for k in self.pending:
+            self.conns [k].recv ()
+        self.pending = {}
+        for conn in self.conns:
+            conn.send (None)
+            conn.close ()
+        for p in self.processes:
+            p.join ()
+        self.conns = self.processes = []
+        # Release the views before closing the shared memory
+        del self.genes, self.evals
+        for shm in self.shm_genes, self.shm_evals:
+            shm.close ()
+            shm.unlink ()
+    # end def close
+
+# end class Worker_Pool
@@ -54,6 +54,7 @@ setup \
             , 'filter-display-result=filter_optimizer.display_result:main'
             , 'filter-show-from-log=filter_optimizer.showfromlog:main'
             , 'filter-parse-result=filter_optimizer.parse_result:main'
+            , 'filter-sweep=filter_optimizer.sweep:main'
             ]
         )
     , classifiers      = \
@@ -0,0 +1,58 @@
+""" Helpers for the tests """
+import numpy as np
+from scipy import signal
+
+# Magnitude bounds only (no delay bounds), from the highpass in the README
+magnitude_only = \
+    ( '-P', '7', '-Z', '7', '--dont-scale-by-pi'
+    , '-u', '0,1,-70,-70,100', '-u', '1,1.5,2.5,2.5,100'
+    , '-l', '1.5,3.14159265,-0.075,-0.075,31,1'
+    , '-u', '1.5,3.14159265,0.075,0.075,31,1'
+    )
+
+def random_genes (opt, n, seed = 23):
+    """ n random genes: radius and angle of the zeros, then of the poles """
+    rng = np.random.default_rng (seed)
+    hi  = [5, 0.5] * opt.nzeros + [0.999, 0.5] * opt.npoles
+    return rng.uniform (0, hi, (n, len (hi)))
+# end def random_genes
+
+def best_gene (opt, pop):
+    """ Genes and evaluation of the best individual in pop """
+    p = opt.get_best_index (pop)
+    n = 2 * (opt.nzeros + opt.npoles)
+    genes = [opt.get_allele (p, pop, i) for i in range (n)]
+    return genes, opt.get_evaluation (p, pop)
+# end def best_gene
+
+def baseline_evaluate (opt, gene):
+    """ Evaluation of one gene with scipy.signal like the original
+        single-individual evaluate of the optimizer.
+    """
+    po    = 2 * opt.nzeros
+    zeros = [gene [2*k]    * np.e ** (2j * np.pi * gene [2*k+1])
+             for k in range (opt.nzeros)]
+    poles = [gene [2*k+po] * np.e ** (2j * np.pi * gene [2*k+po+1])
+             for k in range (opt.npoles)]
+    zeros.extend ([z.conjugate () for z in zeros if z.imag])
+    poles.extend ([p.conjugate () for p in poles if p.imag])
+    b, a = signal.zpk2tf (zeros, poles, opt.a0)
+    dbx  = sorted (set (np.concatenate ((opt.ldb.x, opt.udb.x))))
+    dlx  = sorted (set (np.concatenate ((opt.udelay.x, opt.ldelay.x))))
+    wgd, gd = signal.group_delay ((b, a), dlx)
+    w, h = signal.freqz (b, a, dbx)
+    db = dict (zip (dbx, 20 * np.log10 (abs (h))))
+    gd = dict (zip (dlx, gd))
+    ev = 0
+    for x, y in opt.udb:
+        if db [x] > y:
+            ev += (db [x] - y) ** 2
+    for x, y in opt.ldb:
+        if db [x] < y:
+            ev += (db [x] - y) ** 2
+    delta = max ((gd [x] - y for x, y in opt.udelay), default = 0)
+    for x, y in opt.ldelay:
+        if gd [x] - delta < y:
+            ev += (gd [x] - delta - y) ** 2
+    return ev
+# end def baseline_evaluate
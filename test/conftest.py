@@ -0,0 +1,17 @@
+import pytest
+from filter_optimizer import filter_optimizer
+
+@pytest.fixture
+def optimizer ():
+    """ Factory for optimizers for the given command line, with
+        run = True the optimizer is also run.
+    """
+    def make (*argv, run = False):
+        args = filter_optimizer.parse_args \
+            (filter_optimizer.options (), list (argv))
+        opt  = filter_optimizer.optimizer_class (args) (args)
+        if run:
+            opt.run ()
+        return opt
+    return make
+# end def optimizer
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from common import random_genes
+
+class Test_Active_Set:
+
+    def active (self, optimizer, genes):
+        """ Optimizer with the active set computed from genes """
+        opt = optimizer ('--active-set', '5')
+        g   = opt.grid
+        d   = g.deviation (*opt.full_response (genes))
+        g.update_active (d, 0.0)
+        assert 0 < len (g.active.cidx) < len (g.y)
+        return opt
+    # end def active
+
+    def test_exact (self, optimizer):
+        """ For the individuals the active set was computed from the
+            evaluation on the active set is the full evaluation.
+        """
+        genes = random_genes (optimizer (), 2)
+        opt   = self.active (optimizer, genes)
+        assert np.allclose \
+            ( opt.evaluate_active (genes), opt.evaluate_genes (genes)
+            , rtol = 1e-12
+            )
+    # end def test_exact
+
+    def test_lower_bound (self, optimizer):
+        """ Other individuals get at most their full evaluation, the
+            violations found are counted for the next update.
+        """
+        genes = random_genes (optimizer (), 22)
+        opt   = self.active (optimizer, genes [:2])
+        g     = opt.grid
+        ev    = opt.evaluate_active (genes [2:])
+        assert (ev <= opt.evaluate_genes (genes [2:]) * (1 + 1e-12)).all ()
+        inactive = np.setdiff1d (range (len (g.y)), g.active.cidx)
+        assert g.n_violated [g.active.cidx].any ()
+        assert not g.n_violated [inactive].any ()
+    # end def test_lower_bound
+
+    def test_run (self, optimizer):
+        """ After verification the population has its full evaluation """
+        pga = pytest.importorskip ('pga')
+        pop = pga.PGA_OLDPOP
+        opt = optimizer \
+            ( '--active-set', '3', '--max-generations', '7', '-p', '20'
+            , run = True
+            )
+        assert opt.grid.active is not None
+        opt.reevaluate ()
+        ps  = list (range (20))
+        evs = opt.evaluate_genes (opt.get_population (pop, ps))
+        assert np.allclose \
+            (evs, [opt.get_evaluation (p, pop) for p in ps], rtol = 1e-12)
+    # end def test_run
+
+# end class Test_Active_Set
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+class Test_Adaptive:
+
+    def test_resample (self, optimizer):
+        """ The adaptive grid starts without the additional points """
+        opt = optimizer ('--adaptive-grid')
+        ref = optimizer ()
+        assert len (opt.grid.x) < len (ref.grid.x)
+        assert len (opt.dense.x) > len (ref.grid.x)
+    # end def test_resample
+
+    def test_refine (self, optimizer):
+        """ Refining inserts the violation peaks of the individuals on
+            the dense grid, a second refinement finds nothing new. The
+            population is re-evaluated on the new grid.
+        """
+        pga = pytest.importorskip ('pga')
+        pop = pga.PGA_OLDPOP
+        opt = optimizer \
+            ( '--adaptive-grid', '--adaptive-interval', '1000'
+            , '--max-generations', '3', '-p', '20', run = True
+            )
+        n    = len (opt.grid.x)
+        best = opt.best_individuals (3)
+        assert opt.refine_grid (best) > 0
+        assert len (opt.grid.x) > n
+        assert opt.refine_grid (best) == 0
+        ps  = list (range (20))
+        evs = opt.evaluate_genes (opt.get_population (pop, ps))
+        assert list (evs) == [opt.get_evaluation (p, pop) for p in ps]
+    # end def test_refine
+
+# end class Test_Adaptive
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+pga = pytest.importorskip ('pga')
+
+class Test_Adaptive_DE:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '30')
+
+    def test_self_adaptive (self, optimizer):
+        opt = optimizer \
+            ( *self.numpy, '--self-adaptive', '--max-generations', '10'
+            , run = True
+            )
+        assert (opt.memory_F != opt.args.scale_factor).any ()
+        assert ((0 < opt.trial_F)   & (opt.trial_F  <= 1)).all ()
+        assert ((0 <= opt.trial_Cr) & (opt.trial_Cr <= 1)).all ()
+    # end def test_self_adaptive
+
+    def test_reduce_population (self, optimizer):
+        """ The population shrinks, the best individual is kept """
+        opt = optimizer \
+            (*self.numpy, '--min-popsize', '6', '-m', '600', run = True)
+        pop = pga.PGA_OLDPOP
+        assert 6 <= opt.pop_size < 30
+        assert len (opt.get_population (pop)) == opt.pop_size
+        evs = [opt.get_evaluation (p, pop) for p in range (opt.pop_size)]
+        assert opt.get_evaluation (opt.get_best_index (pop), pop) == min (evs)
+    # end def test_reduce_population
+
+    def test_resume (self, optimizer, tmp_path):
+        """ A resumed run with a reduced population continues exactly """
+        fn   = str (tmp_path / 'run.ckpt')
+        argv = (*self.numpy, '--self-adaptive', '--min-popsize', '6')
+        ckpt = ('--checkpoint', fn, '--checkpoint-interval', '5')
+        opt  = optimizer (*argv, '-m', '600', run = True)
+        part = optimizer \
+            (*argv, *ckpt, '-m', '600', '--max-generations', '10', run = True)
+        assert part.pop_size < 30
+        r_opt = optimizer (*argv, *ckpt, '-m', '600', '--resume', run = True)
+        pop  = pga.PGA_OLDPOP
+        assert (opt.get_population (pop) == r_opt.get_population (pop)).all ()
+        assert list (opt.memory_F) == list (r_opt.memory_F)
+        assert opt.n_evaluations == r_opt.n_evaluations
+    # end def test_resume
+
+# end class Test_Adaptive_DE
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from filter_optimizer import workers
+from common import random_genes
+
+pga = pytest.importorskip ('pga')
+
+class Test_Async:
+
+    numpy = ('--backend', 'numpy', '-p', '20')
+
+    def test_submit (self, optimizer):
+        opt   = optimizer ()
+        genes = random_genes (opt, 8)
+        pool  = workers.Worker_Pool \
+            (opt.evaluate_genes, 2, len (genes), genes.shape [1])
+        try:
+            pool.submit (0, genes [:3])
+            pool.submit (1, genes [4:8])
+            result = {}
+            while len (result) < 2:
+                result.update (pool.completed ())
+            ev = opt.evaluate_genes (genes)
+            assert list (result [0]) == list (ev [:3])
+            assert list (result [1]) == list (ev [4:8])
+        finally:
+            pool.close ()
+    # end def test_submit
+
+    def test_run (self, optimizer, capsys):
+        opt = optimizer \
+            ( *self.numpy, '--workers', '2', '--asynchronous'
+            , '--async-batch', '3', '--max-generations', '5', run = True
+            )
+        pop = pga.PGA_OLDPOP
+        assert opt.generation == 5
+        assert opt.n_evaluations >= 6 * 20
+        genes = opt.get_population (pop)
+        evs   = [opt.get_evaluation (p, pop) for p in range (20)]
+        assert list (opt.evaluate_genes (genes)) == evs
+        assert 'Workers: 2 Utilization: ' in capsys.readouterr ().out
+    # end def test_run
+
+    @pytest.mark.parametrize \
+        ( 'argv'
+        , ( ('--asynchronous', '--backend', 'numpy')
+          , ('--asynchronous', '--workers', '2')
+          , ( '--asynchronous', '--backend', 'numpy', '--workers', '2'
+            , '--self-adaptive'
+            )
+          , ( '--asynchronous', '--backend', 'numpy', '--workers', '2'
+            , '--sort-population'
+            )
+          )
+        )
+    def test_reject (self, optimizer, argv):
+        with pytest.raises (SystemExit):
+            optimizer (*argv)
+    # end def test_reject
+
+# end class Test_Async
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from common import magnitude_only, random_genes, best_gene, baseline_evaluate
+
+class Test_Batch:
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_batch_equals_single (self, optimizer, spec):
+        opt    = optimizer (*spec)
+        genes  = random_genes (opt, 20)
+        batch  = opt.evaluate_genes (genes)
+        single = [opt.evaluate_genes (genes [k:k+1]) [0] for k in range (20)]
+        assert list (batch) == single
+    # end def test_batch_equals_single
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_matches_baseline (self, optimizer, spec):
+        """ Same evaluation (up to rounding) as computed with scipy """
+        opt   = optimizer (*spec)
+        genes = random_genes (opt, 20)
+        ref   = [baseline_evaluate (opt, g) for g in genes]
+        assert np.allclose (opt.evaluate_genes (genes), ref, rtol = 1e-9)
+    # end def test_matches_baseline
+
+    def test_batch_run (self, optimizer):
+        """ A run with batch evaluation is the same as without """
+        pga  = pytest.importorskip ('pga')
+        argv = ('--max-generations', '5', '-p', '30', '-R', '7')
+        runs = []
+        for batch in (), ('--batch-evaluation',):
+            opt = optimizer (*(argv + batch), run = True)
+            runs.append (best_gene (opt, pga.PGA_OLDPOP))
+        assert runs [0] == runs [1]
+    # end def test_batch_run
+
+# end class Test_Batch
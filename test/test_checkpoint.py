@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from filter_optimizer import checkpoint
+
+pga = pytest.importorskip ('pga')
+
+class Test_Checkpoint:
+
+    def run (self, optimizer, *argv):
+        """ Run the numpy backend, returns the old population and its
+            evaluations at the end.
+        """
+        opt = optimizer \
+            ( '--backend', 'numpy', '-p', '30', '--batch-evaluation', *argv
+            , run = True
+            )
+        pop = pga.PGA_OLDPOP
+        evs = [opt.get_evaluation (p, pop) for p in range (opt.pop_size)]
+        return opt.get_population (pop), evs, opt
+    # end def run
+
+    def test_write_read (self, tmp_path):
+        fn    = str (tmp_path / 'ckpt.npz')
+        state = dict (a = 1, b = [1.5, 'x'], c = dict (d = None))
+        genes = np.arange (12.0).reshape (3, 4)
+        checkpoint.write_checkpoint (fn, state, genes = genes)
+        st, arrays = checkpoint.read_checkpoint (fn)
+        assert st == state
+        assert list (arrays) == ['genes']
+        assert (arrays ['genes'] == genes).all ()
+        assert not (tmp_path / 'ckpt.npz.tmp').exists ()
+    # end def test_write_read
+
+    def test_resume (self, optimizer, tmp_path):
+        """ A resumed run continues exactly like an uninterrupted run """
+        fn = str (tmp_path / 'run.ckpt')
+        genes, evs, opt = self.run (optimizer, '--max-generations', '20')
+        self.run \
+            ( optimizer, '--max-generations', '10'
+            , '--checkpoint', fn, '--checkpoint-interval', '5'
+            )
+        st, arrays = checkpoint.read_checkpoint (fn)
+        assert st ['engine']['GA_iter'] == 10
+        r_genes, r_evs, r_opt = self.run \
+            ( optimizer, '--max-generations', '20'
+            , '--checkpoint', fn, '--checkpoint-interval', '5', '--resume'
+            )
+        assert (genes == r_genes).all ()
+        assert evs == r_evs
+        assert opt.generation    == r_opt.generation
+        assert opt.n_evaluations == r_opt.n_evaluations
+    # end def test_resume
+
+    def test_resume_pga (self, optimizer, tmp_path, capfd):
+        """ A resumed pgapack run without generations left reports
+            the checkpoint, with one generation left it runs two.
+        """
+        fn   = str (tmp_path / 'run.ckpt')
+        argv = ('-p', '20', '--checkpoint', fn, '--checkpoint-interval', '2')
+        optimizer (*argv, '--max-generations', '4', run = True)
+        st, arrays = checkpoint.read_checkpoint (fn)
+        assert st ['engine']['GA_iter'] == 4
+        capfd.readouterr ()
+        opt = optimizer \
+            (*argv, '--max-generations', '4', '--resume', run = True)
+        out = capfd.readouterr ().out
+        assert opt.generation == 4
+        assert 'Iter: 4 Evals: %d ' % st ['engine']['eval_count'] in out
+        best = min (arrays ['evaluations'])
+        assert 'The Best Evaluation: %e.' % best in out
+        opt = optimizer \
+            (*argv, '--max-generations', '5', '--resume', run = True)
+        assert opt.generation == 6
+    # end def test_resume_pga
+
+# end class Test_Checkpoint
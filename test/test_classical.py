@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy import signal
+from filter_optimizer import classical, response
+from common import magnitude_only, random_genes
+
+class Test_Classical:
+
+    def test_band_spec (self, optimizer):
+        opt  = optimizer (*magnitude_only)
+        spec = classical.Band_Spec (opt.udb, opt.ldb)
+        assert spec.btype == 'highpass'
+        assert spec.ws < spec.wp
+    # end def test_band_spec
+
+    def test_designs (self, optimizer):
+        """ The genes of the designs have the response of the design
+            (up to the gain) unless negative real roots are combined.
+        """
+        opt  = optimizer (*magnitude_only)
+        spec = classical.Band_Spec (opt.udb, opt.ldb)
+        x    = np.linspace (0.05, 3.1, 47)
+        n    = 0
+        for family, order, zp, pp in classical.designs (spec, 7, 7):
+            z, p = spec.design (family, order)
+            roots = np.concatenate ((z, p))
+            if (roots [abs (roots.imag) < 1e-9].real < 0).any ():
+                continue
+            gene = opt.pair_gene (zp, pp)
+            zeros, poles = response.polar_roots ([gene], 7, 7)
+            db, gd = response.root_response \
+                (zeros, poles, 1.0, x, np.arange (0))
+            w, h = signal.freqz_zpk (z, p, 1.0, x)
+            diff = db [0] - 20 * np.log10 (abs (h))
+            assert np.ptp (diff) < 1e-6
+            n += 1
+        assert n > 4
+    # end def test_designs
+
+    @pytest.mark.parametrize ('factor', (3.0, 20.0))
+    def test_gain_pairs (self, factor):
+        z, p = classical.gain_pairs (factor)
+        gene = np.array ([z + p])
+        x    = np.linspace (0, np.pi, 20)
+        zeros, poles = response.polar_roots (gene, 1, 1)
+        db, gd = response.root_response (zeros, poles, 1.0, x, np.arange (0))
+        assert np.allclose (db, 20 * np.log10 (factor))
+    # end def test_gain_pairs
+
+    def test_classical_genes (self, optimizer):
+        opt   = optimizer (*magnitude_only, '--init-classical')
+        genes = np.array (opt.classical_genes ())
+        assert len (genes)
+        rand  = random_genes (opt, 100)
+        assert opt.evaluate_genes (genes).min () \
+            < opt.evaluate_genes (rand).min () / 10
+        assert not optimizer (*magnitude_only).classical_genes ()
+    # end def test_classical_genes
+
+# end class Test_Classical
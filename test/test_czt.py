@@ -0,0 +1,38 @@
+import numpy as np
+from filter_optimizer import response
+from common import random_genes
+
+class Test_CZT:
+
+    def test_czt_matches_direct (self, optimizer):
+        """ The chirp-z transform on the uniform segments of the grid
+            gives the same response as direct sums on all points.
+        """
+        opt = optimizer ('--czt-min-points', '16')
+        g   = opt.grid
+        assert g.segments
+        genes = random_genes (opt, 10)
+        zeros, poles = response.gene_roots (genes, opt.nzeros, opt.npoles)
+        b = response.poly_coefficients (zeros, opt.a0)
+        a = response.poly_coefficients (poles)
+        n = max (b.shape [1], a.shape [1])
+        e = response.basis (g.x, n)
+        db_d, gd_d = response.poly_response \
+            (b, a, e, e [:, g.gd_idx], g.gd_idx)
+        db, gd = g.poly_response (b, a)
+        assert np.allclose (db, db_d, rtol = 1e-9, atol = 1e-9)
+        assert np.allclose (gd, gd_d, rtol = 1e-9, atol = 1e-9)
+    # end def test_czt_matches_direct
+
+    def test_czt_evaluation (self, optimizer):
+        czt    = optimizer ('--czt-min-points', '16')
+        direct = optimizer ('--czt-min-points', '0')
+        assert not direct.grid.segments
+        genes  = random_genes (czt, 20)
+        assert np.allclose \
+            ( czt.evaluate_genes (genes), direct.evaluate_genes (genes)
+            , rtol = 1e-9
+            )
+    # end def test_czt_evaluation
+
+# end class Test_CZT
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from filter_optimizer import filter_optimizer, de
+from common import best_gene
+
+class Test_DE:
+
+    argv = ('--backend', 'numpy', '-p', '30', '--batch-evaluation')
+
+    def run (self, optimizer, *argv):
+        return optimizer (*(self.argv + argv), run = True)
+    # end def run
+
+    def test_backend (self, optimizer):
+        opt = optimizer (*self.argv)
+        assert isinstance (opt, filter_optimizer.Filter_Opt_DE)
+    # end def test_backend
+
+    def test_reproducible (self, optimizer):
+        runs = []
+        for seed in '7', '7', '8':
+            opt = self.run (optimizer, '--max-generations', '5', '-R', seed)
+            runs.append (best_gene (opt, de.PGA_OLDPOP))
+        assert runs [0] == runs [1]
+        assert runs [0] != runs [2]
+    # end def test_reproducible
+
+    def test_evolution (self, optimizer):
+        """ The population stays in the init range and the best
+            evaluation improves.
+        """
+        evs = []
+        for n in '1', '10':
+            opt = self.run (optimizer, '--max-generations', n)
+            genes, ev = best_gene (opt, de.PGA_OLDPOP)
+            assert ev == opt.evaluate_genes (np.array ([genes])) [0]
+            pop = opt.pops [de.PGA_OLDPOP]
+            assert ((opt.lo <= pop) & (pop <= opt.hi)).all ()
+            evs.append (ev)
+        assert evs [1] < evs [0]
+    # end def test_evolution
+
+    @pytest.mark.parametrize ('variant', ('rand', 'best', 'eo'))
+    def test_variants (self, optimizer, variant):
+        opt = self.run \
+            ( optimizer, '--max-generations', '3', '--de-variant', variant
+            , '--exponential-crossover'
+            )
+        assert opt.GA_iter == 3
+    # end def test_variants
+
+# end class Test_DE
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from common import magnitude_only, random_genes, best_gene
+
+class Test_Early_Exit:
+
+    @pytest.mark.parametrize ('engine', ('polynomial', 'roots'))
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_complete_evaluation (self, optimizer, engine, spec):
+        """ Without cutoff all blocks are evaluated, the result is
+            exactly the same as without early exit.
+        """
+        opt   = optimizer ('--early-exit', '--engine', engine, *spec)
+        genes = random_genes (opt, 200)
+        ev    = opt.evaluate_cutoff (genes, np.full (200, np.inf))
+        assert list (ev) == list (opt.evaluate_genes (genes))
+        assert opt.n_early_exit == 0
+    # end def test_complete_evaluation
+
+    def test_cutoff (self, optimizer):
+        """ Individuals that are dropped are worse than their cutoff,
+            the others are evaluated completely.
+        """
+        opt    = optimizer ('--early-exit', '--early-exit-block-size', '8')
+        genes  = random_genes (opt, 40)
+        full   = opt.evaluate_genes (genes)
+        cutoff = np.full (40, np.median (full))
+        ev     = opt.evaluate_cutoff (genes, cutoff)
+        done   = ev != full
+        assert opt.n_early_exit == np.count_nonzero (done) > 0
+        assert opt.blocks_skipped > 0
+        assert (ev [done] > cutoff [done]).all ()
+        assert (ev [done] < full [done]).all ()
+        assert (full [~done] <= cutoff [~done]).all ()
+    # end def test_cutoff
+
+    def test_run (self, optimizer):
+        pga  = pytest.importorskip ('pga')
+        opt  = optimizer \
+            ( '--early-exit', '--batch-evaluation'
+            , '--max-generations', '5', '-p', '30', run = True
+            )
+        genes, ev = best_gene (opt, pga.PGA_OLDPOP)
+        assert opt.n_early_exit > 0
+        assert ev == opt.evaluate_genes (np.array ([genes])) [0]
+    # end def test_run
+
+# end class Test_Early_Exit
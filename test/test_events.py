@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from filter_optimizer import events, showfromlog, parse_result
+from common import best_gene
+
+pga = pytest.importorskip ('pga')
+
+class Test_Events:
+
+    def run (self, optimizer, tmp_path):
+        fn  = str (tmp_path / 'events.json')
+        opt = optimizer \
+            ( '--backend', 'numpy', '-p', '20', '--max-generations', '4'
+            , '--events', fn, run = True
+            )
+        with open (fn) as f:
+            evs = list (events.read_events (f))
+        return opt, fn, evs
+    # end def run
+
+    def test_writer (self, tmp_path):
+        fn = str (tmp_path / 'events.json')
+        ew = events.Event_Writer (fn)
+        for k in range (100):
+            ew.write ('generation', generation = k, gene = np.arange (3.))
+        ew.close ()
+        ew.close ()
+        with open (fn) as f:
+            first = f.readline ()
+            assert events.is_event_line (first)
+            f.seek (0)
+            evs = list (events.read_events (f))
+        assert [e ['generation'] for e in evs] == list (range (100))
+        assert evs [0] == dict \
+            (event = 'generation', generation = 0, gene = [0., 1., 2.])
+    # end def test_writer
+
+    def test_run (self, optimizer, tmp_path):
+        opt, fn, evs = self.run (optimizer, tmp_path)
+        kinds = [e ['event'] for e in evs]
+        assert kinds [0] == 'start' and kinds [-1] == 'result'
+        assert set (kinds [1:-1]) <= set (['generation'])
+        assert evs [0]['optimizer'] == 'Filter_Opt_DE'
+        gene, ev = best_gene (opt, pga.PGA_OLDPOP)
+        result = evs [-1]
+        assert result ['evaluation'] == ev
+        assert result ['gene'] == list (gene)
+        assert result ['evaluations'] == opt.n_evaluations
+        gens = [e for e in evs if e ['event'] == 'generation']
+        for e in gens:
+            assert e ['evaluation'] <= e ['mean'] <= e ['worst']
+    # end def test_run
+
+    def test_read (self, optimizer, tmp_path):
+        """ filter-show-from-log and filter-parse-result read the
+            result of an event stream
+        """
+        opt, fn, evs = self.run (optimizer, tmp_path)
+        with open (fn) as f:
+            exs = list (showfromlog.Experiment.Read (f))
+        assert len (exs) == 1
+        assert exs [0].evaluation == evs [-1]['evaluation']
+        assert list (exs [0].gene) == evs [-1]['gene']
+        assert exs [0].nzeros == opt.nzeros
+        row = parse_result.event_row (evs [-1])
+        assert row ['eval'] == evs [-1]['evaluation']
+        assert row ['np'] == opt.args.popsize
+        assert row ['cross'] == 'bin'
+    # end def test_read
+
+    def test_seed_from (self, optimizer, tmp_path):
+        opt, fn, evs = self.run (optimizer, tmp_path)
+        seeded = optimizer ('--backend', 'numpy', '--seed-from', fn)
+        assert list (seeded.seed_genes [0]) == evs [-1]['gene']
+    # end def test_seed_from
+
+# end class Test_Events
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from common import magnitude_only, random_genes
+
+def magnitude_penalty (g, v, c):
+    """ Sum of the squared magnitude violations of v shifted by c """
+    a = (v + c [:, None] - g.y [:g.n_db]) * g.sign [:g.n_db]
+    return np.sum (np.where (a > 0, a ** 2, 0), axis = 1)
+# end def magnitude_penalty
+
+class Test_Gain:
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_gain_offset (self, optimizer, spec):
+        """ The offset minimizes the magnitude penalty """
+        opt = optimizer ('-k', '0', *spec)
+        g   = opt.grid
+        rng = np.random.default_rng (4)
+        v   = g.y [:g.n_db] + rng.normal (0, 5, (20, g.n_db))
+        c   = g.gain_offset (v)
+        ev  = magnitude_penalty (g, v, c)
+        assert (ev > 0).all ()
+        for delta in 1e-3, -1e-3, 0.5, -0.5:
+            assert (magnitude_penalty (g, v, c + delta) >= ev).all ()
+    # end def test_gain_offset
+
+    def test_feasible (self, optimizer):
+        """ If all bounds can be met we are in the middle """
+        opt = optimizer ('-k', '0', '-u', '0,1,1,1', '-l', '0.1,0.9,-1,-1')
+        g   = opt.grid
+        v   = np.full ((1, g.n_db), 7.0)
+        c   = g.gain_offset (v)
+        assert c [0] == -7
+        assert magnitude_penalty (g, v, c) [0] == 0
+    # end def test_feasible
+
+    def test_evaluation (self, optimizer):
+        """ The evaluation is the one with the fixed optimal gain """
+        opt   = optimizer ('-k', '0')
+        fixed = optimizer ()
+        genes = random_genes (opt, 10)
+        gains = opt.gain (genes)
+        ev    = opt.evaluate_genes (genes)
+        assert list (ev) \
+            == [opt.evaluate_genes (genes [k:k+1]) [0] for k in range (10)]
+        for gene, gain, e in zip (genes, gains, ev):
+            fixed.a0 = gain
+            ref = fixed.evaluate_genes (np.array ([gene])) [0]
+            assert np.isclose (e, ref, rtol = 1e-9)
+            assert ref <= optimizer ().evaluate_genes (np.array ([gene])) [0]
+    # end def test_evaluation
+
+# end class Test_Gain
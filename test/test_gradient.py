@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from filter_optimizer import response
+
+def central_differences (f, x, h = 1e-6):
+    """ Derivatives of f (returning an array) by each element of x """
+    return np.array \
+        ([(f (x + h * e) - f (x - h * e)) / (2 * h) for e in np.eye (len (x))])
+# end def central_differences
+
+class Test_Gradient:
+
+    argv = ('--backend', 'numpy', '--engine', 'roots')
+
+    def gene (self, opt, seed = 3):
+        lo, hi = opt.init_range.T
+        return np.random.default_rng (seed).uniform (lo, hi)
+    # end def gene
+
+    def test_root_gradient (self, optimizer):
+        opt = optimizer (*self.argv)
+        g   = opt.grid
+        x   = self.gene (opt)
+        def response_of (x):
+            db, gd, ddb, dgd = response.root_gradient \
+                (x, opt.nzeros, opt.npoles, opt.a0, g.x, g.gd_idx)
+            return np.concatenate ((db, gd))
+        db, gd, ddb, dgd = response.root_gradient \
+            (x, opt.nzeros, opt.npoles, opt.a0, g.x, g.gd_idx)
+        num = central_differences (response_of, x)
+        ana = np.concatenate ((ddb, dgd), axis = 1)
+        assert np.max (abs (num - ana)) < 1e-5 * np.max (abs (ana))
+        # The response is the same as that of the roots engine
+        r_db, r_gd = opt.grid_response (g, x [None, :])
+        assert np.allclose (db, r_db [0])
+        assert np.allclose (gd, r_gd [0])
+    # end def test_root_gradient
+
+    @pytest.mark.parametrize ('gain',   ('0.00390625', '0'))
+    @pytest.mark.parametrize ('margin', (0.0, 0.01))
+    def test_penalty_gradient (self, optimizer, gain, margin):
+        opt = optimizer (*self.argv, '-k', gain)
+        g   = opt.grid
+        x   = self.gene (opt)
+        def penalty (x):
+            db, gd, ddb, dgd = response.root_gradient \
+                (x, opt.nzeros, opt.npoles, opt.a0, g.x, g.gd_idx)
+            return g.penalty_gradient (db, gd, ddb, dgd, margin)
+        value, grad = penalty (x)
+        num = central_differences (lambda x: np.array ([penalty (x) [0]]), x)
+        assert value > 0
+        assert np.max (abs (num [:, 0] - grad)) < 1e-6 * np.max (abs (grad))
+        if not margin:
+            assert value == pytest.approx (opt.evaluate_genes (x [None, :]) [0])
+    # end def test_penalty_gradient
+
+# end class Test_Gradient
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+def limits (bounds, f):
+    """ The tightest bound at each x """
+    r = {}
+    for x, y in bounds:
+        r [x] = f (r.get (x, y), y)
+    return r
+# end def limits
+
+def loop_penalty (opt, db, gd, optimize_further):
+    """ The penalty computed by looping over the bounds, db and gd map
+        x to magnitude and delay.
+    """
+    ev = evf = 0
+    for bounds, sign in (opt.udb, 1), (opt.ldb, -1):
+        for x, y in bounds:
+            d = (db [x] - y) * sign
+            if d > 0:
+                ev += d ** 2
+            else:
+                evf += min (abs (d) ** 0.5, 1.0)
+    shift = max ((gd [x] - y for x, y in opt.udelay), default = 0)
+    for x, y in opt.ldelay:
+        d = y - (gd [x] - shift)
+        if d > 0:
+            ev += d ** 2
+        else:
+            evf += abs (d) ** 0.5
+    if ev or not optimize_further:
+        return ev
+    return -evf
+# end def loop_penalty
+
+def responses (opt, n, seed = 5):
+    """ n magnitude and delay responses (dictionaries indexed by x),
+        the first two meet all bounds.
+    """
+    rng = np.random.default_rng (seed)
+    ub  = limits (opt.udb,    min)
+    lb  = limits (opt.ldb,    max)
+    ud  = limits (opt.udelay, min)
+    ld  = limits (opt.ldelay, max)
+    ok_db = {}
+    for x in set (ub) | set (lb):
+        if x in ub and x in lb:
+            ok_db [x] = (ub [x] + lb [x]) / 2
+        elif x in ub:
+            ok_db [x] = ub [x] - 0.5
+        else:
+            ok_db [x] = lb [x] + 0.5
+    ok_gd = dict ((x, ld [x] + 1) for x in ld)
+    ok_gd.update (ud)
+    result = []
+    for k in range (n):
+        s = 0 if k < 2 else 3
+        db = dict ((x, v + rng.normal (0, s)) for x, v in ok_db.items ())
+        gd = dict ((x, v + rng.normal (0, s)) for x, v in ok_gd.items ())
+        result.append ((db, gd))
+    return result
+# end def responses
+
+class Test_Grid:
+
+    @pytest.mark.parametrize ('further', (False, True))
+    def test_penalty (self, optimizer, further):
+        opt = optimizer ()
+        g   = opt.grid
+        rs  = responses (opt, 10)
+        gdx = g.x [g.gd_idx]
+        db  = np.array ([[r [0].get (x, 0) for x in g.x] for r in rs])
+        gd  = np.array ([[r [1][x] for x in gdx] for r in rs])
+        ev  = g.penalty (db, gd, further)
+        assert list (ev) == [loop_penalty (opt, *r, further) for r in rs]
+        assert (ev [:2] <= 0).all ()
+        assert (ev [2:] > 0).all ()
+    # end def test_penalty
+
+    def test_no_delay_bounds (self, optimizer):
+        opt = optimizer \
+            ('-u', '0,0.5,0,0,11', '-l', '0.1,0.4,-1,-1,11')
+        g   = opt.grid
+        assert not len (g.gd_idx)
+        db  = np.array ([[-0.5] * len (g.x), [1.0] * len (g.x)])
+        gd  = np.zeros ((2, 0))
+        assert list (g.penalty (db, gd)) == [0, 11]
+    # end def test_no_delay_bounds
+
+    def test_merged_grid (self, optimizer):
+        opt = optimizer ()
+        g   = opt.grid
+        assert list (g.x) == sorted (set (g.x))
+        assert list (g.x [g.db_idx]) == list (opt.udb.x) + list (opt.ldb.x)
+        gdx = g.x [g.gd_idx]
+        assert list (gdx [g.ud_idx]) == list (opt.udelay.x)
+        assert list (gdx [g.ld_idx]) == list (opt.ldelay.x)
+        assert set (g.x) == set (gdx) | set (g.x [g.db_idx])
+    # end def test_merged_grid
+
+# end class Test_Grid
@@ -0,0 +1,63 @@
+import io
+import numpy as np
+import pytest
+from filter_optimizer import islands
+
+class Test_Islands:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '20')
+
+    @pytest.mark.parametrize ('topology', islands.topologies)
+    def test_topology (self, topology):
+        for epoch in range (3):
+            for k in range (4):
+                t = islands.targets (topology, 4, k, epoch, 42)
+                assert k not in t
+                for j in t:
+                    assert k in islands.sources (topology, 4, j, epoch, 42)
+            if topology != 'full':
+                t = [islands.targets (topology, 4, k, epoch, 42) [0]
+                     for k in range (4)]
+                assert sorted (t) == list (range (4))
+        assert islands.targets ('ring', 4, 3, 0, 42) == [0]
+        assert not islands.targets (topology, 1, 0, 0, 42)
+    # end def test_topology
+
+    def test_island_args (self, optimizer):
+        opt   = optimizer \
+            ( *self.numpy, '-m', '1000', '-R', '3'
+            , '--island-scale-factor', '0.5', '--island-scale-factor', '0.7'
+            )
+        opt.args.islands = 3
+        model = islands.Island_Model (type (opt), opt.args)
+        for k, f in enumerate ((0.5, 0.7, 0.5)):
+            a = model.island_args (k)
+            assert a.islands == 0
+            assert a.random_seed == 3 + k
+            assert a.max_evals == 333
+            assert a.scale_factor == f
+            assert a.crossover_rate == opt.args.crossover_rate
+    # end def test_island_args
+
+    def test_run (self, optimizer):
+        opt = optimizer \
+            ( *self.numpy, '--max-generations', '6'
+            , '--migration-interval', '2', '--migrants', '2'
+            )
+        opt.args.islands = 3
+        model   = islands.Island_Model (type (opt), opt.args)
+        results = model.run ()
+        assert [r ['island'] for r in results] == [0, 1, 2]
+        for r in results:
+            assert r ['sent'] > 0
+            assert r ['evaluation'] \
+                == opt.evaluate_genes (r ['genes'] [None, :]) [0]
+        f = io.StringIO ()
+        model.report (f)
+        out  = f.getvalue ()
+        best = min (r ['evaluation'] for r in results)
+        assert out.count ('Island: ') == 3
+        assert "The Best Evaluation: %e." % best in out
+    # end def test_run
+
+# end class Test_Islands
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+import pytest
+from filter_optimizer import de
+
+# Runs the numpy backend with the import of pga blocked
+script = '''
+import sys
+sys.modules ['pga'] = None
+from filter_optimizer import filter_optimizer, de
+assert not hasattr (filter_optimizer, 'Filter_Opt')
+filter_optimizer.main \\
+    (['--backend', 'numpy', '-p', '20', '--max-generations', '%s'])
+'''
+
+class Test_No_Pga:
+
+    def test_de_constants (self):
+        pga = pytest.importorskip ('pga')
+        names = [n for n in dir (de) if n.startswith ('PGA_')]
+        assert names
+        for name in names:
+            assert getattr (de, name) == getattr (pga, name)
+    # end def test_de_constants
+
+    def test_numpy_backend (self):
+        r = subprocess.run \
+            ( [sys.executable, '-c', script % 3]
+            , capture_output = True, text = True
+            )
+        assert r.returncode == 0, r.stderr
+        assert 'The Best Evaluation:' in r.stdout
+        assert 'Iter: 3 ' in r.stdout
+    # end def test_numpy_backend
+
+    def test_pga_backend (self):
+        r = subprocess.run \
+            ( [sys.executable, '-c', script.replace ('numpy', 'pga') % 3]
+            , capture_output = True, text = True
+            )
+        assert r.returncode != 0
+        assert 'needs pgapack' in r.stderr
+    # end def test_pga_backend
+
+# end class Test_No_Pga
@@ -0,0 +1,56 @@
+import io
+import numpy as np
+import pytest
+from filter_optimizer import order_search
+
+class Test_Order_Search:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '20')
+
+    def test_candidates (self):
+        c = order_search.candidates (2, 2)
+        assert c [0] == (0, 1)
+        assert len (c) == 6
+        costs = [order_search.cost (*zp) for zp in c]
+        assert costs == sorted (costs)
+        assert order_search.cost (2, 1) > order_search.cost (1, 1)
+        assert order_search.cost (2, 0) > order_search.cost (1, 1)
+    # end def test_candidates
+
+    def test_best (self, optimizer):
+        opt    = optimizer (*self.numpy, '-Z', '3', '-P', '3')
+        search = order_search.Order_Search (type (opt), opt.args)
+        def result (z, p, ev):
+            return dict (zeros = z, poles = p, evaluation = ev, genes = z + p)
+        search.results = [result (3, 3, 0.0), result (2, 1, 0.0)]
+        assert search.best () ['zeros'] == 2
+        search.results = [result (3, 3, 1.5), result (2, 1, 2.0)]
+        assert search.best () ['zeros'] == 3
+        search.results = [result (3, 3, 1.5), result (1, 2, 1.5)]
+        assert search.best () ['zeros'] == 1
+        search.results = [result (3, 3, 2.0), result (1, 2, 1.0)]
+        assert [w [0] for w in search.warm_genes (2, 2)] == [3]
+        assert [w [0] for w in search.warm_genes (3, 3)] == [3, 6]
+    # end def test_best
+
+    def test_run (self, optimizer):
+        opt    = optimizer \
+            (*self.numpy, '-Z', '1', '-P', '2', '--max-generations', '4')
+        opt.args.order_search = 2
+        search  = order_search.Order_Search (type (opt), opt.args)
+        results = search.run ()
+        assert [(r ['zeros'], r ['poles']) for r in results] \
+            == order_search.candidates (1, 2)
+        for r in results:
+            zp = '-Z', str (r ['zeros']), '-P', str (r ['poles'])
+            o  = optimizer (*self.numpy, *zp)
+            assert r ['evaluation'] \
+                == o.evaluate_genes (r ['genes'] [None, :]) [0]
+        f = io.StringIO ()
+        search.report (f)
+        best = search.best ()
+        line = "Cheapest: Zeros: %(zeros)s Poles: %(poles)s\n" % best
+        assert line in f.getvalue ()
+    # end def test_run
+
+# end class Test_Order_Search
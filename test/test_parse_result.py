@@ -0,0 +1,39 @@
+import csv
+import io
+import numpy as np
+import pytest
+from filter_optimizer import filter_optimizer, report, parse_result
+
+class Test_Parse_Result:
+
+    @pytest.mark.parametrize ('cross', ((), ('--exponential-crossover',)))
+    def test_log (self, monkeypatch, tmp_path, cross):
+        """ The crossover of a log of the optimizer is parsed """
+        argv = ['--backend', 'numpy', '-p', '30'] + list (cross)
+        args = filter_optimizer.parse_args (filter_optimizer.options (), argv)
+        result = dict \
+            (genes = np.full (18, .25), evaluation = 2.5, gain = 1, stag = 0)
+        fn = str (tmp_path / 'run.log')
+        with open (fn, 'w') as f:
+            report.print_result (f, result, args, 3, 90)
+        out = io.StringIO ()
+        monkeypatch.setattr \
+            ( parse_result, 'dw'
+            , csv.DictWriter
+                (out, delimiter = ';', fieldnames = parse_result.fields)
+            )
+        parse_result.main ([fn])
+        out.seek (0)
+        rows = list \
+            ( csv.DictReader
+                (out, delimiter = ';', fieldnames = parse_result.fields)
+            )
+        assert len (rows) == 1
+        assert rows [0]['cross'] == ('exp' if cross else 'bin')
+        assert rows [0]['np'] == '30'
+        assert rows [0]['iter'] == '3'
+        assert rows [0]['neval'] == '90'
+        assert float (rows [0]['eval']) == 2.5
+    # end def test_log
+
+# end class Test_Parse_Result
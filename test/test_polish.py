@@ -0,0 +1,31 @@
+import pytest
+
+pga = pytest.importorskip ('pga')
+
+class Test_Polish:
+
+    def test_polish (self, optimizer):
+        """ Polishing the best individual improves its evaluation, the
+            stored evaluation is that of the new genes computed with
+            the configured engine.
+        """
+        opt = optimizer \
+            ( '--backend', 'numpy', '--batch-evaluation'
+            , '--engine', 'polynomial'
+            , '--polish-interval', '1000', '--max-generations', '3'
+            , '-p', '30', run = True
+            )
+        pop = pga.PGA_OLDPOP
+        p   = opt.get_best_index (pop)
+        ev  = opt.get_evaluation (p, pop)
+        n   = opt.n_evaluations
+        opt.polish (p)
+        genes = opt.get_population (pop, [p])
+        assert opt.n_polish == opt.n_polished == 1
+        assert opt.polish_evals > 0
+        assert opt.n_evaluations == n + opt.polish_evals
+        assert opt.get_evaluation (p, pop) < ev
+        assert opt.get_evaluation (p, pop) == opt.evaluate_genes (genes) [0]
+    # end def test_polish
+
+# end class Test_Polish
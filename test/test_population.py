@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from common import random_genes
+
+pga = pytest.importorskip ('pga')
+
+@pytest.mark.parametrize ('backend', ('pga', 'numpy'))
+class Test_Population:
+
+    def test_access (self, optimizer, backend):
+        opt   = optimizer ('--backend', backend, '-p', '20')
+        pop   = pga.PGA_OLDPOP
+        genes = random_genes (opt, 20)
+        opt.set_population (pop, genes)
+        assert (opt.get_population (pop) == genes).all ()
+        assert (opt.get_population (pop, [3, 1]) == genes [[3, 1]]).all ()
+        opt.set_population (pop, genes [:2] + 0.5, [3, 1])
+        assert opt.get_allele (1, pop, 0) == genes [1, 0] + 0.5
+        assert opt.get_allele (3, pop, 0) == genes [0, 0] + 0.5
+    # end def test_access
+
+    def test_sort_population (self, optimizer, backend):
+        """ Zeros and poles are sorted by angle and radius """
+        opt   = optimizer ('--backend', backend, '-p', '20')
+        pop   = pga.PGA_OLDPOP
+        genes = random_genes (opt, 20)
+        opt.set_population (pop, genes)
+        opt.sort_population (pop)
+        result = opt.get_population (pop)
+        nz     = 2 * opt.nzeros
+        for a, b in (0, nz), (nz, None):
+            for g, r in zip (genes, result):
+                pairs = r [a:b].reshape (-1, 2)
+                keys  = [tuple (p [::-1]) for p in pairs]
+                assert keys == sorted (keys)
+                assert \
+                    (  sorted (map (tuple, g [a:b].reshape (-1, 2)))
+                    == sorted (map (tuple, pairs))
+                    )
+        assert np.allclose \
+            (opt.evaluate_genes (genes), opt.evaluate_genes (result))
+    # end def test_sort_population
+
+# end class Test_Population
@@ -0,0 +1,51 @@
+import io
+import re
+import pytest
+from filter_optimizer import islands
+
+class Test_Race:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '20')
+
+    def race (self, optimizer, *argv):
+        opt = optimizer (*self.numpy, '-R', '5', *argv)
+        opt.args.race = 3
+        return islands.Island_Model (type (opt), opt.args)
+    # end def race
+
+    def test_island_args (self, optimizer):
+        model = self.race (optimizer, '-m', '900')
+        for k in range (3):
+            a = model.island_args (k)
+            assert a.race == a.islands == 0
+            assert a.random_seed == 5 + k
+            assert a.max_evals == 900
+    # end def test_island_args
+
+    def test_race (self, optimizer):
+        """ The racers share the budget, the winner is the best """
+        model = self.race \
+            ( optimizer, '-m', '600'
+            , '--island-scale-factor', '0.5', '--island-scale-factor', '0.7'
+            , '--island-scale-factor', '0.9'
+            )
+        results = model.run ()
+        assert sum (r ['evaluations'] for r in results) < 600 + 3 * 20
+        f = io.StringIO ()
+        model.report (f)
+        out  = f.getvalue ()
+        best = min \
+            (results, key = lambda r: (r ['evaluation'], r ['evaluations']))
+        k    = best ['island']
+        assert out.count ('Racer: ') == 3
+        assert 'Winner: %s\n' % k in out
+        assert "The Best Evaluation: %e." % best ['evaluation'] in out
+        assert re.search (r'^random_seed *: %s$' % (5 + k), out, re.M)
+        assert re.search \
+            (r'^scale_factor *: %s$' % (0.5, 0.7, 0.9) [k], out, re.M)
+        # The settings of the race are those of the run
+        assert re.search (r'^race *: 3$', out, re.M)
+        assert re.search (r'^max_evals *: 600$', out, re.M)
+    # end def test_race
+
+# end class Test_Race
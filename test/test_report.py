@@ -0,0 +1,48 @@
+import io
+import numpy as np
+import pytest
+from filter_optimizer import filter_optimizer, report, showfromlog, events
+
+class Test_Report:
+
+    def result (self, *argv):
+        argv = ['--backend', 'numpy'] + list (argv)
+        args = filter_optimizer.parse_args (filter_optimizer.options (), argv)
+        genes = np.random.default_rng (3).uniform (0, .5, 18)
+        result = dict (genes = genes, evaluation = 1.5, gain = .25, stag = 4)
+        return args, result
+    # end def result
+
+    @pytest.mark.parametrize ('gain', ('0.00390625', '0'))
+    def test_print_result (self, gain):
+        """ The report can be read by filter-show-from-log """
+        args, result = self.result ('-k', gain)
+        f = io.StringIO ()
+        report.print_result (f, result, args, 7, 700)
+        text = f.getvalue ()
+        assert "Iter: 7 Evals: 700 Stag: 4" in text
+        assert ("Gain: 0.25" in text) == (gain == '0')
+        f.seek (0)
+        ex = showfromlog.Experiment.Parse (f)
+        assert np.allclose (ex.gene, result ['genes'], rtol = 1e-6)
+        assert ex.evaluation == 1.5
+        assert ex.a0 == (.25 if gain == '0' else float (gain))
+        assert (ex.nzeros, ex.npoles) == (args.zeros, args.poles)
+    # end def test_print_result
+
+    def test_events (self, tmp_path):
+        fn = str (tmp_path / 'events.json')
+        args, result = self.result ('--events', fn)
+        report.print_result \
+            (io.StringIO (), result, args, 7, 700, 'Filter_Opt_DE')
+        with open (fn) as f:
+            evs = list (events.read_events (f))
+        assert [e ['event'] for e in evs] == ['start', 'result']
+        assert evs [0]['optimizer'] == 'Filter_Opt_DE'
+        assert evs [1]['gene'] == list (result ['genes'])
+        assert evs [1]['generation'] == 7
+        assert evs [1]['evaluations'] == 700
+        assert evs [1]['success'] is False
+    # end def test_events
+
+# end class Test_Report
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from filter_optimizer import events
+
+pga = pytest.importorskip ('pga')
+
+class Test_Restart:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '20')
+    stagnate = \
+        ('--stagnation-generations', '3', '--stagnation-improvement', '1')
+
+    def test_stagnation (self, optimizer):
+        opt = optimizer \
+            (*self.numpy, *self.stagnate, '--max-generations', '50', run = True)
+        assert opt.generation < 10
+    # end def test_stagnation
+
+    def test_restart (self, optimizer, capsys):
+        """ The elite is kept, the others are re-initialized and
+            evaluated, the restart is logged.
+        """
+        opt = optimizer \
+            ( *self.numpy, '--restarts', '1', '--restart-elite', '2'
+            , '--max-generations', '3', run = True
+            )
+        pop   = pga.PGA_OLDPOP
+        elite = opt.best_individuals (2)
+        genes = opt.get_population (pop)
+        n     = opt.n_evaluations
+        capsys.readouterr ()
+        opt.restart ()
+        new   = opt.get_population (pop)
+        other = np.setdiff1d (range (20), elite)
+        assert (new [elite] == genes [elite]).all ()
+        assert (new [other] != genes [other]).any (axis = 1).all ()
+        evs   = [opt.get_evaluation (p, pop) for p in range (20)]
+        assert list (opt.evaluate_genes (new)) == evs
+        assert opt.n_restarts == 1
+        assert opt.n_evaluations == n + 18
+        assert capsys.readouterr ().out.startswith ('Restart: 1 Iter: 3')
+    # end def test_restart
+
+    def test_run (self, optimizer):
+        argv = (*self.numpy, *self.stagnate, '--max-generations', '50')
+        opt  = optimizer (*argv, run = True)
+        r    = optimizer (*argv, '--restarts', '2', run = True)
+        assert r.n_restarts == 2
+        assert r.generation > opt.generation
+    # end def test_run
+
+    def test_resume (self, optimizer, tmp_path):
+        """ A resumed run restarts like an uninterrupted run """
+        fn   = str (tmp_path / 'run.ckpt')
+        argv = \
+            ( *self.numpy, *self.stagnate, '--restarts', '5'
+            , '--restart-reseed', '--restart-vary-parameters'
+            )
+        ckpt = ('--checkpoint', fn, '--checkpoint-interval', '5')
+        opt  = optimizer (*argv, '--max-generations', '14', run = True)
+        optimizer (*argv, *ckpt, '--max-generations', '5', run = True)
+        r_opt = optimizer \
+            (*argv, *ckpt, '--resume', '--max-generations', '14', run = True)
+        pop  = pga.PGA_OLDPOP
+        assert opt.n_restarts == r_opt.n_restarts > 1
+        assert (opt.get_population (pop) == r_opt.get_population (pop)).all ()
+        assert opt.n_evaluations == r_opt.n_evaluations
+    # end def test_resume
+
+    def test_events (self, optimizer, tmp_path, capsys):
+        """ The restarts with the changed settings are in the events """
+        fn  = str (tmp_path / 'events.json')
+        opt = optimizer \
+            ( *self.numpy, *self.stagnate, '--restarts', '2'
+            , '--restart-reseed', '--restart-vary-parameters'
+            , '--max-generations', '50', '--events', fn, run = True
+            )
+        with open (fn) as f:
+            evs = list (events.read_events (f))
+        evs = [e for e in evs if e ['event'] == 'restart']
+        assert [e ['restart'] for e in evs] == [1, 2]
+        assert sorted (evs [-1]['changed']) == ['Cr', 'F', 'Seed']
+        assert evs [-1]['changed']['F'] == opt.DE_scale_factor
+        assert evs [-1]['changed']['Cr'] == opt.DE_crossover_prob
+        out = capsys.readouterr ().out
+        for e in evs:
+            assert \
+                ( "Restart: %s Iter: %s Evals: %s "
+                % (e ['restart'], e ['generation'], e ['evaluations'])
+                ) in out
+            assert "Seed: %s " % e ['changed']['Seed'] in out
+    # end def test_events
+
+# end class Test_Restart
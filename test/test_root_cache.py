@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from filter_optimizer import response
+from common import random_genes, best_gene
+
+class Test_Root_Cache:
+
+    def test_cached_equals_uncached (self, optimizer):
+        """ Trial vectors that change some roots of their parent are
+            computed from the cache with the same result.
+        """
+        opt   = optimizer ('--engine', 'roots', '--root-cache', '-p', '20')
+        cache = opt.root_cache
+        g     = opt.grid
+        rng   = np.random.default_rng (3)
+        def direct (genes):
+            zeros, poles = opt.filter_params (genes)
+            return response.root_response \
+                (zeros, poles, opt.a0, g.x, g.gd_idx)
+        def check (r, genes):
+            for v, ref in zip (r, direct (genes)):
+                assert (v == ref).all ()
+        old = random_genes (opt, 20)
+        idx = list (range (20))
+        check (cache.response (old, idx), old)
+        for generation in range (3):
+            new = random_genes (opt, 20, seed = generation)
+            # Keep most (radius, angle) pairs of the parent
+            keep = rng.random ((20, new.shape [1] // 2)) < 0.8
+            keep = np.repeat (keep, 2, axis = 1)
+            new  = np.where (keep, old, new)
+            check (cache.response (new, idx, old), new)
+            # Trials replace their parent if they are better
+            better = opt.evaluate_genes (new) < opt.evaluate_genes (old)
+            old    = np.where (better [:, None], new, old)
+        assert cache.n_reuse > 0
+    # end def test_cached_equals_uncached
+
+    def test_run (self, optimizer):
+        """ A run with the root cache is the same as without """
+        pga  = pytest.importorskip ('pga')
+        argv = \
+            ( '--engine', 'roots', '--crossover-rate', '0.2'
+            , '--max-generations', '5', '-p', '30'
+            )
+        runs = []
+        cached = ('--root-cache',)
+        for cache in (), cached, cached + ('--batch-evaluation',):
+            opt = optimizer (*(argv + cache), run = True)
+            runs.append (best_gene (opt, pga.PGA_OLDPOP))
+        assert runs [0] == runs [1] == runs [2]
+    # end def test_run
+
+# end class Test_Root_Cache
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+from common import magnitude_only, random_genes
+
+class Test_Roots:
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_roots_matches_polynomial (self, optimizer, spec):
+        poly  = optimizer (*spec)
+        roots = optimizer ('--engine', 'roots', *spec)
+        genes = random_genes (poly, 20)
+        assert np.allclose \
+            ( roots.evaluate_genes (genes), poly.evaluate_genes (genes)
+            , rtol = 1e-9
+            )
+    # end def test_roots_matches_polynomial
+
+    def test_batch_equals_single (self, optimizer):
+        opt    = optimizer ('--engine', 'roots')
+        genes  = random_genes (opt, 20)
+        batch  = opt.evaluate_genes (genes)
+        single = [opt.evaluate_genes (genes [k:k+1]) [0] for k in range (20)]
+        assert list (batch) == single
+    # end def test_batch_equals_single
+
+# end class Test_Roots
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from common import magnitude_only, random_genes, baseline_evaluate
+
+class Test_Scipy_Engine:
+
+    @pytest.mark.parametrize ('engine', ('polynomial', 'roots', 'scipy'))
+    @pytest.mark.parametrize ('gain',   ('0.00390625', '0'))
+    def test_batch_equals_single (self, optimizer, engine, gain):
+        opt    = optimizer ('--engine', engine, '-k', gain)
+        genes  = random_genes (opt, 20)
+        batch  = opt.evaluate_genes (genes)
+        single = [opt.evaluate_genes (genes [k:k+1]) [0] for k in range (20)]
+        assert list (batch) == single
+    # end def test_batch_equals_single
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    @pytest.mark.parametrize ('engine', ('polynomial', 'roots'))
+    def test_engine_matches_scipy (self, optimizer, spec, engine):
+        ref   = optimizer ('--engine', 'scipy', *spec)
+        opt   = optimizer ('--engine', engine,  *spec)
+        genes = random_genes (ref, 10)
+        db_r, gd_r = ref.full_response (genes)
+        db,   gd   = opt.full_response (genes)
+        assert gd.shape == gd_r.shape
+        assert np.allclose (db, db_r, rtol = 1e-9, atol = 1e-9)
+        assert np.allclose (gd, gd_r, rtol = 1e-9, atol = 1e-9)
+        assert np.allclose \
+            (opt.evaluate_genes (genes), ref.evaluate_genes (genes))
+    # end def test_engine_matches_scipy
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_matches_baseline (self, optimizer, spec):
+        opt   = optimizer ('--engine', 'scipy', *spec)
+        genes = random_genes (opt, 20)
+        ref   = [baseline_evaluate (opt, g) for g in genes]
+        assert np.allclose (opt.evaluate_genes (genes), ref, rtol = 1e-9)
+    # end def test_matches_baseline
+
+    @pytest.mark.parametrize ('spec', ((), magnitude_only))
+    def test_early_exit (self, optimizer, spec):
+        """ The blocks of an early exit use the scipy engine, too """
+        opt   = optimizer ('--engine', 'scipy', *spec)
+        early = optimizer ('--engine', 'scipy', '--early-exit', *spec)
+        genes = random_genes (opt, 10)
+        ev    = early.evaluate_cutoff (genes, np.full (10, np.inf))
+        assert list (ev) == list (opt.evaluate_genes (genes))
+    # end def test_early_exit
+
+# end class Test_Scipy_Engine
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from filter_optimizer import filter_optimizer, seeding, showfromlog
+from common import random_genes, best_gene
+
+pga = pytest.importorskip ('pga')
+
+class Test_Seed:
+
+    numpy = ('--backend', 'numpy', '--batch-evaluation', '-p', '20')
+
+    def test_adapt_gene (self, optimizer):
+        """ Added roots with radius 0 do not change the filter, the
+            roots with the smallest radius are dropped.
+        """
+        small = optimizer ('--engine', 'roots')
+        large = optimizer ('--engine', 'roots', '-Z', '6', '-P', '5')
+        genes = random_genes (small, 5)
+        adapted = np.array \
+            ([seeding.adapt_gene (g, 5, 4, 6, 5) for g in genes])
+        assert (adapted [:, 10:12] == 0).all ()
+        assert (adapted [:, 20:] == 0).all ()
+        assert np.allclose \
+            ( large.evaluate_genes (adapted), small.evaluate_genes (genes)
+            , rtol = 1e-12
+            )
+        back = [seeding.adapt_gene (g, 6, 5, 5, 4) for g in adapted]
+        assert (np.array (back) == genes).all ()
+        gene = np.array ([0.5, 0.1, 0.2, 0.2, 0.9, 0.3, 0.1, 0.4])
+        assert list (seeding.adapt_gene (gene, 3, 1, 2, 1)) \
+            == [0.5, 0.1, 0.9, 0.3, 0.1, 0.4]
+    # end def test_adapt_gene
+
+    def test_seed_from_log (self, optimizer, capsys, tmp_path):
+        opt = optimizer (*self.numpy, '--max-generations', '5', run = True)
+        log = tmp_path / 'run.log'
+        log.write_text (capsys.readouterr ().out)
+        with open (log) as f:
+            ex = showfromlog.Experiment.Parse (f)
+        assert np.allclose (ex.gene, best_gene (opt, pga.PGA_OLDPOP) [0])
+        opt = optimizer \
+            ( *self.numpy, '--seed-from', str (log), '-R', '5'
+            , '--max-generations', '1', run = True
+            )
+        assert opt.seed_genes is None
+        seeds = opt.evaluate_genes (np.array ([ex.gene]))
+        assert best_gene (opt, pga.PGA_OLDPOP) [1] <= seeds [0]
+    # end def test_seed_from_log
+
+    def test_seed_population (self, optimizer, capsys, tmp_path):
+        optimizer (*self.numpy, '--max-generations', '2', run = True)
+        log = tmp_path / 'run.log'
+        log.write_text (capsys.readouterr ().out)
+        opt = optimizer (*self.numpy, '--seed-from', str (log))
+        with open (log) as f:
+            ex = showfromlog.Experiment.Parse (f)
+        seeds = opt.seed_genes
+        assert len (seeds) == 10
+        assert list (seeds [0]) == list (ex.gene)
+        lo, hi = opt.init_range.T
+        assert ((lo <= seeds) & (seeds <= hi)).all ()
+        assert np.allclose (seeds [1:], seeds [0], atol = 0.1)
+    # end def test_seed_population
+
+    def test_gain (self, optimizer, capsys, tmp_path):
+        """ A log of a run computing the gain only seeds a run with
+            the same gain or one computing the gain, too.
+        """
+        optimizer \
+            (*self.numpy, '-k', '0', '--max-generations', '2', run = True)
+        log = tmp_path / 'run.log'
+        log.write_text (capsys.readouterr ().out)
+        with open (log) as f:
+            ex = showfromlog.Experiment.Parse (f)
+        with pytest.raises (ValueError):
+            optimizer (*self.numpy, '--seed-from', str (log))
+        opt = optimizer (*self.numpy, '-k', '0', '--seed-from', str (log))
+        assert list (opt.seed_genes [0]) == list (ex.gene)
+        opt = optimizer \
+            (*self.numpy, '-k', repr (ex.a0), '--seed-from', str (log))
+        assert list (opt.seed_genes [0]) == list (ex.gene)
+    # end def test_gain
+
+# end class Test_Seed
@@ -0,0 +1,90 @@
+import os
+import socket
+import subprocess
+import sys
+from filter_optimizer import sweep
+
+def dead_pid ():
+    """ The pid of a process that has terminated """
+    p = subprocess.Popen ([sys.executable, '-c', 'pass'])
+    p.wait ()
+    return p.pid
+# end def dead_pid
+
+class Test_Job_Queue:
+
+    def queue (self, tmp_path, n = 3):
+        q = sweep.Job_Queue (str (tmp_path / 'sweep.db'))
+        for k in range (n):
+            assert q.add ('key%d' % k, ['-R', str (k)], dict (k = k))
+        return q
+    # end def queue
+
+    def set_running (self, q, id, host, pid):
+        q.db.execute \
+            ( "update job set state = 'running', host = ?, pid = ?"
+              " where id = ?"
+            , (host, pid, id)
+            )
+    # end def set_running
+
+    def test_add_claim (self, tmp_path):
+        q = self.queue (tmp_path)
+        assert not q.add ('key1', ['-R', '1'], dict (k = 1))
+        claimed = [q.claim () for k in range (3)]
+        assert [c [1] for c in claimed] == [['-R', str (k)] for k in range (3)]
+        assert q.claim () is None
+        assert q.count () == dict (running = 3)
+        # A second queue on the same database sees the claims
+        q2 = sweep.Job_Queue (str (tmp_path / 'sweep.db'))
+        assert q2.claim () is None
+        q.done (claimed [0][0], dict (evaluation = 0.0, generations = 3))
+        q.done (claimed [1][0], dict (error = 'Traceback'))
+        assert q.count () == dict (running = 1, done = 1, failed = 1)
+        jobs = list (q.jobs ())
+        assert [j ['k'] for j in jobs] == [0, 1, 2]
+        assert jobs [0]['evaluation'] == 0.0
+    # end def test_add_claim
+
+    def test_reset (self, tmp_path):
+        q    = self.queue (tmp_path, 4)
+        host = socket.gethostname ()
+        self.set_running (q, 1, host, dead_pid ())
+        self.set_running (q, 2, host, os.getpid ())
+        self.set_running (q, 3, 'other-host', 1)
+        q.reset ()
+        states = [j ['state'] for j in q.jobs ()]
+        assert states == ['todo', 'running', 'running', 'todo']
+        q.reset (running = True)
+        assert q.count () == dict (todo = 4)
+    # end def test_reset
+
+    def test_retry_failed (self, tmp_path):
+        q = self.queue (tmp_path, 1)
+        id, argv = q.claim ()
+        q.done (id, dict (error = 'Traceback'))
+        q.reset ()
+        assert q.count () == dict (failed = 1)
+        q.reset (retry_failed = True)
+        assert q.count () == dict (todo = 1)
+    # end def test_retry_failed
+
+    def test_work (self, tmp_path):
+        """ A job with invalid arguments fails, the others are run """
+        fn = str (tmp_path / 'sweep.db')
+        q  = sweep.Job_Queue (fn)
+        q.add ('bad', ['--zeros', 'x'], {})
+        q.add ('ok',  ['--backend', 'numpy', '-p', '20', '-m', '100'], {})
+        stdout = os.dup (sys.stdout.fileno ())
+        try:
+            sweep.work (fn, str (tmp_path))
+        finally:
+            os.dup2 (stdout, sys.stdout.fileno ())
+            os.close (stdout)
+        jobs = list (q.jobs ())
+        assert [j ['state'] for j in jobs] == ['failed', 'done']
+        assert jobs [1]['evaluations'] >= 100
+        assert os.path.exists (str (tmp_path / '2.log'))
+    # end def test_work
+
+# end class Test_Job_Queue
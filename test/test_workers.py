@@ -0,0 +1,32 @@
+import pytest
+from filter_optimizer import workers
+from common import random_genes, best_gene
+
+class Test_Workers:
+
+    def test_pool (self, optimizer):
+        opt   = optimizer ()
+        genes = random_genes (opt, 20)
+        pool  = workers.Worker_Pool \
+            (opt.evaluate_genes, 3, len (genes), genes.shape [1])
+        try:
+            for rows in genes, genes [:7]:
+                ev = opt.evaluate_genes (rows)
+                assert list (pool.evaluate (rows)) == list (ev)
+        finally:
+            pool.close ()
+    # end def test_pool
+
+    def test_run (self, optimizer):
+        """ A run with workers is the same as in a single process """
+        pga  = pytest.importorskip ('pga')
+        argv = ('--max-generations', '5', '-p', '30')
+        runs = []
+        for w in (), ('--workers', '2'):
+            opt = optimizer (*(argv + w), run = True)
+            runs.append (best_gene (opt, pga.PGA_OLDPOP))
+        assert opt.pool is None
+        assert runs [0] == runs [1]
+    # end def test_run
+
+# end class Test_Workers